@@ -0,0 +1,252 @@
+"""
+Message Batches grading for eval_apps.py.
+
+Instead of one synchronous grading request per sample, every sample's grading
+request (system prompt, code and screenshots) is submitted as a single
+Anthropic Message Batch, polled until it ends, and the replies are mapped back
+to sample IDs for ``criteria_scorer``.
+
+Progress is kept in ``.grading_batches/state.json``: the ID of the batch in
+flight and every reply already collected. An interrupted run therefore resumes
+polling the same batch instead of paying for a new one, and a sample whose
+request is unchanged is never graded twice. Samples that fail inside a batch
+are resubmitted on the next run.
+
+Setting ``GRADING_BATCH_API=local`` swaps the Anthropic client for
+``LocalBatchClient``, a file-backed stand-in with the same surface that answers
+with fixed scores, so the whole flow can be exercised offline.
+
+Run (via eval_apps.py):
+    inspect eval eval_apps.py --model anthropic/claude-sonnet-4-6 -T batch=true
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import mimetypes
+import os
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+BASE_DIR = Path(__file__).parent
+STATE_DIR = BASE_DIR / ".grading_batches"
+DEFAULT_MAX_TOKENS = 4096
+
+
+def anthropic_content(content) -> list[dict]:
+    """Convert Inspect message content (text and image paths) to API blocks."""
+    if isinstance(content, str):
+        return [{"type": "text", "text": content}]
+    blocks = []
+    for part in content:
+        if part.type == "text":
+            blocks.append({"type": "text", "text": part.text})
+        elif part.type == "image":
+            media_type = mimetypes.guess_type(part.image)[0] or "image/png"
+            data = base64.b64encode(Path(part.image).read_bytes()).decode()
+            blocks.append({
+                "type": "image",
+                "source": {"type": "base64", "media_type": media_type, "data": data},
+            })
+    return blocks
+
+
+def build_requests(samples, model: str, system: str,
+                   max_tokens: int = DEFAULT_MAX_TOKENS) -> dict[str, dict]:
+    """Batch request params per sample ID."""
+    requests = {}
+    for sample in samples:
+        messages = [
+            {"role": message.role, "content": anthropic_content(message.content)}
+            for message in sample.input
+        ]
+        requests[str(sample.id)] = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "system": system,
+            "messages": messages,
+        }
+    return requests
+
+
+def fingerprint(params: dict) -> str:
+    """Stable hash of one request, so edited samples are graded again."""
+    encoded = json.dumps(params, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def make_client():
+    """The Anthropic async client, or the local stand-in."""
+    if os.environ.get("GRADING_BATCH_API") == "local":
+        return LocalBatchClient()
+    import anthropic
+
+    return anthropic.AsyncAnthropic()
+
+
+class BatchGrader:
+    """Grades every sample through one Message Batch, shared by all solvers."""
+
+    def __init__(self, requests: dict[str, dict], client=None,
+                 state_dir: Path = STATE_DIR, poll_interval: float = 30.0):
+        self.requests = requests
+        self.client = client or make_client()
+        self.state_path = Path(state_dir) / "state.json"
+        self.poll_interval = poll_interval
+        self._lock = asyncio.Lock()
+        self._done = False
+        self.state = self._load_state()
+
+    def _load_state(self) -> dict:
+        if self.state_path.exists():
+            return json.loads(self.state_path.read_text(encoding="utf-8"))
+        return {"batch_id": None, "submitted": {}, "results": {}, "errors": {}}
+
+    def _save_state(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.state, indent=2), encoding="utf-8")
+        tmp.replace(self.state_path)
+
+    def _pending(self) -> dict[str, str]:
+        """Sample IDs (with fingerprints) that still need a reply."""
+        pending = {}
+        for custom_id, params in self.requests.items():
+            fp = fingerprint(params)
+            cached = self.state["results"].get(custom_id)
+            if not cached or cached["fingerprint"] != fp:
+                pending[custom_id] = fp
+        return pending
+
+    async def _submit(self, pending: dict[str, str]):
+        batch = await self.client.messages.batches.create(requests=[
+            {"custom_id": custom_id, "params": self.requests[custom_id]}
+            for custom_id in pending
+        ])
+        self.state.update(batch_id=batch.id, submitted=pending, errors={})
+        self._save_state()
+
+    async def _collect(self):
+        """Poll the batch in flight until it ends, then store its replies."""
+        batches = self.client.messages.batches
+        batch_id = self.state["batch_id"]
+        while (await batches.retrieve(batch_id)).processing_status != "ended":
+            await asyncio.sleep(self.poll_interval)
+
+        submitted = self.state["submitted"]
+        async for entry in await batches.results(batch_id):
+            if entry.custom_id not in submitted:
+                continue
+            if entry.result.type == "succeeded":
+                text = "".join(
+                    block.text for block in entry.result.message.content
+                    if block.type == "text"
+                )
+                self.state["results"][entry.custom_id] = {
+                    "fingerprint": submitted[entry.custom_id],
+                    "text": text,
+                }
+            else:
+                self.state["errors"][entry.custom_id] = entry.result.type
+        self.state.update(batch_id=None, submitted={})
+        self._save_state()
+
+    async def run(self):
+        """Resume or submit the batch once; later callers just wait for it."""
+        async with self._lock:
+            if self._done:
+                return
+            pending = self._pending()
+            in_flight = self.state["batch_id"] and all(
+                self.state["submitted"].get(cid) == fp for cid, fp in pending.items()
+            )
+            if pending and not in_flight:
+                await self._submit(pending)
+            if self.state["batch_id"]:
+                await self._collect()
+            self._done = True
+
+    async def result(self, custom_id: str) -> str:
+        """The grader's reply for one sample."""
+        await self.run()
+        cached = self.state["results"].get(custom_id)
+        if cached is None or cached["fingerprint"] != fingerprint(self.requests[custom_id]):
+            error = self.state["errors"].get(custom_id, "missing")
+            raise RuntimeError(
+                f"Batch grading for {custom_id!r} {error}; re-run to resubmit it"
+            )
+        return cached["text"]
+
+
+# ── Local stand-in ────────────────────────────────────────────────────────────
+LOCAL_REPLY = """\
+Local batch stand-in: no model was called.
+
+MAINTAINABILITY_SCORE: 7
+READABILITY_SCORE: 7
+ADHERENCE_SCORE: 7
+EFFICIENCY_SCORE: 7
+"""
+
+
+class _LocalBatches:
+    def __init__(self, root: Path, polls_until_ended: int):
+        self.root = root
+        self.polls_until_ended = polls_until_ended
+
+    def _path(self, batch_id: str) -> Path:
+        return self.root / f"{batch_id}.json"
+
+    def _batch(self, record: dict):
+        ended = record["polls"] >= self.polls_until_ended
+        return SimpleNamespace(
+            id=record["id"],
+            processing_status="ended" if ended else "in_progress",
+        )
+
+    async def create(self, requests: list[dict]):
+        self.root.mkdir(parents=True, exist_ok=True)
+        record = {
+            "id": f"msgbatch_local_{uuid.uuid4().hex[:12]}",
+            "custom_ids": [r["custom_id"] for r in requests],
+            "polls": 0,
+        }
+        self._path(record["id"]).write_text(json.dumps(record), encoding="utf-8")
+        return self._batch(record)
+
+    async def retrieve(self, batch_id: str):
+        path = self._path(batch_id)
+        record = json.loads(path.read_text(encoding="utf-8"))
+        record["polls"] += 1
+        path.write_text(json.dumps(record), encoding="utf-8")
+        return self._batch(record)
+
+    async def results(self, batch_id: str):
+        record = json.loads(self._path(batch_id).read_text(encoding="utf-8"))
+
+        async def entries():
+            for custom_id in record["custom_ids"]:
+                message = SimpleNamespace(
+                    content=[SimpleNamespace(type="text", text=LOCAL_REPLY)]
+                )
+                yield SimpleNamespace(
+                    custom_id=custom_id,
+                    result=SimpleNamespace(type="succeeded", message=message),
+                )
+
+        return entries()
+
+
+class LocalBatchClient:
+    """File-backed stand-in for ``AsyncAnthropic().messages.batches``.
+
+    Batches persist under ``<state_dir>/local/`` so an interrupted run can be
+    resumed against the stand-in too; each batch ends after a few polls.
+    """
+
+    def __init__(self, root: Path = STATE_DIR / "local", polls_until_ended: int = 2):
+        self.messages = SimpleNamespace(
+            batches=_LocalBatches(Path(root), polls_until_ended)
+        )
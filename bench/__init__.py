@@ -0,0 +1,11 @@
+"""
+Benchmarks for the generated tip calculator apps.
+
+Each module is a standalone script that launches one or more of the apps in
+``streamlit/``, ``dash/``, ``panel/`` and ``shiny/``, drives the standard
+test scenario (bill $85.50, 20% tip, split 3 ways) and prints a Markdown
+table that can be pasted into ``index.qmd``.
+
+Run from the repository root, e.g.:
+    python -m bench.streamlit_reruns
+"""
@@ -0,0 +1,133 @@
+"""
+A/B comparison of the baseline and performance prompt variants per framework.
+
+``python generate_apps.py --variant all`` writes each framework's app twice:
+``app.py`` from the baseline prompt and ``app_performance.py`` from the
+prompt that also asks for the framework's performance idioms. This script
+runs the interaction (load), wire (payload) and startup benchmarks on both
+files and prints, per framework, each variant's numbers and the relative
+change, next to the latest quality scores of each variant from the results
+database (``inspect eval eval_apps.py -T prompt_variant=performance``, then
+``python results_db.py ingest``).
+
+``--save`` writes the measurements to ``perf.json`` / ``perf_performance.json``
+so eval_apps.py scores each variant's efficiency from its own numbers.
+
+Run:
+    python -m bench.ab --repeat 3 --save
+"""
+
+import argparse
+from contextlib import closing
+
+from playwright.sync_api import sync_playwright
+
+import results_db
+from bench import interactions, startup, wire
+from bench.common import (
+    FRAMEWORKS,
+    SCENARIO_STEPS,
+    VARIANT_FILES,
+    app_path,
+    markdown_table,
+    save_metrics,
+    summarize,
+)
+
+VARIANTS = ("baseline", "performance")
+# metric -> (label, format); lower is better for all of them.
+METRICS = {
+    "interaction_latency_ms": ("Interaction latency (ms)", "{:,.0f}"),
+    "bytes_per_interaction": ("Bytes per interaction", "{:,.0f}"),
+    "scenario_bytes_compressed": ("Scenario payload, compressed (B)", "{:,.0f}"),
+    "cold_start_s": ("Cold start to first render (s)", "{:.2f}"),
+}
+CRITERIA = ("maintainability", "readability", "adherence", "efficiency")
+
+
+def measure(dirname: str, variant: str, repeat: int, browser) -> dict:
+    """Headline load, payload and startup numbers for one generated file."""
+    path = app_path(dirname, variant)
+    results = interactions.measure(dirname, repeat, path)
+    steps = [results[name] for name, _ in SCENARIO_STEPS[dirname]]
+    all_ms = [v for step in steps for v in step["ms"]]
+    all_bytes = [v for step in steps for v in step["bytes"]]
+    payload = wire.profile(dirname, path)
+    renders = [startup.serve_and_render(dirname, browser, path)[1] for _ in range(repeat)]
+    return {
+        "interaction_latency_ms": summarize(all_ms)["mean"],
+        "bytes_per_interaction": summarize(all_bytes)["mean"],
+        "scenario_bytes_compressed": payload["totals"]["compressed"],
+        "cold_start_s": summarize(renders)["mean"],
+    }
+
+
+def quality_scores(last: int) -> dict:
+    """(dirname, variant, criterion) -> mean score over the latest eval runs."""
+    scores = {}
+    with closing(results_db.connect()) as conn:
+        for variant in VARIANTS:
+            for row in results_db.mean_scores(conn, last=last, prompt_variant=variant):
+                scores[row["framework"], variant, row["criterion"]] = row["mean"]
+    return scores
+
+
+def delta(before, after) -> str:
+    if before is None or after is None or not before:
+        return "–"
+    return f"{(after - before) / before:+.0%}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--last", type=int, default=5,
+                        help="eval runs per variant to average the quality scores over")
+    parser.add_argument("--save", action="store_true",
+                        help="write each variant's numbers to its perf JSON file")
+    args = parser.parse_args()
+
+    results = {}
+    with sync_playwright() as pw:
+        browser = pw.chromium.launch()
+        for dirname in FRAMEWORKS.values():
+            for variant in VARIANTS:
+                if not app_path(dirname, variant).exists():
+                    print(f"{dirname}/{VARIANT_FILES[variant]} missing; "
+                          "run generate_apps.py --variant all")
+                    continue
+                results[dirname, variant] = measure(dirname, variant, args.repeat, browser)
+                if args.save:
+                    save_metrics(dirname, variant, **results[dirname, variant])
+        browser.close()
+
+    scores = quality_scores(args.last)
+    for framework, dirname in FRAMEWORKS.items():
+        base = results.get((dirname, "baseline"), {})
+        perf = results.get((dirname, "performance"), {})
+        rows = []
+        for key, (label, fmt) in METRICS.items():
+            rows.append([
+                label,
+                fmt.format(base[key]) if key in base else "–",
+                fmt.format(perf[key]) if key in perf else "–",
+                delta(base.get(key), perf.get(key)),
+            ])
+        for criterion in CRITERIA:
+            before = scores.get((dirname, "baseline", criterion))
+            after = scores.get((dirname, "performance", criterion))
+            rows.append([
+                f"Quality: {criterion}",
+                f"{before:.1f}" if before is not None else "–",
+                f"{after:.1f}" if after is not None else "–",
+                f"{after - before:+.1f}" if None not in (before, after) else "–",
+            ])
+        print(f"### {framework}\n")
+        print(markdown_table(["Metric", "Baseline", "Performance", "Change"], rows))
+        print()
+    print("Runtime changes are relative (lower is better); quality changes are "
+          "score points out of 10.")
+
+
+if __name__ == "__main__":
+    main()
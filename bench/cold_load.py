@@ -0,0 +1,93 @@
+"""
+Cold-load transfer size and time to first byte, with and without static_cache.
+
+Each app is served twice, with ``TIP_STATIC_CACHE=0`` and ``=1`` (see
+static_cache.py), and loaded in fresh browser contexts (empty HTTP cache).
+For every load it records the bytes transferred (headers plus encoded
+bodies) and the navigation's time to first byte, then reloads the page in
+the same context to show what the cache headers save on a repeat visit.
+
+The first load after server start also pays for precompression, so the
+first repetition is treated as warm-up and not reported.
+
+Run:
+    python -m bench.cold_load --repeat 5
+"""
+
+import argparse
+import os
+
+from playwright.sync_api import sync_playwright
+
+from bench.common import (
+    FRAMEWORKS,
+    WireRecorder,
+    markdown_table,
+    serve,
+    summarize,
+)
+
+_TTFB_JS = "() => performance.getEntriesByType('navigation')[0].responseStart"
+
+
+def _load(page, url: str, recorder: WireRecorder, reload: bool = False):
+    start = len(recorder.requests)
+    if reload:
+        page.reload()
+    else:
+        page.goto(url)
+    page.get_by_text("Total Bill").first.wait_for(timeout=60_000)
+    page.wait_for_load_state("networkidle")
+    transferred = sum(r.response_bytes() for r in recorder.requests[start:]
+                      if r.done_t is not None)
+    return transferred, page.evaluate(_TTFB_JS)
+
+
+def measure(dirname: str, cache_on: bool, repeat: int) -> dict:
+    env = dict(os.environ, TIP_STATIC_CACHE="1" if cache_on else "0")
+    results = {"cold_bytes": [], "ttfb_ms": [], "reload_bytes": []}
+    with serve(dirname, env=env) as running, sync_playwright() as pw:
+        browser = pw.chromium.launch()
+        for i in range(repeat + 1):
+            context = browser.new_context()
+            page = context.new_page()
+            recorder = WireRecorder().attach(page)
+            cold_bytes, ttfb = _load(page, running.url, recorder)
+            reload_bytes, _ = _load(page, running.url, recorder, reload=True)
+            context.close()
+            if i == 0:
+                continue  # warm-up: fills the precompressed cache
+            results["cold_bytes"].append(cold_bytes)
+            results["ttfb_ms"].append(ttfb)
+            results["reload_bytes"].append(reload_bytes)
+        browser.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = []
+    for framework, dirname in FRAMEWORKS.items():
+        for cache_on in (False, True):
+            stats = {k: summarize(v) for k, v in measure(dirname, cache_on, args.repeat).items()}
+            rows.append([
+                framework,
+                "on" if cache_on else "off",
+                f"{stats['cold_bytes']['mean'] / 1024:,.0f}",
+                f"{stats['ttfb_ms']['mean']:.1f} ± {stats['ttfb_ms']['stdev']:.1f}",
+                f"{stats['reload_bytes']['mean'] / 1024:,.0f}",
+            ])
+
+    print(f"Page loads, mean over {args.repeat} fresh browser contexts\n")
+    print(markdown_table(
+        ["Framework", "static_cache", "Cold load (KiB)", "TTFB (ms)", "Reload (KiB)"],
+        rows,
+    ))
+    print("\nStreamlit does not use static_cache; its rows show run-to-run noise.")
+
+
+if __name__ == "__main__":
+    main()
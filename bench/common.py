@@ -0,0 +1,508 @@
+"""
+Shared helpers for the benchmark scripts: launching apps, recording traffic
+and summarizing repeated measurements.
+
+Browser-driven benchmarks need Playwright:
+    pip install playwright && playwright install chromium
+"""
+
+import hashlib
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import closing, contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import results_db
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+FRAMEWORKS = {
+    "Streamlit": "streamlit",
+    "Plotly Dash": "dash",
+    "Panel": "panel",
+    "Shiny for Python": "shiny",
+}
+
+# The scenario used for the "after" screenshots and the eval prompt.
+SCENARIO = {"bill": 85.50, "tip_pct": 20, "people": 3}
+
+
+def _fill(locator, text: str):
+    """Type into an input and commit it the way a user would (Enter)."""
+    locator.fill(text)
+    locator.press("Enter")
+
+
+# Locators for the bill amount field of each app.
+BILL_INPUT = {
+    "streamlit": lambda page: page.get_by_label("Bill Amount ($)"),
+    "dash": lambda page: page.locator("#bill-amount"),
+    "panel": lambda page: page.locator("input.bk-input").nth(0),
+    "shiny": lambda page: page.locator("#bill"),
+}
+
+# Locators for the tip % field of the apps where it is typed (Streamlit and
+# Panel use a slider).
+TIP_INPUT = {
+    "dash": lambda page: page.locator("#tip-percent"),
+    "shiny": lambda page: page.locator("#tip_pct"),
+}
+
+# Playwright steps that play the scenario on each app, as (name, action) pairs.
+# Every framework has the same three logical steps, so per-step and
+# whole-scenario numbers compare across frameworks.
+SCENARIO_STEPS = {
+    "streamlit": [
+        ("type bill", lambda page: _fill(
+            BILL_INPUT["streamlit"](page), f"{SCENARIO['bill']:.2f}")),
+        ("click preset", lambda page: page.get_by_role(
+            "button", name=f"{SCENARIO['tip_pct']}%").click()),
+        ("set people", lambda page: _fill(
+            page.get_by_label("Number of People"), str(SCENARIO["people"]))),
+    ],
+    "dash": [
+        ("type bill", lambda page: _fill(
+            BILL_INPUT["dash"](page), f"{SCENARIO['bill']:.2f}")),
+        ("click preset", lambda page: page.locator(
+            f"#btn-{SCENARIO['tip_pct']}").click()),
+        ("set people", lambda page: _fill(
+            page.locator("#num-people"), str(SCENARIO["people"]))),
+    ],
+    "panel": [
+        ("type bill", lambda page: _fill(
+            BILL_INPUT["panel"](page), f"{SCENARIO['bill']:.2f}")),
+        ("click preset", lambda page: page.get_by_role(
+            "button", name=f"{SCENARIO['tip_pct']}%").click()),
+        ("set people", lambda page: _fill(
+            page.locator("input.bk-input").nth(1), str(SCENARIO["people"]))),
+    ],
+    "shiny": [
+        ("type bill", lambda page: _fill(
+            BILL_INPUT["shiny"](page), f"{SCENARIO['bill']:.2f}")),
+        ("click preset", lambda page: page.locator(
+            f"#preset_{SCENARIO['tip_pct']}").click()),
+        ("set people", lambda page: _fill(
+            page.locator("#num_people"), str(SCENARIO["people"]))),
+    ],
+}
+
+# Framework-specific steps that reveal a control the scenario needs (the
+# Streamlit app shows the people input only once splitting is switched on).
+# They run after page load and before SCENARIO_STEPS, and benchmarks report
+# them apart from the scenario.
+SETUP_STEPS = {
+    "streamlit": [
+        ("enable split", lambda page: page.get_by_text(
+            "Split the total among multiple people").click()),
+    ],
+    "dash": [],
+    "panel": [],
+    "shiny": [],
+}
+
+
+def all_steps(dirname: str) -> list:
+    """SETUP_STEPS, labelled ``(setup)``, then SCENARIO_STEPS: for benchmarks
+    that report every step. Only scenario steps go into comparable totals."""
+    setup = [(f"{name} (setup)", action) for name, action in SETUP_STEPS[dirname]]
+    return setup + SCENARIO_STEPS[dirname]
+
+
+def play_setup(page, dirname: str):
+    """Play the framework's SETUP_STEPS and wait for the page to settle."""
+    for _, action in SETUP_STEPS[dirname]:
+        action(page)
+        page.wait_for_timeout(200)
+    page.wait_for_load_state("networkidle")
+
+
+# Dash apps end with ``app.run(debug=True)``; run the module without
+# ``__main__`` so the benchmark controls the port and skips the reloader.
+_DASH_LAUNCHER = (
+    "import runpy, sys; "
+    "ns = runpy.run_path(sys.argv[1], run_name='dash_app'); "
+    "ns['app'].run(host='127.0.0.1', port=int(sys.argv[2]), debug=False)"
+)
+
+
+# Generated file per prompt variant (see PROMPT_VARIANTS in generate_apps.py).
+VARIANT_FILES = {"baseline": "app.py", "performance": "app_performance.py"}
+
+
+def app_path(dirname: str, variant: str = "baseline") -> Path:
+    """Return the generated app of a framework directory (``app.py`` by default)."""
+    return REPO_ROOT / dirname / VARIANT_FILES[variant]
+
+
+def app_command(dirname: str, port: int, path: Path | None = None,
+                extra_args: list[str] | None = None) -> list[str]:
+    """Build the command that serves one app on ``port``.
+
+    ``extra_args`` are appended to the framework's CLI, e.g. ``--num-procs``
+    for ``panel serve``.
+    """
+    path = str(path or app_path(dirname))
+    port = str(port)
+    commands = {
+        "streamlit": [
+            sys.executable, "-m", "streamlit", "run", path,
+            "--server.port", port,
+            "--server.address", "127.0.0.1",
+            "--server.headless", "true",
+            "--browser.gatherUsageStats", "false",
+        ],
+        "dash": [sys.executable, "-c", _DASH_LAUNCHER, path, port],
+        "panel": [
+            sys.executable, "-m", "panel", "serve", path,
+            "--port", port,
+            "--address", "127.0.0.1",
+            "--allow-websocket-origin", f"127.0.0.1:{port}",
+        ],
+        "shiny": [
+            sys.executable, "-m", "shiny", "run", path,
+            "--port", port,
+            "--host", "127.0.0.1",
+        ],
+    }
+    return commands[dirname] + list(extra_args or [])
+
+
+def app_url(dirname: str, port: int, path: Path | None = None) -> str:
+    """URL of the app's main page once it is being served."""
+    # ``panel serve`` mounts each script under its file stem.
+    suffix = f"/{Path(path or 'app').stem}" if dirname == "panel" else "/"
+    return f"http://127.0.0.1:{port}{suffix}"
+
+
+def free_port() -> int:
+    """Ask the OS for an unused TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 60.0, proc=None) -> float:
+    """Block until ``port`` accepts connections; return the time it took."""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f"App process exited with code {proc.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return time.perf_counter() - start
+        except OSError:
+            time.sleep(0.02)
+    raise TimeoutError(f"Port {port} not ready after {timeout:.0f}s")
+
+
+@dataclass
+class RunningApp:
+    """A served app: its process, port and main page URL."""
+
+    dirname: str
+    proc: subprocess.Popen
+    port: int
+    url: str
+    ready_s: float
+
+
+@contextmanager
+def serve(dirname: str, path: Path | None = None, port: int | None = None,
+          env: dict | None = None, timeout: float = 60.0,
+          extra_args: list[str] | None = None):
+    """Serve one app in a subprocess for the duration of the block."""
+    port = port or free_port()
+    proc = subprocess.Popen(
+        app_command(dirname, port, path, extra_args),
+        cwd=REPO_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        # Own process group, so forked workers (--num-procs) are stopped too.
+        start_new_session=True,
+    )
+    try:
+        ready_s = wait_for_port(port, timeout, proc)
+        yield RunningApp(dirname, proc, port, app_url(dirname, port, path), ready_s)
+    finally:
+        _stop(proc)
+
+
+# Where host.py mounts each app.
+HOST_PATHS = {"streamlit": "/streamlit/", "dash": "/dash/", "panel": "/panel", "shiny": "/shiny/"}
+
+
+@contextmanager
+def serve_host(port: int | None = None, env: dict | None = None, timeout: float = 90.0):
+    """Serve all four apps from one ``host.py`` process (plus its Streamlit
+    sidecar); the ``RunningApp`` URL is the host's root."""
+    port = port or free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "host.py", "--port", str(port),
+         "--streamlit-port", str(free_port())],
+        cwd=REPO_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    try:
+        ready_s = wait_for_port(port, timeout, proc)
+        yield RunningApp("host", proc, port, f"http://127.0.0.1:{port}", ready_s)
+    finally:
+        _stop(proc)
+
+
+def _stop(proc: subprocess.Popen):
+    """Terminate ``proc`` and everything in its process group."""
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+    except (AttributeError, ProcessLookupError):
+        proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except (AttributeError, ProcessLookupError):
+            proc.kill()
+
+
+@dataclass
+class Frame:
+    """One websocket frame seen by the browser."""
+
+    t: float
+    sent: bool
+    payload: bytes
+
+    @property
+    def size(self) -> int:
+        return len(self.payload)
+
+
+@dataclass
+class HttpRequest:
+    """One HTTP request issued by the page."""
+
+    t: float
+    method: str
+    url: str
+    request: object = field(default=None, repr=False)
+    done_t: float | None = None
+
+    def response_bytes(self) -> int:
+        """Response header + body bytes (once the request has finished)."""
+        sizes = self.request.sizes()
+        return sizes["responseHeadersSize"] + sizes["responseBodySize"]
+
+
+@dataclass
+class WireRecorder:
+    """Record every websocket frame and HTTP request of a Playwright page."""
+
+    frames: list[Frame] = field(default_factory=list)
+    requests: list[HttpRequest] = field(default_factory=list)
+    _pending: dict = field(default_factory=dict, repr=False)
+
+    def attach(self, page) -> "WireRecorder":
+        page.on("websocket", self._on_websocket)
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_request_done)
+        page.on("requestfailed", self._on_request_done)
+        return self
+
+    def _on_request(self, request):
+        entry = HttpRequest(time.perf_counter(), request.method, request.url, request)
+        self.requests.append(entry)
+        self._pending[id(request)] = entry
+
+    def _on_request_done(self, request):
+        entry = self._pending.pop(id(request), None)
+        if entry is not None:
+            entry.done_t = time.perf_counter()
+
+    def _on_websocket(self, ws):
+        ws.on("framesent", lambda p: self._record(p, sent=True))
+        ws.on("framereceived", lambda p: self._record(p, sent=False))
+
+    def _record(self, payload, sent: bool):
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        self.frames.append(Frame(time.perf_counter(), sent, payload))
+
+    def mark(self) -> int:
+        """Position to pass to :meth:`since` after the next interaction."""
+        return len(self.frames)
+
+    def since(self, mark: int) -> list[Frame]:
+        return self.frames[mark:]
+
+    def requests_after(self, t: float) -> list[HttpRequest]:
+        return [r for r in self.requests if r.t >= t]
+
+    def last_activity(self, t: float) -> float | None:
+        """Time of the last frame received or request finished after ``t``."""
+        times = [f.t for f in self.frames if f.t >= t and not f.sent]
+        times += [r.done_t for r in self.requests_after(t) if r.done_t]
+        return max(times, default=None)
+
+    def busy(self) -> bool:
+        """Whether any HTTP request is still in flight."""
+        return bool(self._pending)
+
+
+def wait_quiet(page, recorder: WireRecorder, t0: float, quiet: float = 0.3,
+               timeout: float = 10.0) -> float:
+    """Wait until the app has responded to an action started at ``t0`` and
+    then gone quiet for ``quiet`` seconds; return the last response time."""
+    deadline = time.perf_counter() + timeout
+    while True:
+        last = recorder.last_activity(t0)
+        now = time.perf_counter()
+        if last is not None and not recorder.busy() and now - last >= quiet:
+            return last
+        if now > deadline:
+            raise TimeoutError("Timed out waiting for the app to respond")
+        page.wait_for_timeout(10)
+
+
+def wait_until(page, predicate, timeout: float = 10.0, settle: float = 0.0):
+    """Pump the page's event loop until ``predicate()`` is true.
+
+    ``settle`` keeps pumping for a little longer afterwards so that late
+    follow-up messages (e.g. a second rerun) are captured too.
+    """
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("Timed out waiting for the app to respond")
+        page.wait_for_timeout(10)
+    if settle:
+        page.wait_for_timeout(settle * 1000)
+
+
+def cpu_seconds(pid: int) -> float:
+    """User + system CPU time consumed so far by process ``pid``."""
+    import psutil
+
+    times = psutil.Process(pid).cpu_times()
+    return times.user + times.system
+
+
+def rss_bytes(pid: int) -> int:
+    """Resident set size of process ``pid`` and all of its children."""
+    import psutil
+
+    proc = psutil.Process(pid)
+    procs = [proc] + proc.children(recursive=True)
+    return sum(p.memory_info().rss for p in procs)
+
+
+def summarize(samples: list[float]) -> dict:
+    """Mean, spread and extremes of repeated measurements."""
+    return {
+        "n": len(samples),
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "max": max(samples),
+    }
+
+
+def markdown_table(headers: list[str], rows: list[list]) -> str:
+    """Render rows in the pipe-table style used by ``index.qmd``."""
+    lines = [
+        "| " + " | ".join(headers) + " |",
+        "| --- |" + " :---: |" * (len(headers) - 1),
+    ]
+    for row in rows:
+        lines.append("| " + " | ".join(str(cell) for cell in row) + " |")
+    return "\n".join(lines)
+
+
+def metrics_path(dirname: str, variant: str = "baseline") -> Path:
+    """Where measured runtime metrics for one app are kept."""
+    name = "perf.json" if variant == "baseline" else f"perf_{variant}.json"
+    return REPO_ROOT / dirname / name
+
+
+def load_metrics(dirname: str, variant: str = "baseline") -> dict:
+    path = metrics_path(dirname, variant)
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+
+# Every metric saved by one benchmark process belongs to the same run.
+BENCH_RUN_ID = results_db.new_run_id("bench")
+
+
+def build_key(dirname: str, variant: str = "baseline") -> dict:
+    """What a measurement was taken of: git commit, app content hash and
+    framework version (the benchmark history is keyed on these)."""
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+            text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    path = app_path(dirname, variant)
+    app_sha = hashlib.sha256(path.read_bytes()).hexdigest()[:16] if path.exists() else None
+    try:
+        framework_version = version(dirname)
+    except PackageNotFoundError:
+        framework_version = None
+    return {"git_commit": commit, "app_sha": app_sha, "framework_version": framework_version}
+
+
+def save_metrics(dirname: str, variant: str = "baseline", samples: dict | None = None,
+                 **metrics):
+    """Merge ``metrics`` into ``<dirname>/perf.json`` (``perf_<variant>.json``
+    for another prompt variant; read by eval_apps.py) and record them in the
+    results database.
+
+    ``samples`` maps a metric to its individual repetitions for the
+    benchmark history; a metric without samples counts as one repetition.
+    """
+    merged = {**load_metrics(dirname, variant), **metrics}
+    path = metrics_path(dirname, variant)
+    path.write_text(json.dumps(merged, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    run_id = BENCH_RUN_ID if variant == "baseline" else f"{BENCH_RUN_ID}-{variant}"
+    with closing(results_db.connect()) as conn:
+        results_db.record_metrics(run_id, dirname, metrics, conn, prompt_variant=variant)
+        results_db.record_bench_samples(
+            run_id, dirname,
+            {k: (samples or {}).get(k) or [v] for k, v in metrics.items()},
+            conn=conn, **build_key(dirname, variant),
+        )
+        with conn:
+            results_db.mark_ingested(conn, path)
+
+
+@contextmanager
+def app_at_revision(dirname: str, rev: str):
+    """Materialize ``<dirname>/app.py`` as of git ``rev`` for before/after runs.
+
+    The copy is written next to the current app so that any relative imports
+    resolve the same way, and removed afterwards.
+    """
+    source = subprocess.run(
+        ["git", "show", f"{rev}:{dirname}/app.py"],
+        cwd=REPO_ROOT, check=True, capture_output=True, text=True,
+    ).stdout
+    path = REPO_ROOT / dirname / f"_app_{rev.replace('/', '_')}.py"
+    path.write_text(source, encoding="utf-8")
+    try:
+        yield path
+    finally:
+        path.unlink(missing_ok=True)
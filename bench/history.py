@@ -0,0 +1,228 @@
+"""
+Benchmark history: noise-aware regression checks and trend charts.
+
+Every ``--save``d benchmark run records each repetition in the results
+database (``bench_samples``), keyed on the git commit, the app's content hash
+and the installed framework version, so a regenerated ``app.py``, a framework
+upgrade or a prompt change each show up as a new build.
+
+``compare`` takes the repetitions of two builds per framework and metric and
+bootstraps a 95% confidence interval for the relative change of the mean.
+A change is only flagged when the whole interval lies beyond ``--threshold``
+(all metrics are lower-is-better), so run-to-run noise does not raise false
+alarms; builds with fewer than two repetitions are reported but never
+flagged. Run the benchmarks a few times (or with ``--repeat``) per build.
+
+``report`` writes ``bench_history.md``, the trend chart section included by
+``index.qmd``: one chart per metric with the mean of every build per
+framework, and the latest change with its interval. ``quarto render`` runs it
+first (``_quarto.yml``), so the generated file is not committed.
+
+Run:
+    python -m bench.history compare                 # latest build vs the one before
+    python -m bench.history compare --base HEAD~3 --head HEAD
+    python -m bench.history report
+"""
+
+import argparse
+import subprocess
+import sys
+from contextlib import closing
+from pathlib import Path
+
+import numpy as np
+
+import results_db
+from bench.common import FRAMEWORKS, REPO_ROOT, markdown_table
+
+REPORT_PATH = REPO_ROOT / "bench_history.md"
+LABELS = {
+    "interaction_latency_ms": "Interaction latency (ms)",
+    "bytes_per_interaction": "Bytes per interaction",
+    "invocations_per_keystroke": "Server invocations per keystroke",
+    "cold_start_s": "Cold start to first render (s)",
+    "memory_per_session_kib": "Memory per active session (KiB)",
+    "scenario_bytes_compressed": "Scenario payload, compressed (B)",
+    "fcp_ms": "First contentful paint (ms)",
+    "lcp_ms": "Largest contentful paint (ms)",
+    "tbt_ms": "Total blocking time (ms)",
+    "inp_ms": "Interaction to next paint (ms)",
+    "js_heap_mib": "JS heap (MiB)",
+    "js_css_kib": "JS + CSS transferred (KiB)",
+}
+COLORS = {"streamlit": "#ff4b4b", "dash": "#119dff", "panel": "#0072b5", "shiny": "#75aadb"}
+
+
+# ── Statistics ────────────────────────────────────────────────────────────────
+def relative_change(base: list[float], head: list[float], boot: int = 4000,
+                    seed: int = 0) -> tuple[float, float | None, float | None]:
+    """Relative change of the mean (head vs base) with a bootstrap 95% CI;
+    the interval is None with fewer than two repetitions on either side."""
+    base, head = np.asarray(base, float), np.asarray(head, float)
+    point = head.mean() / base.mean() - 1
+    if len(base) < 2 or len(head) < 2:
+        return point, None, None
+    rng = np.random.default_rng(seed)
+    base_means = rng.choice(base, (boot, len(base))).mean(axis=1)
+    head_means = rng.choice(head, (boot, len(head))).mean(axis=1)
+    changes = head_means / base_means - 1
+    low, high = np.percentile(changes, [2.5, 97.5])
+    return point, float(low), float(high)
+
+
+def verdict(low: float | None, high: float | None, threshold: float) -> str:
+    if low is None:
+        return "too few runs"
+    if low > threshold:
+        return "REGRESSION"
+    if high < -threshold:
+        return "improvement"
+    return "no significant change"
+
+
+# ── Builds ────────────────────────────────────────────────────────────────────
+def _resolve(rev: str) -> str:
+    return subprocess.run(["git", "rev-parse", rev], cwd=REPO_ROOT, capture_output=True,
+                          text=True, check=True).stdout.strip()
+
+
+def pick_builds(builds: list, base_rev: str | None, head_rev: str | None):
+    """(base, head) builds: the latest build of each revision, by default the
+    latest build and the one before it."""
+    def latest_of(commit, before=None):
+        candidates = [b for b in builds[:before] if b["git_commit"] == commit]
+        return candidates[-1] if candidates else None
+
+    head = latest_of(_resolve(head_rev)) if head_rev else (builds[-1] if builds else None)
+    if head is None:
+        return None, None
+    if base_rev:
+        return latest_of(_resolve(base_rev)), head
+    index = builds.index(head)
+    return (builds[index - 1] if index else None), head
+
+
+def describe_change(base, head, dirname: str) -> str:
+    """What differs between two builds."""
+    parts = []
+    if base["git_commit"] != head["git_commit"]:
+        parts.append(f"commit {str(base['git_commit'])[:8]} → {str(head['git_commit'])[:8]}")
+    if base["app_sha"] != head["app_sha"]:
+        parts.append("app changed")
+    if base["framework_version"] != head["framework_version"]:
+        parts.append(f"{dirname} {base['framework_version']} → {head['framework_version']}")
+    return ", ".join(parts) or "same build"
+
+
+def compare(conn, base_rev: str | None, head_rev: str | None, threshold: float):
+    """Rows of the comparison table, and the number of regressions."""
+    rows, regressions = [], 0
+    for framework, dirname in FRAMEWORKS.items():
+        base, head = pick_builds(results_db.bench_builds(conn, dirname), base_rev, head_rev)
+        if base is None or head is None:
+            continue
+        before = results_db.bench_values(conn, dirname, base)
+        after = results_db.bench_values(conn, dirname, head)
+        change = describe_change(base, head, dirname)
+        for metric in sorted(set(before) & set(after)):
+            point, low, high = relative_change(before[metric], after[metric])
+            result = verdict(low, high, threshold)
+            regressions += result == "REGRESSION"
+            interval = "–" if low is None else f"[{low:+.1%}, {high:+.1%}]"
+            rows.append([framework, LABELS.get(metric, metric), change,
+                         f"{np.mean(before[metric]):,.4g} (n={len(before[metric])})",
+                         f"{np.mean(after[metric]):,.4g} (n={len(after[metric])})",
+                         f"{point:+.1%}", interval, result])
+    return rows, regressions
+
+
+# ── Trend report ──────────────────────────────────────────────────────────────
+def trend_svg(series: dict[str, list[float]], width: int = 640, height: int = 220) -> str:
+    """A line chart of each framework's per-build means (inline SVG)."""
+    pad, values = 40, [v for points in series.values() for v in points]
+    top, bottom = max(values), min(min(values), 0)
+    span = (top - bottom) or 1
+    longest = max(len(points) for points in series.values())
+
+    def xy(i, v):
+        x = pad + (width - 2 * pad) * (i / max(longest - 1, 1))
+        y = height - pad - (height - 2 * pad) * (v - bottom) / span
+        return f"{x:.1f},{y:.1f}"
+
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+             f'font-family="sans-serif" font-size="11">',
+             f'<line x1="{pad}" y1="{height - pad}" x2="{width - pad}" y2="{height - pad}" '
+             'stroke="#999"/>',
+             f'<text x="4" y="{pad}">{top:,.4g}</text>',
+             f'<text x="4" y="{height - pad}">{bottom:,.4g}</text>',
+             f'<text x="{width - pad}" y="{height - pad + 16}" text-anchor="end">'
+             'build →</text>']
+    for n, (dirname, points) in enumerate(series.items()):
+        color = COLORS.get(dirname, "#333")
+        # Right-align series so every framework's latest build is at the end.
+        offset = longest - len(points)
+        path = " ".join(xy(offset + i, v) for i, v in enumerate(points))
+        parts.append(f'<polyline fill="none" stroke="{color}" stroke-width="2" points="{path}"/>')
+        parts.append(f'<text x="{pad + 90 * n}" y="14" fill="{color}">{dirname}</text>')
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def report(conn, threshold: float) -> str:
+    """Markdown section with one trend chart per metric and the latest changes."""
+    series = {}
+    for dirname in FRAMEWORKS.values():
+        for build in results_db.bench_builds(conn, dirname):
+            for metric, values in results_db.bench_values(conn, dirname, build).items():
+                series.setdefault(metric, {}).setdefault(dirname, []).append(float(np.mean(values)))
+    if not series:
+        return "No benchmark history recorded yet (run a benchmark with `--save`).\n"
+
+    lines = ["Mean of each build (git commit, app content and framework version) per "
+             "framework, oldest to newest. Lower is better.", ""]
+    for metric in sorted(series, key=lambda m: list(LABELS).index(m) if m in LABELS else 99):
+        lines += [f"#### {LABELS.get(metric, metric)}", "", "```{=html}",
+                  trend_svg(series[metric]), "```", ""]
+    rows, _ = compare(conn, None, None, threshold)
+    if rows:
+        lines += ["#### Latest change per framework", "", markdown_table(
+            ["Framework", "Metric", "Change", "Before", "After", "Δ mean", "95% CI", "Verdict"],
+            rows,
+        ), ""]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    cmp = commands.add_parser("compare", help="flag significant changes between two builds")
+    cmp.add_argument("--base", metavar="REV", help="git revision of the baseline build")
+    cmp.add_argument("--head", metavar="REV", help="git revision of the new build")
+    rep = commands.add_parser("report", help="write the trend section for index.qmd")
+    rep.add_argument("--out", type=Path, default=REPORT_PATH)
+    for sub in (cmp, rep):
+        sub.add_argument("--threshold", type=float, default=0.05,
+                         help="relative change the whole CI must exceed (default 5%%)")
+    args = parser.parse_args()
+
+    with closing(results_db.connect()) as conn:
+        if args.command == "compare":
+            rows, regressions = compare(conn, args.base, args.head, args.threshold)
+            if not rows:
+                print("No two builds to compare; run a benchmark with --save on each.")
+                return
+            print(markdown_table(
+                ["Framework", "Metric", "Change", "Before", "After", "Δ mean",
+                 "95% CI", "Verdict"],
+                rows,
+            ))
+            if regressions:
+                print(f"\n{regressions} significant regression(s)")
+                sys.exit(1)
+        else:
+            args.out.write_text(report(conn, args.threshold), encoding="utf-8")
+            print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Four separate servers versus all four apps in one host.py process.
+
+Serves the apps the usual way (one process per framework) and then from
+``host.py`` (one ASGI process plus its Streamlit sidecar). In both setups one
+browser session per app loads the page and plays the scenario; the table
+shows how long each server took to accept connections, each app's first
+render, and the resident memory of all server processes together afterwards.
+
+Run:
+    python -m bench.host --settle 3
+"""
+
+import argparse
+import time
+from contextlib import ExitStack
+
+from playwright.sync_api import sync_playwright
+
+from bench.common import (
+    FRAMEWORKS,
+    HOST_PATHS,
+    SCENARIO_STEPS,
+    markdown_table,
+    play_setup,
+    rss_bytes,
+    serve,
+    serve_host,
+)
+
+
+def _session(browser, url: str, dirname: str) -> float:
+    """Load one app, play the scenario, and return the first render (ms)."""
+    page = browser.new_page()
+    t0 = time.perf_counter()
+    page.goto(url)
+    page.get_by_text("Total Bill").first.wait_for(timeout=90_000)
+    first_render = (time.perf_counter() - t0) * 1000
+    play_setup(page, dirname)
+    for _, action in SCENARIO_STEPS[dirname]:
+        action(page)
+        page.wait_for_timeout(200)
+    page.wait_for_load_state("networkidle")
+    return first_render
+
+
+def measure_separate(browser, settle: float) -> dict:
+    with ExitStack() as stack:
+        running = {d: stack.enter_context(serve(d)) for d in FRAMEWORKS.values()}
+        renders = {d: _session(browser, app.url, d) for d, app in running.items()}
+        time.sleep(settle)
+        return {
+            "ready_s": max(app.ready_s for app in running.values()),
+            "renders": renders,
+            "rss": sum(rss_bytes(app.proc.pid) for app in running.values()),
+        }
+
+
+def measure_host(browser, settle: float) -> dict:
+    with serve_host() as host:
+        renders = {d: _session(browser, host.url + HOST_PATHS[d], d)
+                   for d in FRAMEWORKS.values()}
+        time.sleep(settle)
+        return {"ready_s": host.ready_s, "renders": renders,
+                "rss": rss_bytes(host.proc.pid)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--settle", type=float, default=3.0,
+                        help="seconds to wait before measuring memory")
+    args = parser.parse_args()
+
+    with sync_playwright() as pw:
+        browser = pw.chromium.launch()
+        results = {
+            "4 processes": measure_separate(browser, args.settle),
+            "host.py": measure_host(browser, args.settle),
+        }
+        browser.close()
+
+    rows = [
+        [setup, f"{r['ready_s']:.1f}"]
+        + [f"{r['renders'][d]:,.0f}" for d in FRAMEWORKS.values()]
+        + [f"{r['rss'] / 2**20:,.0f}"]
+        for setup, r in results.items()
+    ]
+    print(markdown_table(
+        ["Setup", "Ready (s)", *(f"{f} first render (ms)" for f in FRAMEWORKS),
+         "Total RSS (MiB)"],
+        rows,
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Interaction latency and bytes over the wire for every app.
+
+Plays each app's scenario steps in headless Chromium. For every step it
+measures the time from the action until the server's last response (once the
+page has been quiet for a moment), and the bytes received as websocket
+frames and HTTP responses. This works the same for all four frameworks.
+Framework-specific setup steps (see SETUP_STEPS) are listed but left out of
+the saved per-interaction means.
+
+``--save`` stores the per-interaction means in ``<app>/perf.json``, which
+``eval_apps.py`` feeds into the efficiency criterion.
+
+Run:
+    python -m bench.interactions --repeat 5 --save
+"""
+
+import argparse
+import time
+from collections import defaultdict
+
+from playwright.sync_api import sync_playwright
+
+from bench.common import (
+    FRAMEWORKS,
+    SCENARIO_STEPS,
+    WireRecorder,
+    all_steps,
+    markdown_table,
+    save_metrics,
+    serve,
+    summarize,
+    wait_quiet,
+)
+
+
+def measure(dirname: str, repeat: int = 5, path=None) -> dict:
+    """Latency (ms) and received bytes per scenario step, over ``repeat`` runs."""
+    results = defaultdict(lambda: defaultdict(list))
+    with serve(dirname, path) as running, sync_playwright() as pw:
+        browser = pw.chromium.launch()
+        for _ in range(repeat):
+            page = browser.new_page()
+            recorder = WireRecorder().attach(page)
+            page.goto(running.url)
+            page.get_by_text("Total Bill").first.wait_for(timeout=60_000)
+            page.wait_for_load_state("networkidle")
+
+            for name, action in all_steps(dirname):
+                mark, t0 = recorder.mark(), time.perf_counter()
+                action(page)
+                last = wait_quiet(page, recorder, t0)
+                received = sum(f.size for f in recorder.since(mark) if not f.sent)
+                received += sum(r.response_bytes() for r in recorder.requests_after(t0))
+                results[name]["ms"].append((last - t0) * 1000)
+                results[name]["bytes"].append(received)
+            page.close()
+        browser.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", action="store_true",
+                        help="write the means to <app>/perf.json")
+    args = parser.parse_args()
+
+    for framework, dirname in FRAMEWORKS.items():
+        results = measure(dirname, args.repeat)
+        rows = []
+        for name, _ in all_steps(dirname):
+            ms = summarize(results[name]["ms"])
+            received = summarize(results[name]["bytes"])
+            rows.append([name, f"{ms['mean']:.0f} ± {ms['stdev']:.0f}",
+                         f"{received['mean']:,.0f}"])
+        print(f"### {framework}\n")
+        print(markdown_table(["Interaction", "Latency (ms)", "Bytes received"], rows))
+        print()
+
+        if args.save:
+            # One sample per repetition (mean over its steps) for the history.
+            per_run = {
+                key: [sum(run) / len(run)
+                      for run in zip(*(results[name][field]
+                                       for name, _ in SCENARIO_STEPS[dirname]))]
+                for key, field in (("interaction_latency_ms", "ms"),
+                                   ("bytes_per_interaction", "bytes"))
+            }
+            save_metrics(
+                dirname,
+                samples=per_run,
+                **{key: summarize(values)["mean"] for key, values in per_run.items()},
+            )
+
+
+if __name__ == "__main__":
+    main()
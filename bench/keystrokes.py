@@ -0,0 +1,157 @@
+"""
+Server invocations per typed value, for every app and input-debounce window.
+
+Types the scenario bill ("85.50") one key at a time into each app's bill
+field, and a custom tip ("20.5") into its tip % field where that is typed
+(Dash, Shiny), then tabs out, and counts the server-side work it caused:
+
+  * Streamlit: script runs (``script_finished`` messages)
+  * Dash: ``/_dash-update-component`` callback requests
+  * Panel: ``PATCH-DOC`` messages
+  * Shiny: output ``values`` messages
+
+Dash and Shiny read the window from ``TIP_INPUT_DEBOUNCE`` (seconds);
+Streamlit and Panel commit numeric inputs on Enter/blur regardless.
+
+``--save`` stores invocations per typed key over all of an app's typed
+fields, measured with the last window given, in ``<app>/perf.json`` for
+``eval_apps.py``.
+
+Run:
+    python -m bench.keystrokes --windows 0 0.4
+"""
+
+import argparse
+import json
+import os
+import time
+
+from playwright.sync_api import sync_playwright
+
+from bench.common import (
+    BILL_INPUT,
+    FRAMEWORKS,
+    SCENARIO,
+    TIP_INPUT,
+    WireRecorder,
+    markdown_table,
+    save_metrics,
+    serve,
+    summarize,
+)
+from bench.panel_patches import bokeh_messages
+from bench.streamlit_reruns import decode_forward_msgs
+
+
+def _shiny_value_messages(frames):
+    count = 0
+    for frame in frames:
+        if frame.sent or frame.payload[:1] != b"{":
+            continue
+        try:
+            msg = json.loads(frame.payload)
+        except ValueError:
+            continue
+        if isinstance(msg, dict) and msg.get("values"):
+            count += 1
+    return count
+
+
+# How to count server invocations from what the browser saw since a mark.
+COUNTERS = {
+    "streamlit": lambda rec, mark, t0: sum(
+        1 for _, kind in decode_forward_msgs(rec.since(mark))
+        if kind == "script_finished"
+    ),
+    "dash": lambda rec, mark, t0: sum(
+        1 for r in rec.requests_after(t0)
+        if r.method == "POST" and r.url.endswith("/_dash-update-component")
+    ),
+    "panel": lambda rec, mark, t0: sum(
+        1 for msgtype, _ in bokeh_messages(rec.since(mark))
+        if msgtype == "PATCH-DOC"
+    ),
+    "shiny": lambda rec, mark, t0: _shiny_value_messages(rec.since(mark)),
+}
+
+
+# Typed fields: name -> (locators per app, text typed into them).
+FIELDS = {
+    "bill": (BILL_INPUT, f"{SCENARIO['bill']:.2f}"),
+    "tip": (TIP_INPUT, f"{SCENARIO['tip_pct'] + 0.5:g}"),
+}
+
+
+def typed_fields(dirname: str) -> list[str]:
+    return [name for name, (locators, _) in FIELDS.items() if dirname in locators]
+
+
+def measure(dirname: str, window: float, field: str = "bill", repeat: int = 3,
+            key_delay_ms: int = 150, settle: float = 1.0) -> list[int]:
+    """Invocations caused by typing into ``field`` once, per repetition."""
+    env = dict(os.environ, TIP_INPUT_DEBOUNCE=str(window))
+    locators, typed = FIELDS[field]
+    counts = []
+    with serve(dirname, env=env) as running, sync_playwright() as pw:
+        browser = pw.chromium.launch()
+        for _ in range(repeat):
+            page = browser.new_page()
+            recorder = WireRecorder().attach(page)
+            page.goto(running.url)
+            box = locators[dirname](page)
+            box.wait_for()
+            page.wait_for_load_state("networkidle")
+            box.select_text()
+            page.wait_for_timeout(settle * 1000)
+
+            mark, t0 = recorder.mark(), time.perf_counter()
+            box.press_sequentially(typed, delay=key_delay_ms)
+            box.press("Tab")
+            page.wait_for_timeout((window + settle) * 1000)
+            counts.append(COUNTERS[dirname](recorder, mark, t0))
+            page.close()
+        browser.close()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--windows", type=float, nargs="+", default=[0.0, 0.4],
+                        help="debounce windows (seconds) to compare")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--key-delay-ms", type=int, default=150,
+                        help="pause between keystrokes while typing")
+    parser.add_argument("--save", action="store_true",
+                        help="write invocations per keystroke to <app>/perf.json")
+    args = parser.parse_args()
+
+    rows = []
+    for framework, dirname in FRAMEWORKS.items():
+        per_run = [0] * args.repeat  # last window, summed over the fields
+        for field in typed_fields(dirname):
+            row = [framework, field]
+            for window in args.windows:
+                counts = measure(dirname, window, field, args.repeat,
+                                 args.key_delay_ms)
+                row.append(f"{summarize(counts)['mean']:.1f}")
+            rows.append(row)
+            per_run = [n + count for n, count in zip(per_run, counts)]
+        if args.save:
+            keys = sum(len(FIELDS[field][1]) for field in typed_fields(dirname))
+            per_key = [count / keys for count in per_run]
+            save_metrics(
+                dirname,
+                samples={"invocations_per_keystroke": per_key},
+                invocations_per_keystroke=summarize(per_key)["mean"],
+            )
+
+    print("Server invocations after typing " + ", ".join(
+        f"{typed!r} into the {field} field" for field, (_, typed) in FIELDS.items()
+    ) + " and tabbing out\n")
+    print(markdown_table(
+        ["Framework", "Field"] + [f"window {w:g}s" for w in args.windows], rows
+    ))
+
+
+if __name__ == "__main__":
+    main()
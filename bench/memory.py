@@ -0,0 +1,172 @@
+"""
+Per-session memory accounting for the four generated apps.
+
+Each app is served with ``bench/memprobe`` injected (``tracemalloc`` plus a
+small control socket), then sessions are opened programmatically as separate
+browser contexts. After every phase the server's RSS (via psutil) and its
+traced Python heap (after ``gc.collect()``) are recorded:
+
+  baseline  one warm-up session opened, used and closed
+  idle      N sessions loaded but untouched
+  active    the same N sessions after playing the scenario
+  closed    all N sessions closed and given time to be cleaned up
+
+Per-session costs are the deltas from the baseline divided by N; "leaked"
+is what remains after close. ``--top`` lists the source lines that grew the
+most between baseline and active, from tracemalloc snapshots. ``--save``
+stores the RSS per active session in ``<app>/perf.json`` for ``eval_apps.py``.
+
+Run:
+    python -m bench.memory --sessions 20 --top 5
+"""
+
+import argparse
+import json
+import os
+import socket
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from playwright.sync_api import sync_playwright
+
+from bench.common import (
+    FRAMEWORKS,
+    SCENARIO_STEPS,
+    free_port,
+    markdown_table,
+    play_setup,
+    rss_bytes,
+    save_metrics,
+    serve,
+)
+
+PROBE_DIR = Path(__file__).resolve().parent / "memprobe"
+
+# Make servers drop closed sessions quickly instead of after their defaults.
+CLEANUP_ARGS = {
+    "panel": ["--check-unused-sessions", "1000", "--unused-session-lifetime", "1000"],
+}
+
+
+def probe(port: int, command: str = "stats") -> dict:
+    """Send one command to the memprobe inside the app server."""
+    with socket.create_connection(("127.0.0.1", port), timeout=60) as conn:
+        conn.sendall(command.encode() + b"\n")
+        return json.loads(conn.makefile().readline())
+
+
+def _open_session(browser, url: str):
+    context = browser.new_context()
+    page = context.new_page()
+    page.goto(url)
+    page.get_by_text("Total Bill").first.wait_for(timeout=60_000)
+    page.wait_for_load_state("networkidle")
+    return context, page
+
+
+def _play(page, dirname: str):
+    play_setup(page, dirname)
+    for _, action in SCENARIO_STEPS[dirname]:
+        action(page)
+        page.wait_for_timeout(200)
+    page.wait_for_load_state("networkidle")
+
+
+def measure(dirname: str, sessions: int, settle: float, top: int) -> dict:
+    """RSS and traced heap of one app's server after each phase."""
+    probe_port = free_port()
+    env = dict(
+        os.environ,
+        BENCH_MEMPROBE_PORT=str(probe_port),
+        PYTHONPATH=os.pathsep.join(
+            filter(None, [str(PROBE_DIR), os.environ.get("PYTHONPATH")])
+        ),
+    )
+    snapshots = Path(tempfile.mkdtemp(prefix="bench-memory-"))
+    phases = {}
+    growth = []
+    with serve(dirname, env=env, extra_args=CLEANUP_ARGS.get(dirname)) as running, \
+            sync_playwright() as pw:
+        browser = pw.chromium.launch()
+
+        def record(phase: str):
+            time.sleep(settle)
+            phases[phase] = {
+                "rss": rss_bytes(running.proc.pid),
+                "traced": probe(probe_port)["traced"],
+            }
+
+        context, page = _open_session(browser, running.url)
+        _play(page, dirname)
+        context.close()
+        record("baseline")
+        probe(probe_port, f"snapshot {snapshots / 'baseline.dump'}")
+
+        opened = [_open_session(browser, running.url) for _ in range(sessions)]
+        record("idle")
+
+        for _, page in opened:
+            _play(page, dirname)
+        record("active")
+        probe(probe_port, f"snapshot {snapshots / 'active.dump'}")
+
+        for context, _ in opened:
+            context.close()
+        record("closed")
+        browser.close()
+
+    if top:
+        base = tracemalloc.Snapshot.load(str(snapshots / "baseline.dump"))
+        active = tracemalloc.Snapshot.load(str(snapshots / "active.dump"))
+        growth = active.compare_to(base, "lineno")[:top]
+    return {"phases": phases, "growth": growth}
+
+
+def per_session(phases: dict, key: str, phase: str, sessions: int) -> float:
+    return (phases[phase][key] - phases["baseline"][key]) / sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--settle", type=float, default=3.0,
+                        help="seconds to wait before each measurement")
+    parser.add_argument("--top", type=int, default=0,
+                        help="show the N source lines that grew the most")
+    parser.add_argument("--save", action="store_true",
+                        help="write the per-session memory to <app>/perf.json")
+    args = parser.parse_args()
+
+    rows, growth = [], {}
+    for framework, dirname in FRAMEWORKS.items():
+        result = measure(dirname, args.sessions, args.settle, args.top)
+        phases = result["phases"]
+        growth[framework] = result["growth"]
+        row = [framework, f"{phases['baseline']['rss'] / 2**20:.1f}"]
+        for phase in ("idle", "active", "closed"):
+            row.append(
+                f"{per_session(phases, 'rss', phase, args.sessions) / 1024:,.0f}"
+                f" / {per_session(phases, 'traced', phase, args.sessions) / 1024:,.0f}"
+            )
+        rows.append(row)
+        if args.save:
+            active_kib = per_session(phases, "rss", "active", args.sessions) / 1024
+            save_metrics(dirname, memory_per_session_kib=active_kib)
+
+    print(f"Per-session memory in KiB, RSS / traced heap ({args.sessions} sessions)\n")
+    print(markdown_table(
+        ["Framework", "Baseline RSS (MiB)", "Idle session", "Active session",
+         "Leaked after close"],
+        rows,
+    ))
+    for framework, stats in growth.items():
+        if stats:
+            print(f"\n### {framework}: largest growth, baseline → active\n")
+            for stat in stats:
+                print(f"    {stat}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Memory probe loaded into an app server by ``bench.memory``.
+
+``bench.memory`` puts this directory first on ``PYTHONPATH`` so Python imports
+it at startup (it shadows any other ``sitecustomize`` for that process). When
+``BENCH_MEMPROBE_PORT`` is set it starts ``tracemalloc`` and a tiny control
+server on that port answering one-line commands:
+
+    stats            -> {"traced": <bytes>, "peak": <bytes>}   (after gc)
+    snapshot <path>  -> dumps a tracemalloc snapshot to <path>
+"""
+
+import gc
+import json
+import os
+import socketserver
+import threading
+import tracemalloc
+
+
+class _ProbeHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        command, _, arg = self.rfile.readline().decode().strip().partition(" ")
+        gc.collect()
+        if command == "snapshot":
+            tracemalloc.take_snapshot().dump(arg)
+            reply = {"path": arg}
+        else:
+            traced, peak = tracemalloc.get_traced_memory()
+            reply = {"traced": traced, "peak": peak}
+        self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+
+def _start(port: int):
+    try:
+        server = socketserver.ThreadingTCPServer(("127.0.0.1", port), _ProbeHandler)
+    except OSError:
+        return  # a child process of the probed server; the parent owns the port
+    tracemalloc.start(int(os.environ.get("BENCH_MEMPROBE_FRAMES", "1")))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+
+if os.environ.get("BENCH_MEMPROBE_PORT"):
+    _start(int(os.environ["BENCH_MEMPROBE_PORT"]))
@@ -0,0 +1,149 @@
+"""
+Document patches, websocket bytes and server CPU per interaction for the
+Panel app.
+
+Drives the standard scenario in headless Chromium and groups the frames the
+Bokeh server sends into protocol messages (header, metadata, content and
+buffers). For each interaction it reports the number of ``PATCH-DOC``
+messages, the model events they carry, the bytes received and the CPU time
+the server spent. ``--trace`` also prints every event of every patch, which
+shows whether one click was coalesced into a single patch.
+
+Compare the current app against an older revision with:
+    python -m bench.panel_patches --compare HEAD~1
+"""
+
+import argparse
+import json
+from collections import defaultdict
+
+from playwright.sync_api import sync_playwright
+
+from bench.common import (
+    SCENARIO_STEPS,
+    WireRecorder,
+    app_at_revision,
+    app_path,
+    cpu_seconds,
+    markdown_table,
+    serve,
+    summarize,
+    wait_until,
+)
+
+
+def bokeh_messages(frames):
+    """Group received frames into Bokeh messages.
+
+    Returns ``(msgtype, frames)`` pairs; a message starts at every header
+    frame, i.e. a JSON object carrying a ``msgtype``.
+    """
+    messages = []
+    for frame in frames:
+        if frame.sent:
+            continue
+        header = None
+        if frame.payload[:1] == b"{":
+            try:
+                header = json.loads(frame.payload)
+            except ValueError:
+                pass
+        if isinstance(header, dict) and "msgtype" in header:
+            messages.append((header["msgtype"], [frame]))
+        elif messages:
+            messages[-1][1].append(frame)
+    return messages
+
+
+def patch_events(frames) -> list[dict]:
+    """Model events in one PATCH-DOC message (its content is the 3rd frame)."""
+    if len(frames) < 3:
+        return []
+    return json.loads(frames[2].payload).get("events", [])
+
+
+def describe_event(event: dict) -> str:
+    """One-line summary of a patch event, e.g. ``ModelChanged text``."""
+    detail = event.get("attr") or event.get("model", {}).get("type", "")
+    return f"{event.get('kind', '?')} {detail}".strip()
+
+
+def _patches(recorder, mark):
+    return [m for m in bokeh_messages(recorder.since(mark)) if m[0] == "PATCH-DOC"]
+
+
+def measure(path, repeat: int = 5, settle: float = 0.5,
+            trace: bool = False) -> dict:
+    """Run the scenario ``repeat`` times against one app file."""
+    results = defaultdict(lambda: defaultdict(list))
+    with serve("panel", path) as running, sync_playwright() as pw:
+        browser = pw.chromium.launch()
+        for _ in range(repeat):
+            page = browser.new_page()
+            recorder = WireRecorder().attach(page)
+            page.goto(running.url)
+            page.wait_for_load_state("networkidle")
+
+            for name, action in SCENARIO_STEPS["panel"]:
+                mark = recorder.mark()
+                cpu_start = cpu_seconds(running.proc.pid)
+                action(page)
+                wait_until(page, lambda: _patches(recorder, mark), settle=settle)
+                patches = _patches(recorder, mark)
+                stats = results[name]
+                events = [patch_events(frames) for _, frames in patches]
+                stats["patches"].append(len(patches))
+                stats["events"].append(sum(len(e) for e in events))
+                stats["bytes"].append(
+                    sum(f.size for _, frames in patches for f in frames)
+                )
+                stats["cpu_ms"].append(
+                    (cpu_seconds(running.proc.pid) - cpu_start) * 1000
+                )
+                if trace:
+                    print(f"[{name}]")
+                    for i, patch in enumerate(events, 1):
+                        print(f"  patch {i}: " + ", ".join(map(describe_event, patch)))
+            page.close()
+        browser.close()
+    return results
+
+
+def report(label: str, results: dict) -> str:
+    rows = []
+    for name, _ in SCENARIO_STEPS["panel"]:
+        stats = {k: summarize(v) for k, v in results[name].items()}
+        rows.append([
+            name,
+            f"{stats['patches']['mean']:.1f}",
+            f"{stats['events']['mean']:.1f}",
+            f"{stats['bytes']['mean']:,.0f}",
+            f"{stats['cpu_ms']['mean']:.1f} ± {stats['cpu_ms']['stdev']:.1f}",
+        ])
+    table = markdown_table(
+        ["Interaction", "PATCH-DOC messages", "Model events", "Bytes received",
+         "Server CPU (ms)"],
+        rows,
+    )
+    return f"### {label}\n\n{table}\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--compare", metavar="REV",
+                        help="also measure panel/app.py as of this git revision")
+    parser.add_argument("--trace", action="store_true",
+                        help="print the events of every patch per interaction")
+    args = parser.parse_args()
+
+    if args.compare:
+        with app_at_revision("panel", args.compare) as old_path:
+            results = measure(old_path, args.repeat, trace=args.trace)
+            print(report(args.compare, results))
+    results = measure(app_path("panel"), args.repeat, trace=args.trace)
+    print(report("current", results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+First paint and session-burst cost for the Panel app under different
+``panel serve`` modes.
+
+For each serving mode it measures:
+  * first paint for new visitors: first-contentful-paint and the time until
+    the results card is rendered, each in a fresh browser context;
+  * a burst of new sessions: N concurrent page requests (each one creates a
+    Bokeh document server-side), reporting wall time and p50/p95 latency.
+
+Run:
+    python -m bench.panel_sessions --burst 32 --procs 4
+"""
+
+import argparse
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from playwright.sync_api import sync_playwright
+
+from bench.common import markdown_table, serve, summarize
+
+
+def serving_modes(procs: int) -> dict[str, list[str]]:
+    """``panel serve`` arguments for each mode being compared."""
+    warm = ["--warm", "--reuse-sessions"]
+    return {
+        "default": [],
+        "warm + reuse sessions": warm,
+        f"warm + reuse sessions, {procs} procs": warm + ["--num-procs", str(procs)],
+    }
+
+
+def first_paint(url: str, visitors: int) -> dict:
+    """Paint timings (ms) for ``visitors`` brand-new browser contexts."""
+    fcp, ready = [], []
+    with sync_playwright() as pw:
+        browser = pw.chromium.launch()
+        for _ in range(visitors):
+            context = browser.new_context()
+            page = context.new_page()
+            start = time.perf_counter()
+            page.goto(url)
+            page.get_by_text("Total Bill").wait_for()
+            ready.append((time.perf_counter() - start) * 1000)
+            fcp.append(page.evaluate(
+                "performance.getEntriesByName('first-contentful-paint')[0]"
+                "?.startTime ?? NaN"
+            ))
+            context.close()
+        browser.close()
+    return {"fcp_ms": summarize(fcp), "ready_ms": summarize(ready)}
+
+
+def _fetch(url: str) -> float:
+    start = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=120) as response:
+        response.read()
+    return (time.perf_counter() - start) * 1000
+
+
+def session_burst(url: str, sessions: int) -> dict:
+    """Open ``sessions`` pages concurrently; wall time and latency spread."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        latencies = sorted(pool.map(_fetch, [url] * sessions))
+    wall = (time.perf_counter() - start) * 1000
+    return {
+        "wall_ms": wall,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--visitors", type=int, default=5)
+    parser.add_argument("--burst", type=int, default=32)
+    parser.add_argument("--procs", type=int, default=4)
+    args = parser.parse_args()
+
+    rows = []
+    for mode, extra_args in serving_modes(args.procs).items():
+        with serve("panel", extra_args=extra_args) as running:
+            # Prime the server once so every mode is measured after its
+            # first request, which is when --reuse-sessions kicks in.
+            _fetch(running.url)
+            paint = first_paint(running.url, args.visitors)
+            burst = session_burst(running.url, args.burst)
+        rows.append([
+            mode,
+            f"{running.ready_s:.2f}",
+            f"{paint['fcp_ms']['mean']:.0f}",
+            f"{paint['ready_ms']['mean']:.0f} ± {paint['ready_ms']['stdev']:.0f}",
+            f"{burst['wall_ms']:.0f}",
+            f"{burst['p50_ms']:.0f} / {burst['p95_ms']:.0f}",
+        ])
+
+    print(markdown_table(
+        ["Mode", "Server ready (s)", "FCP (ms)", "Results rendered (ms)",
+         f"Burst of {args.burst} (ms)", "Burst p50 / p95 (ms)"],
+        rows,
+    ))
+
+
+if __name__ == "__main__":
+    main()
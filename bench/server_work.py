@@ -0,0 +1,194 @@
+"""
+Server work per user action, counted inside each app's server.
+
+Each app is served with ``bench/workprobe`` injected, which hooks the
+framework as it is imported and records every script rerun or fragment run
+(Streamlit), callback dispatch (Dash), param watcher, browser event batch and
+pane update (Panel), and reactive invalidation, calc, effect and output render
+(Shiny), with its duration. The scenario is played in headless Chromium and
+the events are collected after each step, giving a comparable trace of the
+work each generated app does per interaction.
+
+The hooks the probe installed are printed for each app. A hook that is
+missing (its framework moved the target) makes every count of that kind 0,
+so it is reported as a warning.
+
+``--json`` writes the per-step counts; ``--check`` compares a run against such
+a file and exits non-zero when any step now does more work, so redundant
+callbacks or renders introduced into an app show up as a regression. It also
+fails when an expected hook is missing, since zero counts would then pass.
+
+Run:
+    python -m bench.server_work --trace
+    python -m bench.server_work --json work.json
+    python -m bench.server_work --check work.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from playwright.sync_api import sync_playwright
+
+from bench.common import (
+    FRAMEWORKS,
+    SCENARIO_STEPS,
+    WireRecorder,
+    free_port,
+    markdown_table,
+    play_setup,
+    serve,
+    wait_quiet,
+)
+from bench.memory import probe
+
+PROBE_DIR = Path(__file__).resolve().parent / "workprobe"
+KINDS = ("rerun", "fragment", "callback", "watcher", "calc", "effect",
+         "invalidation", "render")
+
+# Probe hooks each app's counts depend on (suffixes of the reported names).
+EXPECTED_HOOKS = {
+    "streamlit": ("ScriptRunner._run_script",),
+    "dash": ("Dash.dispatch",),
+    "panel": ("Parameters._call_watcher", "Syncable._process_events",
+              "PaneBase._update_pane"),
+    "shiny": ("Context.invalidate", "Calc_.update_value", "Effect_._run",
+              "Renderer.render"),
+}
+
+
+def measure(dirname: str, repeat: int = 3) -> tuple[dict, dict]:
+    """Per scenario step: the server events of each repetition; and the
+    probe's ``hooks`` and ``skipped`` lists."""
+    probe_port = free_port()
+    env = dict(
+        os.environ,
+        BENCH_WORKPROBE_PORT=str(probe_port),
+        PYTHONPATH=os.pathsep.join(
+            filter(None, [str(PROBE_DIR), os.environ.get("PYTHONPATH")])
+        ),
+    )
+    steps = defaultdict(list)
+    reply = {}
+    with serve(dirname, env=env) as running, sync_playwright() as pw:
+        browser = pw.chromium.launch()
+        for _ in range(repeat):
+            page = browser.new_page()
+            recorder = WireRecorder().attach(page)
+            page.goto(running.url)
+            page.get_by_text("Total Bill").first.wait_for(timeout=60_000)
+            page.wait_for_load_state("networkidle")
+            play_setup(page, dirname)
+
+            for name, action in SCENARIO_STEPS[dirname]:
+                probe(probe_port, "reset")
+                t0 = time.perf_counter()
+                action(page)
+                wait_quiet(page, recorder, t0)
+                reply = probe(probe_port, "events")
+                steps[name].append(reply["events"])
+            page.close()
+        browser.close()
+    return steps, {"hooks": reply.get("hooks", []),
+                   "skipped": reply.get("skipped", [])}
+
+
+def missing_hooks(dirname: str, installed: list[str]) -> list[str]:
+    """Expected hooks of ``dirname`` that the probe did not install."""
+    return [hook for hook in EXPECTED_HOOKS.get(dirname, ())
+            if not any(name.endswith(f".{hook}") for name in installed)]
+
+
+def step_counts(runs: list[list[dict]]) -> dict[str, float]:
+    """Mean number of events of each kind over the repetitions of one step."""
+    totals = Counter(e["kind"] for events in runs for e in events)
+    return {kind: totals[kind] / len(runs) for kind in KINDS}
+
+
+def step_ms(runs: list[list[dict]]) -> float:
+    """Mean server time per repetition, counting only top-level work."""
+    top = ("rerun", "fragment", "callback", "effect")
+    return sum(e["ms"] for events in runs for e in events if e["kind"] in top) / len(runs)
+
+
+def trace_lines(events: list[dict]) -> list[str]:
+    """``kind label ×n (ms)`` lines, in order of first occurrence."""
+    grouped = {}
+    for e in events:
+        key = (e["kind"], e["label"])
+        n, ms = grouped.get(key, (0, 0.0))
+        grouped[key] = (n + 1, ms + e["ms"])
+    return [f"{kind:12s} {label} ×{n} ({ms:.1f} ms)"
+            for (kind, label), (n, ms) in grouped.items()]
+
+
+def regressions(current: dict, baseline: dict) -> list[str]:
+    """Steps whose event counts grew compared with the baseline."""
+    found = []
+    for dirname, steps in current.items():
+        for step, counts in steps.items():
+            before = baseline.get(dirname, {}).get(step)
+            if before is None:
+                continue
+            for kind, n in counts.items():
+                if n > before.get(kind, 0) + 1e-9:
+                    found.append(f"{dirname} / {step}: {kind} {before.get(kind, 0):g} → {n:g}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--trace", action="store_true",
+                        help="print the events of the first repetition of each step")
+    parser.add_argument("--json", type=Path, metavar="PATH",
+                        help="write the per-step counts to PATH")
+    parser.add_argument("--check", type=Path, metavar="PATH",
+                        help="fail if any step does more work than in PATH")
+    args = parser.parse_args()
+
+    counts = {}
+    missing = {}
+    for framework, dirname in FRAMEWORKS.items():
+        steps, hooks = measure(dirname, args.repeat)
+        counts[dirname] = {name: step_counts(runs) for name, runs in steps.items()}
+        rows = []
+        for name, runs in steps.items():
+            c = counts[dirname][name]
+            rows.append([name] + [f"{c[k]:g}" for k in KINDS] + [f"{step_ms(runs):.1f}"])
+        print(f"### {framework}\n")
+        print(markdown_table(["Interaction", *KINDS, "Server ms"], rows))
+        if args.trace:
+            for name, runs in steps.items():
+                print(f"\n[{name}]")
+                for line in trace_lines(runs[0]):
+                    print(f"  {line}")
+        print(f"\nHooks: {', '.join(hooks['hooks']) or 'none'}")
+        for line in hooks["skipped"]:
+            print(f"  skipped {line}")
+        missing[dirname] = missing_hooks(dirname, hooks["hooks"])
+        if missing[dirname]:
+            print(f"WARNING: {framework}: hooks not installed, their counts are 0: "
+                  f"{', '.join(missing[dirname])}", file=sys.stderr)
+        print()
+
+    if args.json:
+        args.json.write_text(json.dumps(counts, indent=2, sort_keys=True) + "\n",
+                             encoding="utf-8")
+    if args.check:
+        found = regressions(counts, json.loads(args.check.read_text(encoding="utf-8")))
+        for line in found:
+            print(f"MORE WORK: {line}")
+        for dirname, hooks in missing.items():
+            for hook in hooks:
+                print(f"MISSING HOOK: {dirname} / {hook}")
+        if found or any(missing.values()):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
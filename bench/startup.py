@@ -0,0 +1,170 @@
+"""
+Cold-start and time-to-first-response benchmark for each generated app.
+
+Every phase runs in a fresh interpreter and is repeated for stable numbers:
+
+  1. interpreter start        ``python -c pass``
+  2. framework import         ``python -X importtime -c "import <framework>"``
+  3. app module execution     the app file run once outside any server
+  4. port accepting           process launch until the port accepts connections
+  5. first rendered response  process launch until the page shows "Total Bill"
+
+``--save`` stores the mean launch-to-first-render time in ``<app>/perf.json``
+for ``eval_apps.py``. ``--breakdown`` also lists the packages that dominate each framework's
+import time, from the ``-X importtime`` self times.
+
+Run:
+    python -m bench.startup --repeat 5 --breakdown
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from playwright.sync_api import sync_playwright
+
+from bench.common import (
+    FRAMEWORKS,
+    REPO_ROOT,
+    app_path,
+    markdown_table,
+    save_metrics,
+    serve,
+    summarize,
+)
+
+# Runs an app file once with the framework already imported, and prints how
+# long the module body took. ``run_name`` avoids any ``__main__`` blocks.
+_EXEC_APP = (
+    "import importlib, runpy, sys, time; "
+    "importlib.import_module(sys.argv[2]); "
+    "t = time.perf_counter(); "
+    "runpy.run_path(sys.argv[1], run_name='bench_startup'); "
+    "print(time.perf_counter() - t)"
+)
+
+
+def _timed_run(args: list[str]) -> tuple[float, subprocess.CompletedProcess]:
+    start = time.perf_counter()
+    result = subprocess.run(args, cwd=REPO_ROOT, capture_output=True, text=True)
+    return time.perf_counter() - start, result
+
+
+def interpreter_start() -> float:
+    """Seconds for a bare ``python -c pass``."""
+    return _timed_run([sys.executable, "-c", "pass"])[0]
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """``(module, self_us, cumulative_us)`` rows from ``-X importtime``."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        rows.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return rows
+
+
+def framework_import(module: str) -> tuple[float, Counter]:
+    """Cumulative import time of ``module`` (s) and self time per package."""
+    _, result = _timed_run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+    )
+    rows = parse_importtime(result.stderr)
+    cumulative = next((cum for name, _, cum in rows if name == module), 0)
+    by_package = Counter()
+    for name, self_us, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+    return cumulative / 1e6, by_package
+
+
+def app_execution(dirname: str) -> float:
+    """Seconds spent executing the app module (framework pre-imported)."""
+    _, result = _timed_run(
+        [sys.executable, "-c", _EXEC_APP, str(app_path(dirname)), dirname]
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{dirname}/app.py failed:\n{result.stderr}")
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def serve_and_render(dirname: str, browser, path=None) -> tuple[float, float]:
+    """Seconds from launch until the port is open, and until first render."""
+    start = time.perf_counter()
+    with serve(dirname, path) as running:
+        port_s = time.perf_counter() - start
+        page = browser.new_page()
+        page.goto(running.url)
+        page.get_by_text("Total Bill").first.wait_for(timeout=120_000)
+        render_s = time.perf_counter() - start
+        page.close()
+    return port_s, render_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--breakdown", action="store_true",
+                        help="list the slowest packages in each framework import")
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--save", action="store_true",
+                        help="write the cold-start time to <app>/perf.json")
+    args = parser.parse_args()
+
+    samples = {fw: {k: [] for k in ("python", "import", "exec", "port", "render")}
+               for fw in FRAMEWORKS}
+    breakdowns = {}
+    with sync_playwright() as pw:
+        browser = pw.chromium.launch()
+        for _ in range(args.repeat):
+            for framework, dirname in FRAMEWORKS.items():
+                stats = samples[framework]
+                stats["python"].append(interpreter_start())
+                import_s, by_package = framework_import(dirname)
+                stats["import"].append(import_s)
+                breakdowns.setdefault(framework, Counter()).update(by_package)
+                stats["exec"].append(app_execution(dirname))
+                port_s, render_s = serve_and_render(dirname, browser)
+                stats["port"].append(port_s)
+                stats["render"].append(render_s)
+        browser.close()
+
+    def cell(values, scale=1000):
+        s = summarize(values)
+        return f"{s['mean'] * scale:.0f} ± {s['stdev'] * scale:.0f}"
+
+    rows = [
+        [fw, cell(s["python"]), cell(s["import"]), cell(s["exec"]),
+         cell(s["port"]), cell(s["render"])]
+        for fw, s in samples.items()
+    ]
+    if args.save:
+        for framework, dirname in FRAMEWORKS.items():
+            renders = samples[framework]["render"]
+            save_metrics(dirname, samples={"cold_start_s": renders},
+                         cold_start_s=summarize(renders)["mean"])
+
+    print(f"Startup phases in ms (mean ± stdev over {args.repeat} runs)\n")
+    print(markdown_table(
+        ["Framework", "Interpreter", "Framework import", "App module",
+         "Launch → port open", "Launch → first render"],
+        rows,
+    ))
+
+    if args.breakdown:
+        for framework, by_package in breakdowns.items():
+            print(f"\n### {framework}: slowest packages to import\n")
+            print(markdown_table(
+                ["Package", "Self time (ms)"],
+                [[name, f"{us / args.repeat / 1000:.1f}"]
+                 for name, us in by_package.most_common(args.top)],
+            ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Rerun time and delta size per interaction for the Streamlit app.
+
+Drives the standard scenario in headless Chromium and decodes every
+``ForwardMsg`` the server pushes over the websocket. For each interaction it
+reports how many script runs were triggered, how many deltas were sent, the
+bytes received and the time from the interaction until the run finished.
+
+Compare the current app against an older revision with:
+    python -m bench.streamlit_reruns --compare HEAD~1
+"""
+
+import argparse
+import time
+from collections import defaultdict
+
+from playwright.sync_api import sync_playwright
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+from bench.common import (
+    WireRecorder,
+    all_steps,
+    app_at_revision,
+    app_path,
+    markdown_table,
+    serve,
+    summarize,
+    wait_until,
+)
+
+
+def decode_forward_msgs(frames):
+    """Parse received frames into ``(frame, ForwardMsg type)`` pairs."""
+    decoded = []
+    for frame in frames:
+        if frame.sent:
+            continue
+        msg = ForwardMsg()
+        msg.ParseFromString(frame.payload)
+        decoded.append((frame, msg.WhichOneof("type")))
+    return decoded
+
+
+def _finished_runs(recorder, mark):
+    return sum(
+        1 for _, kind in decode_forward_msgs(recorder.since(mark))
+        if kind == "script_finished"
+    )
+
+
+def measure(path, repeat: int = 5, settle: float = 0.5) -> dict:
+    """Run the scenario ``repeat`` times against one app file."""
+    results = defaultdict(lambda: defaultdict(list))
+    with serve("streamlit", path) as running, sync_playwright() as pw:
+        browser = pw.chromium.launch()
+        for _ in range(repeat):
+            page = browser.new_page()
+            recorder = WireRecorder().attach(page)
+            mark = recorder.mark()
+            page.goto(running.url)
+            wait_until(page, lambda: _finished_runs(recorder, mark) >= 1)
+
+            for name, action in all_steps("streamlit"):
+                mark = recorder.mark()
+                start = time.perf_counter()
+                action(page)
+                wait_until(page, lambda: _finished_runs(recorder, mark) >= 1,
+                           settle=settle)
+                decoded = decode_forward_msgs(recorder.since(mark))
+                finished = [f.t for f, kind in decoded if kind == "script_finished"]
+                stats = results[name]
+                stats["runs"].append(len(finished))
+                stats["deltas"].append(sum(1 for _, k in decoded if k == "delta"))
+                stats["bytes"].append(sum(f.size for f, _ in decoded))
+                stats["ms"].append((finished[0] - start) * 1000)
+            page.close()
+        browser.close()
+    return results
+
+
+def report(label: str, results: dict) -> str:
+    rows = []
+    for name, _ in all_steps("streamlit"):
+        stats = {k: summarize(v) for k, v in results[name].items()}
+        rows.append([
+            name,
+            f"{stats['runs']['mean']:.1f}",
+            f"{stats['deltas']['mean']:.0f}",
+            f"{stats['bytes']['mean']:,.0f}",
+            f"{stats['ms']['mean']:.0f} ± {stats['ms']['stdev']:.0f}",
+        ])
+    table = markdown_table(
+        ["Interaction", "Runs", "Deltas", "Bytes received", "Time to finish (ms)"],
+        rows,
+    )
+    return f"### {label}\n\n{table}\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--compare", metavar="REV",
+                        help="also measure streamlit/app.py as of this git revision")
+    args = parser.parse_args()
+
+    if args.compare:
+        with app_at_revision("streamlit", args.compare) as old_path:
+            print(report(args.compare, measure(old_path, args.repeat)))
+    print(report("current", measure(app_path("streamlit"), args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
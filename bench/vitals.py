@@ -0,0 +1,170 @@
+"""
+Browser-side cost of each framework's client: Web Vitals, JS heap, bundle weight.
+
+Each app is loaded in a fresh headless Chromium context and the standard
+scenario is played. From the page's own performance timeline it records:
+
+  FCP   first contentful paint
+  LCP   largest contentful paint (before the first interaction)
+  TBT   total blocking time: long-task time over 50 ms, from FCP until the
+        page has loaded and gone network-idle
+  INP   interaction to next paint for the preset click (Event Timing)
+
+plus the JS heap in use after the scenario (after a forced GC, via the
+DevTools protocol) and the JS and CSS bytes transferred for the page.
+
+``--save`` stores the numbers in ``<app>/perf.json`` and the results
+database next to the server-side benchmarks; LCP and INP feed the
+efficiency criterion in eval_apps.py. The report then puts end-user latency
+(INP) beside the server round trip measured by ``bench.interactions``.
+
+Run:
+    python -m bench.vitals --repeat 5 --save
+"""
+
+import argparse
+
+from playwright.sync_api import sync_playwright
+
+from bench.common import (
+    FRAMEWORKS,
+    SCENARIO_STEPS,
+    WireRecorder,
+    load_metrics,
+    markdown_table,
+    play_setup,
+    save_metrics,
+    serve,
+    summarize,
+)
+
+# Buffers paint, LCP, long-task and event-timing entries from the first byte.
+_OBSERVER_JS = """
+window.__vitals = {fcp: null, lcp: null, longTasks: [], events: []};
+const observe = (type, callback, options = {}) => {
+  try {
+    new PerformanceObserver(list => list.getEntries().forEach(callback))
+      .observe({type, buffered: true, ...options});
+  } catch (e) {}
+};
+observe('paint', e => {
+  if (e.name === 'first-contentful-paint') window.__vitals.fcp = e.startTime;
+});
+observe('largest-contentful-paint', e => { window.__vitals.lcp = e.startTime; });
+observe('longtask', e => {
+  window.__vitals.longTasks.push([e.startTime, e.duration]);
+});
+observe('event', e => {
+  if (e.interactionId) window.__vitals.events.push([e.startTime, e.duration]);
+}, {durationThreshold: 16});
+"""
+
+PRESET_STEP = "click preset"
+METRICS = ("fcp_ms", "lcp_ms", "tbt_ms", "inp_ms", "js_heap_mib", "js_css_kib")
+
+
+def total_blocking_time(long_tasks: list, fcp: float, end: float) -> float:
+    """Sum of each long task's time beyond 50 ms between ``fcp`` and ``end``."""
+    return sum(max(0.0, duration - 50) for start, duration in long_tasks
+               if fcp <= start <= end)
+
+
+def _js_heap_bytes(page) -> int:
+    cdp = page.context.new_cdp_session(page)
+    cdp.send("HeapProfiler.collectGarbage")
+    used = cdp.send("Runtime.getHeapUsage")["usedSize"]
+    cdp.detach()
+    return used
+
+
+def _bundle_bytes(recorder: WireRecorder) -> int:
+    return sum(r.response_bytes() for r in recorder.requests
+               if r.done_t is not None
+               and r.request.resource_type in ("script", "stylesheet"))
+
+
+def measure_once(browser, url: str, dirname: str) -> dict:
+    context = browser.new_context()
+    context.add_init_script(_OBSERVER_JS)
+    page = context.new_page()
+    recorder = WireRecorder().attach(page)
+    page.goto(url)
+    page.get_by_text("Total Bill").first.wait_for(timeout=60_000)
+    page.wait_for_load_state("networkidle")
+    loaded = page.evaluate("() => performance.now()")
+    vitals = page.evaluate("() => ({...window.__vitals})")
+
+    inp = None
+    play_setup(page, dirname)
+    for name, action in SCENARIO_STEPS[dirname]:
+        before = page.evaluate("() => performance.now()")
+        action(page)
+        page.wait_for_timeout(300)  # let the next paint land and be reported
+        page.wait_for_load_state("networkidle")
+        if name == PRESET_STEP:
+            events = page.evaluate("() => window.__vitals.events")
+            inp = max((d for start, d in events if start >= before), default=0.0)
+
+    result = {
+        "fcp_ms": vitals["fcp"],
+        "lcp_ms": vitals["lcp"],
+        "tbt_ms": total_blocking_time(vitals["longTasks"], vitals["fcp"] or 0, loaded),
+        "inp_ms": inp,
+        "js_heap_mib": _js_heap_bytes(page) / 2**20,
+        "js_css_kib": _bundle_bytes(recorder) / 1024,
+    }
+    context.close()
+    return result
+
+
+def measure(dirname: str, repeat: int) -> dict:
+    """Each metric's samples over ``repeat`` fresh browser contexts."""
+    samples = {k: [] for k in METRICS}
+    with serve(dirname) as running, sync_playwright() as pw:
+        browser = pw.chromium.launch()
+        for _ in range(repeat):
+            for key, value in measure_once(browser, running.url, dirname).items():
+                if value is not None:
+                    samples[key].append(value)
+        browser.close()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", action="store_true",
+                        help="write the means to <app>/perf.json")
+    args = parser.parse_args()
+
+    rows, latency_rows = [], []
+    for framework, dirname in FRAMEWORKS.items():
+        samples = measure(dirname, args.repeat)
+        means = {k: summarize(v)["mean"] for k, v in samples.items() if v}
+        rows.append([framework] + [
+            f"{means[k]:,.1f}" if k in means else "–" for k in METRICS
+        ])
+        server_ms = load_metrics(dirname).get("interaction_latency_ms")
+        latency_rows.append([
+            framework,
+            f"{means['inp_ms']:,.0f}" if "inp_ms" in means else "–",
+            f"{server_ms:,.0f}" if server_ms is not None else "–",
+        ])
+        if args.save:
+            save_metrics(dirname, samples=samples, **means)
+
+    print(f"Browser-side metrics, mean over {args.repeat} fresh contexts\n")
+    print(markdown_table(
+        ["Framework", "FCP (ms)", "LCP (ms)", "TBT (ms)", "INP preset click (ms)",
+         "JS heap (MiB)", "JS + CSS (KiB)"],
+        rows,
+    ))
+    print("\nEnd-user vs server latency\n")
+    print(markdown_table(
+        ["Framework", "INP preset click (ms)", "Server round trip (ms, bench.interactions)"],
+        latency_rows,
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Wire-payload profile of one scripted interaction on every app.
+
+Plays the scenario (type the bill, click the 20% preset, split 3 ways) in
+headless Chromium and captures every websocket frame and HTTP request made
+after the page has loaded. Framework-specific setup steps (SETUP_STEPS, e.g.
+Streamlit's split toggle) are played first and their received bytes reported
+in a separate column, so the scenario totals compare across frameworks. For each app it reports message counts, raw bytes
+and compressed bytes (each payload deflated on its own, roughly what
+permessage-deflate or gzip would put on the wire), then the biggest payload
+contributors, attributed in each framework's own terms:
+
+  streamlit  ForwardMsg type, with deltas split by element (``delta metric``)
+  dash       component property in ``_dash-update-component`` responses
+             (``btn-20.style``)
+  panel      model event in ``PATCH-DOC`` messages (``ModelChanged text``)
+  shiny      output or message key (``values.tip_amount``)
+
+Anything the attributor does not recognise is counted under its URL path or
+as an opaque websocket frame.
+
+Run:
+    python -m bench.wire --top 10
+"""
+
+import argparse
+import json
+import time
+import zlib
+from collections import defaultdict
+from urllib.parse import urlparse
+
+from playwright.sync_api import sync_playwright
+
+from bench.common import (
+    FRAMEWORKS,
+    SCENARIO_STEPS,
+    SETUP_STEPS,
+    WireRecorder,
+    markdown_table,
+    serve,
+    wait_quiet,
+)
+from bench.panel_patches import bokeh_messages, describe_event, patch_events
+
+
+def deflated_size(payload: bytes) -> int:
+    """Bytes after raw deflate at the default level."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+    return len(compressor.compress(payload) + compressor.flush())
+
+
+def _json_bytes(value) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+# ── Attribution: received payloads -> (label, bytes) parts ────────────────────
+def streamlit_parts(frames):
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+    for frame in frames:
+        msg = ForwardMsg()
+        msg.ParseFromString(frame.payload)
+        kind = msg.WhichOneof("type")
+        if kind == "delta":
+            delta = msg.delta.WhichOneof("type")
+            if delta == "new_element":
+                delta = msg.delta.new_element.WhichOneof("type")
+            kind = f"delta {delta}"
+        yield kind, frame.payload
+
+
+def panel_parts(frames):
+    for msgtype, parts in bokeh_messages(frames):
+        if msgtype != "PATCH-DOC":
+            yield msgtype, b"".join(f.payload for f in parts)
+            continue
+        for event in patch_events(parts):
+            yield describe_event(event), _json_bytes(event)
+        yield "PATCH-DOC framing", b"".join(f.payload for f in parts[:2])
+
+
+def shiny_parts(frames):
+    for frame in frames:
+        try:
+            message = json.loads(frame.payload)
+        except ValueError:
+            yield "ws frame", frame.payload
+            continue
+        for key, value in message.items():
+            if key == "values" and isinstance(value, dict):
+                for output, content in value.items():
+                    yield f"values.{output}", _json_bytes(content)
+            else:
+                yield key, _json_bytes(value)
+
+
+def dash_http_parts(url: str, body: bytes):
+    if not url.endswith("_dash-update-component"):
+        return None
+    try:
+        response = json.loads(body).get("response", {})
+    except ValueError:
+        return None
+    return [
+        (f"{component}.{prop}", _json_bytes(value))
+        for component, props in response.items()
+        for prop, value in props.items()
+    ]
+
+
+WS_ATTRIBUTORS = {
+    "streamlit": streamlit_parts,
+    "panel": panel_parts,
+    "shiny": shiny_parts,
+}
+HTTP_ATTRIBUTORS = {
+    "dash": dash_http_parts,
+}
+
+
+def _response_body(entry) -> bytes:
+    response = entry.request.response()
+    if response is None:
+        return b""
+    try:
+        return response.body()
+    except Exception:  # redirects and aborted requests have no body
+        return b""
+
+
+# ── Measurement ───────────────────────────────────────────────────────────────
+def profile(dirname: str, path=None) -> dict:
+    """Messages, bytes and per-contributor bytes for one scenario run."""
+    with serve(dirname, path) as running, sync_playwright() as pw:
+        browser = pw.chromium.launch()
+        page = browser.new_page()
+        recorder = WireRecorder().attach(page)
+        page.goto(running.url)
+        page.get_by_text("Total Bill").first.wait_for(timeout=60_000)
+        page.wait_for_load_state("networkidle")
+        time.sleep(0.5)
+
+        setup_mark, t_setup = recorder.mark(), time.perf_counter()
+        for _, action in SETUP_STEPS[dirname]:
+            t0 = time.perf_counter()
+            action(page)
+            wait_quiet(page, recorder, t0)
+        setup_received = sum(f.size for f in recorder.since(setup_mark) if not f.sent)
+        setup_received += sum(r.response_bytes() for r in recorder.requests_after(t_setup))
+
+        mark, t_start = recorder.mark(), time.perf_counter()
+        for _, action in SCENARIO_STEPS[dirname]:
+            t0 = time.perf_counter()
+            action(page)
+            wait_quiet(page, recorder, t0)
+
+        frames = recorder.since(mark)
+        received = [f for f in frames if not f.sent]
+        http = [(r, _response_body(r)) for r in recorder.requests_after(t_start)]
+        browser.close()
+
+    counts = {
+        "ws sent": sum(1 for f in frames if f.sent),
+        "ws received": len(received),
+        "http": len(http),
+    }
+    payloads = [f.payload for f in received] + [body for _, body in http]
+    totals = {
+        "raw": sum(map(len, payloads)),
+        "compressed": sum(map(deflated_size, payloads)),
+        "sent": sum(f.size for f in frames if f.sent),
+        "setup": setup_received,
+    }
+
+    contributors = defaultdict(lambda: {"count": 0, "raw": 0, "compressed": 0})
+
+    def add(label, payload):
+        stats = contributors[label]
+        stats["count"] += 1
+        stats["raw"] += len(payload)
+        stats["compressed"] += deflated_size(payload)
+
+    attribute_ws = WS_ATTRIBUTORS.get(dirname, lambda fs: (("ws frame", f.payload) for f in fs))
+    for label, payload in attribute_ws(received):
+        add(label, payload)
+    for entry, body in http:
+        parts = HTTP_ATTRIBUTORS.get(dirname, lambda *_: None)(entry.url, body)
+        for label, payload in parts or [(f"{entry.method} {urlparse(entry.url).path}", body)]:
+            add(label, payload)
+    return {"counts": counts, "totals": totals, "contributors": dict(contributors)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--top", type=int, default=8,
+                        help="number of payload contributors to list per app")
+    args = parser.parse_args()
+
+    summary, details = [], {}
+    for framework, dirname in FRAMEWORKS.items():
+        result = profile(dirname)
+        counts, totals = result["counts"], result["totals"]
+        summary.append([
+            framework, counts["ws sent"], counts["ws received"], counts["http"],
+            f"{totals['sent']:,}", f"{totals['raw']:,}", f"{totals['compressed']:,}",
+            f"{totals['setup']:,}" if SETUP_STEPS[dirname] else "–",
+        ])
+        details[framework] = result["contributors"]
+
+    print("Whole scenario after page load (bill, 20% preset, split 3)\n")
+    print(markdown_table(
+        ["Framework", "WS sent", "WS received", "HTTP requests", "Bytes sent",
+         "Bytes received", "Received, compressed", "Setup received (not included)"],
+        summary,
+    ))
+    for framework, contributors in details.items():
+        ranked = sorted(contributors.items(), key=lambda kv: -kv[1]["raw"])[:args.top]
+        print(f"\n### {framework}: largest payload contributors\n")
+        print(markdown_table(
+            ["Contributor", "Messages", "Raw bytes", "Compressed bytes"],
+            [[label, s["count"], f"{s['raw']:,}", f"{s['compressed']:,}"]
+             for label, s in ranked],
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Server-work probe loaded into an app server by ``bench.server_work``.
+
+``bench.server_work`` puts this directory first on ``PYTHONPATH`` so Python
+imports it at startup. When ``BENCH_WORKPROBE_PORT`` is set it installs
+per-framework hooks as the framework modules are imported, and answers
+one-line commands on that port:
+
+    reset   -> clears the recorded events, {"events": 0}
+    events  -> {"events": [{"kind", "label", "ms"}, ...]} since the last reset
+
+Each hook wraps one framework method and records what ran and how long it
+took. Event kinds:
+
+    rerun         Streamlit full script run
+    fragment      Streamlit fragment run
+    callback      Dash callback dispatch; Panel browser event batch
+    watcher       Panel/param watcher call
+    render        Panel pane update; Shiny output render
+    calc          Shiny reactive calc recomputation
+    effect        Shiny reactive effect run
+    invalidation  Shiny reactive context invalidated
+
+Hooks whose target does not exist in the installed version are skipped. The
+``hooks`` field of the ``events`` reply lists the ones that were installed,
+and ``skipped`` the ones that were not, with the reason.
+"""
+
+import functools
+import importlib.abc
+import importlib.util
+import inspect
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+
+_events = []
+_installed = []
+_skipped = []
+
+
+def _record(kind: str, label: str, started: float):
+    _events.append({
+        "kind": kind,
+        "label": label,
+        "ms": (time.perf_counter() - started) * 1000,
+    })
+
+
+def _wrap(owner, attr: str, kind, label):
+    """Record every call of ``owner.attr``; ``kind``/``label`` get the args."""
+    original = getattr(owner, attr, None)
+    if original is None:
+        _skipped.append(f"{owner.__module__}.{owner.__qualname__}.{attr}: not found")
+        return
+    if inspect.iscoroutinefunction(original):
+        @functools.wraps(original)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await original(*args, **kwargs)
+            finally:
+                _record(kind(*args) if callable(kind) else kind, label(*args), started)
+    else:
+        @functools.wraps(original)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                _record(kind(*args) if callable(kind) else kind, label(*args), started)
+    setattr(owner, attr, wrapper)
+    _installed.append(f"{owner.__module__}.{owner.__qualname__}.{attr}")
+
+
+def _name(fn) -> str:
+    fn = getattr(fn, "__func__", fn)
+    return getattr(fn, "__qualname__", None) or repr(fn)
+
+
+# ── Per-framework hooks ───────────────────────────────────────────────────────
+def _hook_streamlit(module):
+    def kind(runner, rerun_data, *_):
+        return "fragment" if getattr(rerun_data, "fragment_id_queue", None) else "rerun"
+
+    _wrap(module.ScriptRunner, "_run_script", kind, lambda runner, *_: "script")
+
+
+def _hook_dash(module):
+    def label(app, *_):
+        from flask import request
+
+        body = request.get_json(silent=True) or {}
+        return str(body.get("output", "?"))
+
+    _wrap(module.Dash, "dispatch", "callback", label)
+
+
+def _hook_param(module):
+    def label(_params, watcher, *_):
+        return _name(watcher.fn)
+
+    _wrap(module.Parameters, "_call_watcher", "watcher", label)
+
+
+def _hook_panel_reactive(module):
+    _wrap(module.Syncable, "_process_events", "callback",
+          lambda obj, *_: type(obj).__name__)
+
+
+def _hook_panel_pane(module):
+    _wrap(module.PaneBase, "_update_pane", "render",
+          lambda pane, *_: f"{type(pane).__name__} {pane.name}")
+
+
+def _hook_shiny_core(module):
+    _wrap(module.Context, "invalidate", "invalidation", lambda ctx, *_: "context")
+
+
+def _hook_shiny_reactives(module):
+    _wrap(module.Calc_, "update_value", "calc",
+          lambda calc, *_: _name(getattr(calc, "_fn", calc)))
+    _wrap(module.Effect_, "_run", "effect",
+          lambda effect, *_: _name(getattr(effect, "_fn", effect)))
+
+
+def _hook_shiny_renderer(module):
+    _wrap(module.Renderer, "render", "render",
+          lambda renderer, *_: getattr(renderer, "output_id", None) or type(renderer).__name__)
+
+
+HOOKS = {
+    "streamlit.runtime.scriptrunner.script_runner": _hook_streamlit,
+    "dash.dash": _hook_dash,
+    "param.parameterized": _hook_param,
+    "panel.reactive": _hook_panel_reactive,
+    "panel.pane.base": _hook_panel_pane,
+    "shiny.reactive._core": _hook_shiny_core,
+    "shiny.reactive._reactives": _hook_shiny_reactives,
+    "shiny.render.renderer._renderer": _hook_shiny_renderer,
+}
+
+
+class _PostImportFinder(importlib.abc.MetaPathFinder):
+    """Runs the hook for a module right after the module is executed."""
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname not in HOOKS:
+            return None
+        sys.meta_path.remove(self)
+        try:
+            spec = importlib.util.find_spec(fullname)
+        finally:
+            sys.meta_path.insert(0, self)
+        if spec is None or spec.loader is None:
+            return None
+        exec_module = spec.loader.exec_module
+
+        def exec_and_hook(module):
+            exec_module(module)
+            try:
+                HOOKS[fullname](module)
+            except AttributeError as exc:
+                # The installed version moved the target; skip the hook.
+                _skipped.append(f"{fullname}: {exc}")
+
+        spec.loader.exec_module = exec_and_hook
+        return spec
+
+
+# ── Control socket ────────────────────────────────────────────────────────────
+class _ProbeHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        command = self.rfile.readline().decode().strip()
+        if command == "reset":
+            _events.clear()
+            reply = {"events": 0}
+        else:
+            reply = {"events": list(_events), "hooks": _installed,
+                     "skipped": _skipped}
+        self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+
+def _start(port: int):
+    try:
+        server = socketserver.ThreadingTCPServer(("127.0.0.1", port), _ProbeHandler)
+    except OSError:
+        return  # a child process of the probed server; the parent owns the port
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    sys.meta_path.insert(0, _PostImportFinder())
+
+
+if os.environ.get("BENCH_WORKPROBE_PORT"):
+    _start(int(os.environ["BENCH_WORKPROBE_PORT"]))
@@ -1,12 +1,31 @@
 # Tip Calculator — Plotly Dash App
 
-from dash import Dash, dcc, html, Input, Output, callback
+import base64
+import hashlib
+import io
+import os
+import sys
+from collections import OrderedDict
+from pathlib import Path
+
+from dash import Dash, dash_table, dcc, html, Input, Output, callback, ctx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import static_cache  # noqa: E402  (precompressed assets, see static_cache.py)
+import tipcore  # noqa: E402  (shared arithmetic, see tipcore.py)
+
+# Seconds of typing inactivity before a numeric input is sent to the server,
+# so typing "85.50" triggers one calculation instead of five (0 = every key).
+INPUT_DEBOUNCE_S = float(os.environ.get("TIP_INPUT_DEBOUNCE", "0.4"))
 
 # ---------------------------------------------------------------------------
 # App instance
 # ---------------------------------------------------------------------------
 app = Dash(__name__)
 app.title = "Tip Calculator"
+# Serve the React bundles and the (static) index page precompressed, with
+# content-hash ETags and immutable caching for fingerprinted URLs.
+app.server.wsgi_app = static_cache.wsgi(app.server.wsgi_app, cache_html=True)
 
 # ---------------------------------------------------------------------------
 # Reusable style constants  (plain Python dicts – no external CSS/JS)
@@ -201,7 +220,7 @@ app.layout = html.Div(style=page_style, children=[
                 placeholder="e.g. 85.50",
                 min=0,
                 step=0.01,
-                debounce=False,
+                debounce=INPUT_DEBOUNCE_S or False,
                 style=input_style,
             ),
             html.Div(id="bill-error", style=error_style),
@@ -237,7 +256,7 @@ app.layout = html.Div(style=page_style, children=[
                 min=0,
                 max=100,
                 step=0.5,
-                debounce=False,
+                debounce=INPUT_DEBOUNCE_S or False,
                 style=input_style,
             ),
             html.Div(id="tip-error", style=error_style),
@@ -267,7 +286,7 @@ app.layout = html.Div(style=page_style, children=[
                 max=100,
                 step=1,
                 value=1,
-                debounce=False,
+                debounce=INPUT_DEBOUNCE_S or False,
                 style=input_style,
             ),
             html.Div(id="split-error", style=error_style),
@@ -278,6 +297,36 @@ app.layout = html.Div(style=page_style, children=[
             html.P(id="per-person", style=split_value_style),
         ]),
 
+        # ── Bulk Receipts ────────────────────────────────────────────────────
+        html.Div(style={**section_style, "marginTop": "22px"}, children=[
+            html.Label("Bulk Receipts (CSV)", style=label_style),
+            dcc.Upload(
+                id="receipts-upload",
+                children=html.Div("Drop a CSV of bill, tip_pct, people here "
+                                  "or click to choose a file"),
+                accept=".csv",
+                style={**input_style, "textAlign": "center", "cursor": "pointer",
+                       "borderStyle": "dashed", "color": MUTED},
+            ),
+            dcc.Store(id="receipts-key"),
+            html.Div(id="receipts-summary",
+                     style={"fontSize": "13px", "color": LABEL_COLOR,
+                            "margin": "10px 0"}),
+            # page_action="custom": rows are sliced server-side per page.
+            dash_table.DataTable(
+                id="receipts-table",
+                columns=[{"name": c, "id": c} for c in tipcore.RECEIPT_COLUMNS],
+                data=[],
+                page_action="custom",
+                page_current=0,
+                page_size=tipcore.DEFAULT_PAGE_SIZE,
+                page_count=1,
+                style_cell={"fontFamily": "inherit", "fontSize": "13px",
+                            "padding": "4px 8px"},
+                style_header={"fontWeight": "600", "color": LABEL_COLOR},
+            ),
+        ]),
+
         # ── Footer ───────────────────────────────────────────────────────────
         html.P("Tip = Bill × Tip %   |   Total = Bill + Tip",
                style=footer_style),
@@ -301,8 +350,6 @@ app.layout = html.Div(style=page_style, children=[
     Input("tip-percent",   "value"),
 )
 def sync_preset(n15, n18, n20, custom_val):
-    from dash import ctx
-
     triggered = ctx.triggered_id
 
     # Map button ids to tip values
@@ -353,20 +400,18 @@ def calculate(bill, tip_pct, num_people):
         tip_err = "⚠ Tip % must be between 0 and 100."
         return "—", "—", "—", bill_err, tip_err, split_err
 
-    tip_amount  = bill * (tip_pct / 100)
-    total       = bill + tip_amount
-
     # Validate split
     if num_people is None or num_people < 1:
         split_err = "⚠ Number of people must be at least 1."
+        amounts = tipcore.split_bill(bill, tip_pct)
         per_person_str = "—"
     else:
-        per_person = total / int(num_people)
-        per_person_str = f"${per_person:,.2f}"
+        amounts = tipcore.split_bill(bill, tip_pct, int(num_people))
+        per_person_str = f"${amounts.per_person_total:,.2f}"
 
     return (
-        f"${tip_amount:,.2f}",
-        f"${total:,.2f}",
+        f"${amounts.tip:,.2f}",
+        f"${amounts.total:,.2f}",
         per_person_str,
         bill_err,
         tip_err,
@@ -374,8 +419,50 @@ def calculate(bill, tip_pct, num_people):
     )
 
 
+# 3. Bulk receipts: parse + compute once per upload, page server-side.
+#    Tables are kept in this process (keyed by content digest) so only the
+#    digest and the visible page ever travel to the browser.
+_RECEIPT_TABLES = OrderedDict()
+_MAX_RECEIPT_TABLES = 8
+
+
+@callback(
+    Output("receipts-key",     "data"),
+    Output("receipts-summary", "children"),
+    Output("receipts-table",   "page_count"),
+    Output("receipts-table",   "page_current"),
+    Input("receipts-upload",   "contents"),
+    prevent_initial_call=True,
+)
+def load_receipts(contents):
+    payload = base64.b64decode(contents.split(",", 1)[1])
+    key = hashlib.sha1(payload).hexdigest()
+    if key not in _RECEIPT_TABLES:
+        _RECEIPT_TABLES[key] = tipcore.read_receipts(io.BytesIO(payload))
+        while len(_RECEIPT_TABLES) > _MAX_RECEIPT_TABLES:
+            _RECEIPT_TABLES.popitem(last=False)
+    _RECEIPT_TABLES.move_to_end(key)
+    table = _RECEIPT_TABLES[key]
+
+    summary = "   |   ".join(f"{k}: {v}" for k, v in table.summary().items())
+    return key, summary, table.page_count(tipcore.DEFAULT_PAGE_SIZE), 0
+
+
+@callback(
+    Output("receipts-table", "data"),
+    Input("receipts-key",    "data"),
+    Input("receipts-table",  "page_current"),
+    Input("receipts-table",  "page_size"),
+)
+def receipts_page(key, page_current, page_size):
+    table = _RECEIPT_TABLES.get(key)
+    if table is None:
+        return []
+    return table.page(page_current or 0, page_size)
+
+
 # ---------------------------------------------------------------------------
 # Entry point
 # ---------------------------------------------------------------------------
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    app.run()  # debug mode only with DASH_DEBUG=true
\ No newline at end of file
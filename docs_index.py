@@ -0,0 +1,296 @@
+"""
+Offline documentation index for the four web frameworks.
+
+generate_apps.py exposes ``search_framework_docs`` to the model as a chatlas
+tool instead of web search: lookups are local, take milliseconds and give the
+same results on every run.
+
+The index is built from the installed packages themselves, without importing
+them: module, class and function docstrings (with signatures) parsed from the
+source with ``ast``, plus any Markdown/reST files bundled in the package.
+Lookup is BM25 over identifier-aware tokens.
+
+The index is built once into ``.docs_index/`` and memory-mapped on later
+runs. It is rebuilt automatically when an installed framework version changes.
+
+Run:
+    python docs_index.py --rebuild
+    python docs_index.py "number input debounce" --framework dash
+"""
+
+import argparse
+import ast
+import importlib.metadata
+import importlib.util
+import json
+import math
+import mmap
+import re
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).parent
+INDEX_DIR = BASE_DIR / ".docs_index"
+
+# Display name -> top-level package, as in generate_apps.FRAMEWORKS.
+PACKAGES = {
+    "Streamlit": "streamlit",
+    "Plotly Dash": "dash",
+    "Panel": "panel",
+    "Shiny for Python": "shiny",
+}
+
+DOC_SUFFIXES = {".md", ".rst"}
+SKIP_DIRS = {"tests", "test", "testing", "__pycache__", "node_modules", "dist"}
+MAX_DOC_CHARS = 4000
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD = re.compile(r"[A-Za-z][A-Za-z0-9]*")
+_CAMEL = re.compile(r"[A-Z]?[a-z0-9]+|[A-Z]+(?![a-z])")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase words; identifiers also contribute their snake/camel parts."""
+    tokens = []
+    for word in _WORD.findall(text.replace("_", " ")):
+        lower = word.lower()
+        tokens.append(lower)
+        parts = _CAMEL.findall(word)
+        if len(parts) > 1:
+            tokens.extend(p.lower() for p in parts)
+    return tokens
+
+
+# ── Extraction ────────────────────────────────────────────────────────────────
+def _signature(node) -> str:
+    if isinstance(node, ast.ClassDef):
+        return f"class {node.name}"
+    return f"{node.name}({ast.unparse(node.args)})"
+
+
+def _python_docs(path: Path, module: str):
+    """(name, text) for the module and every public documented def/class."""
+    try:
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+    except (SyntaxError, UnicodeDecodeError, ValueError):
+        return
+    doc = ast.get_docstring(tree)
+    if doc:
+        yield module, doc
+
+    def walk(body, prefix):
+        for node in body:
+            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                continue
+            if node.name.startswith("_"):
+                continue
+            name = f"{prefix}.{node.name}"
+            doc = ast.get_docstring(node)
+            if doc:
+                yield name, f"{_signature(node)}\n\n{doc}"
+            if isinstance(node, ast.ClassDef):
+                yield from walk(node.body, name)
+
+    yield from walk(tree.body, module)
+
+
+def iter_package_docs(package: str):
+    """(name, text) documents for one installed package, or nothing."""
+    spec = importlib.util.find_spec(package)
+    if spec is None or not spec.submodule_search_locations:
+        return
+    root = Path(next(iter(spec.submodule_search_locations)))
+    for path in sorted(root.rglob("*")):
+        rel = path.relative_to(root)
+        # Private modules are kept: shiny, for one, defines its public API in
+        # modules like ``shiny/ui/_input_numeric.py``.
+        if SKIP_DIRS.intersection(rel.parts):
+            continue
+        if path.suffix == ".py":
+            parts = [package, *rel.with_suffix("").parts]
+            if parts[-1] == "__init__":
+                parts.pop()
+            yield from _python_docs(path, ".".join(parts))
+        elif path.suffix in DOC_SUFFIXES and path.is_file():
+            text = path.read_text(encoding="utf-8", errors="replace")
+            yield f"{package}/{rel.as_posix()}", text
+
+
+def installed_versions() -> dict[str, str | None]:
+    versions = {}
+    for package in PACKAGES.values():
+        try:
+            versions[package] = importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+# ── Build ─────────────────────────────────────────────────────────────────────
+def build(index_dir: Path = INDEX_DIR) -> dict:
+    """Build the on-disk index; returns its metadata."""
+    index_dir.mkdir(parents=True, exist_ok=True)
+    frameworks = list(PACKAGES.values())
+    doc_text, doc_framework, doc_lengths = [], [], []
+    postings: dict[str, list[tuple[int, int]]] = {}
+
+    for fw_id, package in enumerate(frameworks):
+        for name, text in iter_package_docs(package):
+            text = f"{name}\n{text[:MAX_DOC_CHARS]}"
+            counts = Counter(tokenize(text))
+            if not counts:
+                continue
+            doc_id = len(doc_text)
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((doc_id, tf))
+            doc_text.append(text)
+            doc_framework.append(fw_id)
+            doc_lengths.append(sum(counts.values()))
+
+    encoded = [t.encode("utf-8") for t in doc_text]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    (index_dir / "docs.bin").write_bytes(b"".join(encoded))
+
+    vocabulary = sorted(postings)
+    post_offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+    np.cumsum([len(postings[t]) for t in vocabulary], out=post_offsets[1:])
+    flat = [entry for term in vocabulary for entry in postings[term]]
+    post_docs = np.array([d for d, _ in flat], dtype=np.int32)
+    post_tf = np.array([min(tf, 65535) for _, tf in flat], dtype=np.uint16)
+
+    np.save(index_dir / "doc_offsets.npy", offsets)
+    np.save(index_dir / "doc_framework.npy", np.array(doc_framework, dtype=np.int8))
+    np.save(index_dir / "doc_lengths.npy", np.array(doc_lengths, dtype=np.int32))
+    np.save(index_dir / "post_offsets.npy", post_offsets)
+    np.save(index_dir / "post_docs.npy", post_docs)
+    np.save(index_dir / "post_tf.npy", post_tf)
+
+    meta = {
+        "versions": installed_versions(),
+        "frameworks": frameworks,
+        "documents": len(doc_text),
+        "vocabulary": vocabulary,
+    }
+    (index_dir / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+    return meta
+
+
+# ── Lookup ────────────────────────────────────────────────────────────────────
+class DocsIndex:
+    """Memory-mapped BM25 index over the frameworks' documentation."""
+
+    def __init__(self, index_dir: Path = INDEX_DIR):
+        meta = json.loads((index_dir / "meta.json").read_text(encoding="utf-8"))
+        self.frameworks = meta["frameworks"]
+        self.terms = {term: i for i, term in enumerate(meta["vocabulary"])}
+
+        def load(name):
+            return np.load(index_dir / f"{name}.npy", mmap_mode="r")
+
+        self.doc_offsets = load("doc_offsets")
+        self.doc_framework = load("doc_framework")
+        self.doc_lengths = load("doc_lengths")
+        self.post_offsets = load("post_offsets")
+        self.post_docs = load("post_docs")
+        self.post_tf = load("post_tf")
+        self.avg_length = float(self.doc_lengths.mean()) if len(self.doc_lengths) else 0.0
+
+        docs_path = index_dir / "docs.bin"
+        self._docs_file = docs_path.open("rb")
+        self._docs = (
+            mmap.mmap(self._docs_file.fileno(), 0, access=mmap.ACCESS_READ)
+            if docs_path.stat().st_size else b""
+        )
+
+    @classmethod
+    def open(cls, index_dir: Path = INDEX_DIR, rebuild: bool = False) -> "DocsIndex":
+        """Open the index, (re)building it if missing or out of date."""
+        meta_path = index_dir / "meta.json"
+        stale = True
+        if meta_path.exists() and not rebuild:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            stale = meta["versions"] != installed_versions()
+        if stale:
+            build(index_dir)
+        return cls(index_dir)
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def document(self, doc_id: int) -> str:
+        start, end = self.doc_offsets[doc_id], self.doc_offsets[doc_id + 1]
+        return self._docs[start:end].decode("utf-8")
+
+    def search(self, query: str, framework: str | None = None,
+               limit: int = 5) -> list[tuple[float, str]]:
+        """Top ``(score, text)`` matches, optionally within one package."""
+        n_docs = len(self)
+        if not n_docs:
+            return []
+        scores = np.zeros(n_docs, dtype=np.float64)
+        for term in set(tokenize(query)):
+            term_id = self.terms.get(term)
+            if term_id is None:
+                continue
+            lo, hi = self.post_offsets[term_id], self.post_offsets[term_id + 1]
+            docs = np.asarray(self.post_docs[lo:hi])
+            tf = np.asarray(self.post_tf[lo:hi], dtype=np.float64)
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[docs] / self.avg_length)
+            scores[docs] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        if framework is not None:
+            scores[self.doc_framework != self.frameworks.index(framework)] = 0
+        limit = min(limit, n_docs)
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), self.document(int(i))) for i in top if scores[i] > 0]
+
+
+def make_docs_tool(index: DocsIndex, package: str, snippet_chars: int = 1500):
+    """A chatlas tool that searches one framework's documentation."""
+
+    def search_framework_docs(query: str, limit: int = 5) -> str:
+        """Search the installed framework's API documentation.
+
+        Returns the best-matching docstrings and bundled docs, each starting
+        with the fully qualified name and signature. Use specific API terms,
+        e.g. "number_input step format" or "callback Input State".
+
+        Parameters
+        ----------
+        query
+            Words describing the API or behaviour to look up.
+        limit
+            Maximum number of results (1-10).
+        """
+        hits = index.search(query, framework=package, limit=max(1, min(limit, 10)))
+        if not hits:
+            return "No matching documentation found."
+        return "\n\n---\n\n".join(text[:snippet_chars] for _, text in hits)
+
+    return search_framework_docs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("query", nargs="?")
+    parser.add_argument("--framework", choices=list(PACKAGES.values()))
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+
+    index = DocsIndex.open(rebuild=args.rebuild)
+    print(f"{len(index):,} documents in {INDEX_DIR}")
+    if args.query:
+        for score, text in index.search(args.query, args.framework, args.limit):
+            print(f"\n[{score:.2f}] {text[:400]}")
+
+
+if __name__ == "__main__":
+    main()
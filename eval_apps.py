@@ -5,10 +5,48 @@ Uses claude-sonnet-4-6 as a model-graded scorer to evaluate the generated
 apps across 3 criteria: maintainability, readability, and requirement adherence.
 Each sample includes the app code plus before/after screenshots.
 
+A 4th criterion, efficiency, is scored deterministically from the runtime
+measurements in each app's perf.json (written by the bench/ scripts with
+--save); the measurements are also shown to the grader. Apps without
+measurements fall back to the grader's own efficiency score.
+
+With ``-T batch=true`` all grading requests go out as one Anthropic Message
+Batch (see batch_grading.py): cheaper and higher-throughput for large sweeps,
+and resumable if the run is interrupted while the batch is processing.
+
+Every successfully graded sample's screenshots and scores are recorded in
+the perceptual screenshot index (see screenshot_index.py). With
+``-T skip_unchanged=true``, apps whose code is unchanged and whose
+screenshots look the same as when they were last graded are not sent to the
+grader again; their recorded scores are carried over into this run's metrics.
+
+Each sample also records its perf_lint.py findings (metadata ``lint``) and
+their count as the ``lint_findings`` metric; lower is better.
+
+``-T prompt_variant=performance`` grades the apps generated with the
+performance prompt (``app_performance.py``, see generate_apps.py); the
+variant is recorded with the scores in the results database.
+
+With ``-T hedge=true`` each grading call has a deadline (``-T deadline=``,
+seconds) and slow calls get a hedged duplicate request (see hedging.py).
+Hedging applies to plain grading only; combining it with ``batch`` or
+adaptive grading is an error.
+
+``-T adaptive=true`` grades with a cascade: a cheaper model
+(``-T cheap_model=``) scores first and a sample goes to the task's model only
+when a score is near a decision threshold. ``-T grader_runs=N`` grades
+(escalated) samples up to N times, stopping once the three judged criteria
+agree within ``-T tolerance=``. cascade_scorer reports the escalation rate,
+grader calls, tokens and disagreement per run.
+
 Run:
     inspect eval eval_apps.py --model anthropic/claude-sonnet-4-6
+    inspect eval eval_apps.py --model anthropic/claude-sonnet-4-6 -T batch=true
 """
 
+import hashlib
+import json
+import math
 import re
 from pathlib import Path
 
@@ -18,6 +56,8 @@ from inspect_ai.model import (
     ChatMessageUser,
     ContentImage,
     ContentText,
+    ModelOutput,
+    get_model,
 )
 from inspect_ai.scorer import (
     Score,
@@ -25,7 +65,12 @@ from inspect_ai.scorer import (
     scorer,
     stderr,
 )
-from inspect_ai.solver import generate, system_message
+from inspect_ai.solver import generate, solver, system_message
+
+import batch_grading
+import perf_lint
+from hedging import HedgePolicy, LatencyTracker, hedged
+from screenshot_index import ScreenshotIndex
 
 BASE_DIR = Path(__file__).parent
 
@@ -46,6 +91,35 @@ ORIGINAL_PROMPT = (
     "{framework} already provides."
 )
 
+# Prompt variants (see generate_apps.py). A variant's files carry its name as
+# a suffix: app_performance.py, before_performance.png, perf_performance.json.
+# Every variant is graded against the same functional ORIGINAL_PROMPT, so the
+# quality scores of an A/B pair are comparable.
+PROMPT_VARIANTS = ("baseline", "performance")
+
+
+def _variant_file(app_dir: Path, name: str, variant: str) -> Path:
+    stem, suffix = name.rsplit(".", 1)
+    return app_dir / (name if variant == "baseline" else f"{stem}_{variant}.{suffix}")
+
+
+# Screenshot-index cell holding the screenshots each app was last graded with.
+GRADED_CELL = "graded"
+
+# Runtime measurements used for the efficiency criterion:
+# key -> (label, unit, good, bad). A value at or below `good` scores 10, at or
+# above `bad` scores 1, with log-linear interpolation in between.
+PERF_METRICS = {
+    "interaction_latency_ms": ("Interaction latency", "ms", 50, 1000),
+    "bytes_per_interaction": ("Bytes over the wire per interaction", "B", 1_000, 100_000),
+    "invocations_per_keystroke": ("Server invocations per keystroke", "", 0.25, 2.0),
+    "cold_start_s": ("Cold start to first render", "s", 1.0, 10.0),
+    "memory_per_session_kib": ("Memory per active session", "KiB", 100, 10_000),
+    # Browser side (bench.vitals); bands follow the Web Vitals thresholds.
+    "lcp_ms": ("Largest contentful paint", "ms", 1000, 4000),
+    "inp_ms": ("Interaction to next paint (preset click)", "ms", 100, 500),
+}
+
 SYSTEM_PROMPT = """\
 You are an expert code reviewer and UI/UX evaluator. You will be given:
 1. The source code of a Python web app built with a specific framework.
@@ -53,7 +127,7 @@ You are an expert code reviewer and UI/UX evaluator. You will be given:
 3. An "after" screenshot showing the app after a user entered a bill of \
 $85.50, selected 20% tip, and split among 3 people.
 
-You must evaluate the app on THREE criteria, each scored 1-10:
+You must evaluate the app on FOUR criteria, each scored 1-10:
 
 **Criterion 1: Maintainability** (1-10)
 - Is the code well-structured and modular?
@@ -73,12 +147,19 @@ You must evaluate the app on THREE criteria, each scored 1-10:
 - Does it avoid extra packages, CSS, or JavaScript beyond the framework?
 - Do the before/after screenshots confirm the app works as specified?
 
-After your analysis, you MUST end your response with exactly these three \
+**Criterion 4: Efficiency** (1-10)
+- Use the measured runtime numbers when they are provided.
+- Does the app avoid redundant server work, full re-renders and oversized \
+updates per interaction?
+- Does it use the framework's idioms for partial updates and input debouncing?
+
+After your analysis, you MUST end your response with exactly these four \
 lines (scores as integers 1-10):
 
 MAINTAINABILITY_SCORE: <score>
 READABILITY_SCORE: <score>
 ADHERENCE_SCORE: <score>
+EFFICIENCY_SCORE: <score>
 """
 
 EVAL_PROMPT_TEMPLATE = """\
@@ -92,35 +173,116 @@ EVAL_PROMPT_TEMPLATE = """\
 {code}
 ```
 
+### Measured runtime efficiency:
+{perf}
+
 Below are the before and after screenshots of the running app.
 The "before" screenshot shows the app right after launch (default state).
 The "after" screenshot shows the app after entering: bill = $85.50, \
 tip = 20%, split among 3 people.
 
-Please evaluate this app on the three criteria \
-(Maintainability, Readability, Requirement Adherence) and provide your scores.
+Please evaluate this app on the four criteria \
+(Maintainability, Readability, Requirement Adherence, Efficiency) and provide \
+your scores.
 """
 
 
-def _build_samples() -> list[Sample]:
+def _load_perf(app_dir: Path, variant: str = "baseline") -> dict:
+    """Measured runtime metrics for one app (empty if never benchmarked)."""
+    perf_path = _variant_file(app_dir, "perf.json", variant)
+    if not perf_path.exists():
+        return {}
+    perf = json.loads(perf_path.read_text(encoding="utf-8"))
+    return {k: v for k, v in perf.items() if k in PERF_METRICS}
+
+
+def _format_perf(perf: dict) -> str:
+    """Markdown table of the measurements for the eval prompt."""
+    if not perf:
+        return "No runtime measurements are available; judge efficiency from the code."
+    lines = ["| Metric | Value |", "| --- | ---: |"]
+    for key, (label, unit, _, _) in PERF_METRICS.items():
+        if key in perf:
+            lines.append(f"| {label} | {perf[key]:,.2f} {unit} |")
+    return "\n".join(lines)
+
+
+def _efficiency_score(perf: dict) -> float | None:
+    """Deterministic 1-10 efficiency score, or None without measurements."""
+    scores = []
+    for key, (_, _, good, bad) in PERF_METRICS.items():
+        value = perf.get(key)
+        if value is None:
+            continue
+        if value <= good:
+            scores.append(10.0)
+        elif value >= bad:
+            scores.append(1.0)
+        else:
+            fraction = math.log(value / good) / math.log(bad / good)
+            scores.append(10.0 - 9.0 * fraction)
+    return sum(scores) / len(scores) if scores else None
+
+
+def _graded_cell(variant: str) -> str:
+    return GRADED_CELL if variant == "baseline" else f"{GRADED_CELL}-{variant}"
+
+
+def _carried_scores(index: ScreenshotIndex, dirname: str, source_sha: str,
+                    screenshots: dict, variant: str = "baseline") -> dict | None:
+    """The scores of the last grading if the code is the same and the
+    screenshots are visually identical to it, else None."""
+    if not screenshots:
+        return None
+    cell = _graded_cell(variant)
+    scores = None
+    for name, path in screenshots.items():
+        previous = index.latest(dirname, cell, name)
+        if previous is None or previous.get("source_sha") != source_sha:
+            return None
+        if not previous.get("scores"):
+            return None
+        if index.compare(path, dirname, cell, name).status != "identical":
+            return None
+        scores = previous["scores"]
+    return scores
+
+
+def _build_samples(skip_unchanged: bool = False,
+                   variant: str = "baseline") -> list[Sample]:
     """Build one Sample per framework with code + before/after images."""
+    if variant not in PROMPT_VARIANTS:
+        raise ValueError(f"Unknown prompt variant {variant!r}; expected one of {PROMPT_VARIANTS}")
     samples = []
+    index = ScreenshotIndex() if skip_unchanged else None
     for framework, dirname in FRAMEWORKS.items():
         app_dir = BASE_DIR / dirname
-        code_path = app_dir / "app.py"
-        before_path = app_dir / "before.png"
-        after_path = app_dir / "after.png"
+        code_path = _variant_file(app_dir, "app.py", variant)
+        before_path = _variant_file(app_dir, "before.png", variant)
+        after_path = _variant_file(app_dir, "after.png", variant)
 
         if not code_path.exists():
             continue
 
         code = code_path.read_text(encoding="utf-8")
+        source_sha = hashlib.sha256(code.encode("utf-8")).hexdigest()
+        screenshots = {
+            name: str(path) for name, path in (("before", before_path), ("after", after_path))
+            if path.exists()
+        }
+        carried = index is not None and _carried_scores(
+            index, dirname, source_sha, screenshots, variant)
+        if carried:
+            print(f"{dirname}: unchanged since it was last graded, carrying its scores over")
+
         original_prompt = ORIGINAL_PROMPT.format(framework=framework)
+        perf = _load_perf(app_dir, variant)
 
         eval_text = EVAL_PROMPT_TEMPLATE.format(
             framework=framework,
             original_prompt=original_prompt,
             code=code,
+            perf=_format_perf(perf),
         )
 
         content: list = [ContentText(text=eval_text)]
@@ -143,9 +305,17 @@ def _build_samples() -> list[Sample]:
         samples.append(
             Sample(
                 input=[ChatMessageUser(content=content)],
-                target="Evaluate the app on all three criteria.",
+                target="Evaluate the app on all four criteria.",
                 id=dirname,
-                metadata={"framework": framework},
+                metadata={
+                    "framework": framework,
+                    "perf": perf,
+                    "source_sha": source_sha,
+                    "screenshots": screenshots,
+                    "prompt_variant": variant,
+                    "lint": [str(f) for f in perf_lint.lint_file(code_path)],
+                    **({"carried_scores": carried} if carried else {}),
+                },
             )
         )
 
@@ -157,28 +327,59 @@ def _build_samples() -> list[Sample]:
         "maintainability": [mean(), stderr()],
         "readability": [mean(), stderr()],
         "adherence": [mean(), stderr()],
+        "efficiency": [mean(), stderr()],
+        "lint_findings": [mean()],
     }
 )
 def criteria_scorer():
-    """Extract the three criterion scores from model output."""
+    """Extract the criterion scores from model output.
+
+    With adaptive grading the scores are the mean over the grader runs.
+    Efficiency comes from the measured runtime metrics when the sample has
+    any, and from the grader's EFFICIENCY_SCORE otherwise. ``lint_findings``
+    is the number of perf_lint.py findings in the app. Samples skipped as
+    unchanged keep the scores of their last grading.
+    """
+    index = None  # opened on first use, once per run
 
     async def score(state, target):
-        completion = state.output.completion
+        nonlocal index
+        lint_findings = len(state.metadata.get("lint", []))
+        carried = state.metadata.get("carried_scores")
+        if carried:
+            return Score(
+                value={**carried, "lint_findings": lint_findings},
+                explanation="Unchanged since it was last graded; scores carried over.",
+            )
 
-        maintainability = _extract_score(
-            completion, "MAINTAINABILITY_SCORE"
-        )
-        readability = _extract_score(completion, "READABILITY_SCORE")
-        adherence = _extract_score(completion, "ADHERENCE_SCORE")
-
-        return Score(
-            value={
-                "maintainability": maintainability,
-                "readability": readability,
-                "adherence": adherence,
-            },
-            explanation=completion,
-        )
+        completion = state.output.completion
+        # adaptive_generate stores the mean over its grader runs.
+        graded = state.metadata.get("grader_scores") or _grader_scores(completion)
+
+        maintainability = graded["maintainability"]
+        readability = graded["readability"]
+        adherence = graded["adherence"]
+        efficiency = _efficiency_score(state.metadata.get("perf") or {})
+        if efficiency is None:
+            efficiency = graded["efficiency"]
+
+        scores = {
+            "maintainability": maintainability,
+            "readability": readability,
+            "adherence": adherence,
+            "efficiency": efficiency,
+        }
+        # Only a complete grading may later stand in for a re-grade.
+        if not _grading_failed(graded):
+            if index is None:
+                index = ScreenshotIndex()
+            cell = _graded_cell(state.metadata.get("prompt_variant", "baseline"))
+            for name, path in state.metadata.get("screenshots", {}).items():
+                index.record(path, str(state.sample_id), cell, name,
+                             source_sha=state.metadata["source_sha"], scores=scores)
+
+        return Score(value={**scores, "lint_findings": lint_findings},
+                     explanation=completion)
 
     return score
 
@@ -192,14 +393,209 @@ def _extract_score(text: str, label: str) -> float:
     return 0.0
 
 
+SCORE_LABELS = {
+    "maintainability": "MAINTAINABILITY_SCORE",
+    "readability": "READABILITY_SCORE",
+    "adherence": "ADHERENCE_SCORE",
+    "efficiency": "EFFICIENCY_SCORE",
+}
+# The criteria the grader alone decides (efficiency is usually measured).
+JUDGED_CRITERIA = ("maintainability", "readability", "adherence")
+
+# Adaptive grading escalates a cheap grader's verdict when a judged score is
+# within the margin of one of these band edges (poor <= 4 < fair <= 7 < good),
+# i.e. where a point of grader noise would change how the app is ranked. The
+# edges sit between integer scores, so with the default margin of 1 the
+# scores 4, 5, 7 and 8 escalate.
+DECISION_THRESHOLDS = (4.5, 7.5)
+
+
+def _grader_scores(completion: str) -> dict:
+    return {name: _extract_score(completion, label) for name, label in SCORE_LABELS.items()}
+
+
+def _grading_failed(scores: dict) -> bool:
+    """A judged score could not be parsed from the grader's reply."""
+    return any(scores[c] == 0.0 for c in JUDGED_CRITERIA)
+
+
+def _near_threshold(scores: dict, margin: float) -> bool:
+    """A judged score is missing or within ``margin`` of a decision threshold."""
+    return any(
+        scores[c] == 0.0 or any(abs(scores[c] - t) <= margin for t in DECISION_THRESHOLDS)
+        for c in JUDGED_CRITERIA
+    )
+
+
+def _spread(runs: list[dict]) -> float:
+    """Largest disagreement between grader runs on any judged criterion."""
+    return max(max(r[c] for r in runs) - min(r[c] for r in runs) for c in JUDGED_CRITERIA)
+
+
+def _tokens(output: ModelOutput) -> int:
+    return output.usage.total_tokens if output.usage else 0
+
+
+@solver
+def carry_over():
+    """End the solver chain for samples that keep their last scores."""
+
+    async def solve(state, generate):
+        if state.metadata.get("carried_scores"):
+            state.completed = True
+        return state
+
+    return solve
+
+
+@solver
+def batch_generate(samples: list[Sample], poll_interval: float = 30.0):
+    """Grade all samples through one Message Batch instead of per-sample calls.
+
+    The first sample to reach this solver submits (or resumes) the batch for
+    every sample; the rest wait for it and pick up their own reply.
+    """
+    grader = None
+
+    async def solve(state, generate):
+        nonlocal grader
+        if grader is None:
+            model = get_model()
+            requests = batch_grading.build_requests(
+                samples, model=model.name, system=SYSTEM_PROMPT
+            )
+            grader = batch_grading.BatchGrader(requests, poll_interval=poll_interval)
+        completion = await grader.result(str(state.sample_id))
+        state.output = ModelOutput.from_content(model=get_model().name, content=completion)
+        state.messages.append(state.output.message)
+        return state
+
+    return solve
+
+
+@solver
+def hedged_generate(deadline: float = 600.0, first_hedge_after: float = 120.0):
+    """generate(), with a deadline per grading call and a hedged duplicate
+    for calls slower than the 95th percentile of this run's calls so far."""
+    policy = HedgePolicy(
+        deadline_s=deadline,
+        tracker=LatencyTracker(default_s=first_hedge_after),
+    )
+
+    async def solve(state, generate):
+        model = get_model()
+        messages = list(state.messages)
+        state.output = await hedged(lambda: model.generate(messages), policy)
+        state.messages.append(state.output.message)
+        return state
+
+    return solve
+
+
+@solver
+def adaptive_generate(cheap_model: str | None = None, margin: float = 1.0,
+                      runs: int = 1, tolerance: float = 1.0):
+    """Grade with a cheap-model cascade and an early-stopping ensemble.
+
+    With ``cheap_model``, that model grades first and its scores stand unless
+    a judged criterion is near a decision threshold (see DECISION_THRESHOLDS);
+    then the task's model grades. The task's model grades up to ``runs``
+    times, stopping once the judged criteria agree within ``tolerance``; the
+    sample's scores are the mean over those runs. What happened is kept in
+    ``state.metadata["grading"]`` for cascade_scorer().
+    """
+
+    async def solve(state, generate):
+        messages = list(state.messages)
+        grading = {"escalated": 0, "calls": 0, "tokens": 0, "spread": 0.0}
+
+        if cheap_model is not None:
+            output = await get_model(cheap_model).generate(messages)
+            scores = _grader_scores(output.completion)
+            grading["calls"] += 1
+            grading["tokens"] += _tokens(output)
+            if not _near_threshold(scores, margin):
+                state.output, state.metadata["grader_scores"] = output, scores
+                state.metadata["grading"] = grading
+                state.messages.append(output.message)
+                return state
+            grading["escalated"] = 1
+
+        model, graded = get_model(), []
+        for _ in range(max(1, runs)):
+            output = await model.generate(messages)
+            graded.append(_grader_scores(output.completion))
+            grading["calls"] += 1
+            grading["tokens"] += _tokens(output)
+            if len(graded) > 1 and _spread(graded) <= tolerance:
+                break
+        grading["spread"] = _spread(graded)
+        state.output = output
+        state.metadata["grader_scores"] = {
+            name: sum(g[name] for g in graded) / len(graded) for name in SCORE_LABELS
+        }
+        state.metadata["grading"] = grading
+        state.messages.append(output.message)
+        return state
+
+    return solve
+
+
+@scorer(
+    metrics={
+        "escalated": [mean()],
+        "grader_calls": [mean()],
+        "grading_tokens": [mean()],
+        "grader_spread": [mean()],
+    }
+)
+def cascade_scorer():
+    """Per-run grading cost: escalation rate, grader calls and tokens per
+    sample, and how far the ensemble's judged scores were apart."""
+
+    async def score(state, target):
+        grading = state.metadata.get("grading", {})
+        return Score(value={
+            "escalated": grading.get("escalated", 0),
+            "grader_calls": grading.get("calls", 0),
+            "grading_tokens": grading.get("tokens", 0),
+            "grader_spread": grading.get("spread", 0.0),
+        })
+
+    return score
+
+
 @task
-def framework_eval():
+def framework_eval(batch: bool = False, batch_poll: float = 30.0,
+                   skip_unchanged: bool = False, hedge: bool = False,
+                   deadline: float = 600.0, prompt_variant: str = "baseline",
+                   adaptive: bool = False,
+                   cheap_model: str = "anthropic/claude-haiku-4-5",
+                   margin: float = 1.0, grader_runs: int = 1,
+                   tolerance: float = 1.0):
     """Evaluate LLM-generated tip calculator apps across frameworks."""
-    return Task(
-        dataset=MemoryDataset(_build_samples()),
-        solver=[
+    samples = _build_samples(skip_unchanged, prompt_variant)
+    scorers = [criteria_scorer()]
+    if batch and (adaptive or grader_runs > 1):
+        raise ValueError("batch=true cannot be combined with adaptive grading")
+    if hedge and (batch or adaptive or grader_runs > 1):
+        raise ValueError("hedge=true cannot be combined with batch or adaptive grading")
+    if batch:
+        to_grade = [s for s in samples if "carried_scores" not in s.metadata]
+        solvers = [batch_generate(to_grade, poll_interval=batch_poll)]
+    elif adaptive or grader_runs > 1:
+        solvers = [
             system_message(SYSTEM_PROMPT),
-            generate(),
-        ],
-        scorer=criteria_scorer(),
+            adaptive_generate(cheap_model if adaptive else None, margin,
+                              grader_runs, tolerance),
+        ]
+        scorers.append(cascade_scorer())
+    elif hedge:
+        solvers = [system_message(SYSTEM_PROMPT), hedged_generate(deadline)]
+    else:
+        solvers = [system_message(SYSTEM_PROMPT), generate()]
+    return Task(
+        dataset=MemoryDataset(samples),
+        solver=[carry_over(), *solvers],
+        scorer=scorers,
     )
@@ -4,16 +4,46 @@ Generate tip calculator web apps for multiple Python frameworks using ChatAnthro
 Uses chatlas with claude-sonnet-4-6 to generate a basic tip calculator app
 for Streamlit, Plotly Dash, Panel, and Shiny for Python.
 
+The model looks up API details with a local documentation index of the
+installed frameworks (see docs_index.py) rather than web search, so lookups
+are fast, offline and reproducible. ``--web-search`` restores web search.
+
+A response cut off at ``max_tokens`` is continued from its last complete
+top-level statement, and a file that does not parse has only the failing
+statement sent back for repair, instead of regenerating the whole app.
+
+Each initial request has a deadline (``--deadline``) and is hedged: if it is
+slower than the 95th percentile of recent generations, a duplicate request
+is started and the first to finish is kept (see hedging.py).
+
+``--variant performance`` uses a prompt that also asks for each framework's
+performance idioms and saves to ``<dir>/app_performance.py``; ``--variant
+all`` generates both for an A/B comparison (see bench/ab.py).
+
+With ``--lint`` the saved app is checked by perf_lint.py, and any
+performance findings are sent back in a follow-up turn for a fixed version.
+
 Prerequisites:
     - pip install "chatlas[anthropic]"
     - ANTHROPIC_API_KEY environment variable set
 """
 
+import argparse
+import ast
+import asyncio
 import re
+import time
 from pathlib import Path
 
 from chatlas import ChatAnthropic, tool_web_search
 
+import perf_lint
+import results_db
+from docs_index import DocsIndex, make_docs_tool
+from hedging import HedgePolicy, LatencyTracker, hedged
+
+MODEL = "claude-sonnet-4-6"
+
 SYSTEM_PROMPT = (
     "You are an expert Python web developer. "
     "When asked to create an app, your ENTIRE response must be valid Python "
@@ -25,7 +55,7 @@ SYSTEM_PROMPT = (
     "The very last character must be the end of the Python code. "
     "Do not use any extra packages, CSS, or JavaScript beyond what the specified "
     "web framework already provides out of the box. "
-    "If you use web search to look up API details, still respond with ONLY "
+    "If you use a search tool to look up API details, still respond with ONLY "
     "the Python source code — no search summaries or explanations."
 )
 
@@ -39,6 +69,82 @@ PROMPT_TEMPLATE = (
     "already provides."
 )
 
+# The "performance" prompt variant asks for the same app plus efficient idioms;
+# the hints name each framework's own tools for it.
+PERFORMANCE_PROMPT_TEMPLATE = PROMPT_TEMPLATE + (
+    " Follow {framework} performance best practices: keep purely presentational "
+    "logic on the client where {framework} allows it, debounce text and number "
+    "inputs so typing does not recompute on every keystroke, update only the "
+    "parts of the page that changed, and never rebuild components that could "
+    "be updated in place. {hints}"
+)
+
+PERFORMANCE_HINTS = {
+    "Streamlit": (
+        "Use st.fragment for sections that change independently, widget keys "
+        "and on_click/on_change callbacks instead of st.rerun() or syncing "
+        "st.session_state in the script body, and st.cache_data for "
+        "expensive pure functions."
+    ),
+    "Plotly Dash": (
+        "Use clientside_callback for display-only updates, dcc.Input(debounce=True), "
+        "prevent_initial_call where the initial call is redundant, one callback "
+        "per independent output group, and do not run with debug=True."
+    ),
+    "Panel": (
+        "Create panes and widgets once and update their .object/.value from a "
+        "single watcher wrapped in pn.io.hold(), use value_throttled for "
+        "sliders, and do not return new layouts from pn.bind/pn.depends "
+        "functions."
+    ),
+    "Shiny for Python": (
+        "Share computations through @reactive.calc, render individual values "
+        "with render.text instead of re-rendering UI with @render.ui, update "
+        "inputs with ui.update_*, and debounce numeric inputs."
+    ),
+}
+
+# Prompt variant -> file the generated app is saved to in its directory.
+PROMPT_VARIANTS = {
+    "baseline": "app.py",
+    "performance": "app_performance.py",
+}
+
+
+def build_prompt(framework: str, variant: str = "baseline") -> str:
+    if variant == "performance":
+        return PERFORMANCE_PROMPT_TEMPLATE.format(
+            framework=framework, hints=PERFORMANCE_HINTS[framework]
+        )
+    return PROMPT_TEMPLATE.format(framework=framework)
+
+
+CONTINUE_PROMPT = (
+    "Your previous response was cut off. Continue the Python file from exactly "
+    "after the line below, without repeating it or anything before it. "
+    "Respond with ONLY the remaining Python source code.\n\n"
+    "Last complete line:\n{last_line}"
+)
+
+REPAIR_PROMPT = (
+    "The generated file does not parse: {error}. "
+    "Here is the failing top-level statement (lines {start}-{end}):\n\n"
+    "{region}\n\n"
+    "Respond with ONLY the corrected replacement for these lines, as Python "
+    "source code, and nothing else."
+)
+
+LINT_PROMPT = (
+    "A performance lint of the app found these problems:\n\n{findings}\n\n"
+    "Fix them without changing what the app does or how it looks. Respond "
+    "with ONLY the complete corrected Python file."
+)
+
+# Follow-up calls allowed per app before giving up and saving what we have.
+MAX_CONTINUATIONS = 3
+MAX_REPAIRS = 2
+MAX_LINT_ROUNDS = 2
+
 FRAMEWORKS = {
     "Streamlit": "streamlit",
     "Plotly Dash": "dash",
@@ -94,42 +200,225 @@ def strip_markdown_fences(code: str) -> str:
     return "\n".join(lines).strip()
 
 
-def generate_app(framework: str) -> str:
-    """Generate a tip calculator app for the given framework."""
-    chat = ChatAnthropic(
-        model="claude-sonnet-4-6",
-        system_prompt=SYSTEM_PROMPT,
-        max_tokens=4096,
-    )
-    chat.register_tool(tool_web_search())
+def _top_level_starts(lines: list[str]) -> list[int]:
+    """Indices of lines that can start a top-level statement.
+
+    Decorators are folded into the statement they decorate.
+    """
+    starts = []
+    for i, line in enumerate(lines):
+        if not line or line[0] in " \t#)]}" or (i and lines[i - 1].startswith("@")):
+            continue
+        starts.append(i)
+    return starts
+
+
+def last_complete_statement(code: str) -> str:
+    """The longest prefix of ``code`` ending at a top-level statement that parses."""
+    lines = code.split("\n")
+    for end in reversed(_top_level_starts(lines) + [len(lines)]):
+        prefix = "\n".join(lines[:end]).rstrip()
+        try:
+            ast.parse(prefix)
+        except SyntaxError:
+            continue
+        return prefix
+    return ""
 
-    prompt = PROMPT_TEMPLATE.format(framework=framework)
-    response = chat.chat(prompt, echo="none")
-    code = strip_markdown_fences(str(response))
+
+def failing_region(code: str, lineno: int) -> tuple[int, int]:
+    """0-based ``[start, end)`` line span of the top-level statement at ``lineno``."""
+    lines = code.split("\n")
+    starts = _top_level_starts(lines)
+    start = max((i for i in starts if i <= lineno), default=0)
+    end = min((i for i in starts if i > lineno), default=len(lines))
+    return start, end
+
+
+def _fenced_code(text: str) -> str:
+    """The fenced block of a follow-up reply, if any (prose is not trimmed:
+    a fragment may legitimately start or end anywhere)."""
+    match = re.search(r"```(?:python)?\s*\n(.+?)```", text, re.DOTALL)
+    return (match.group(1) if match else text).strip("\n")
+
+
+def _truncated(chat) -> bool:
+    turn = chat.get_last_turn()
+    return getattr(turn, "finish_reason", None) == "max_tokens"
+
+
+def complete_and_repair(chat, code: str) -> str:
+    """Continue a truncated response and repair syntax errors in place.
+
+    Each fix is a small follow-up in the same chat: a continuation from the
+    last complete top-level statement, or just the failing statement sent
+    back for repair, instead of regenerating the whole file.
+    """
+    for _ in range(MAX_CONTINUATIONS):
+        if not _truncated(chat):
+            break
+        code = last_complete_statement(code)
+        last_line = code.rstrip().split("\n")[-1] if code else "(nothing yet)"
+        print("  Response truncated; requesting a continuation")
+        more = chat.chat(CONTINUE_PROMPT.format(last_line=last_line), echo="none")
+        code = f"{code}\n{_fenced_code(str(more))}".strip()
+
+    for _ in range(MAX_REPAIRS):
+        try:
+            ast.parse(code)
+            break
+        except SyntaxError as err:
+            lines = code.split("\n")
+            start, end = failing_region(code, (err.lineno or 1) - 1)
+            print(f"  Syntax error on line {err.lineno}; repairing lines {start + 1}-{end}")
+            fixed = chat.chat(
+                REPAIR_PROMPT.format(
+                    error=f"{err.msg} (line {err.lineno})",
+                    start=start + 1,
+                    end=end,
+                    region="\n".join(lines[start:end]),
+                ),
+                echo="none",
+            )
+            replacement = _fenced_code(str(fixed)).split("\n")
+            code = "\n".join(lines[:start] + replacement + [""] + lines[end:]).strip()
+    return code
+
+
+def fix_lint_findings(chat, code: str, dirname: str) -> str:
+    """Send perf_lint findings back in the same chat until none remain.
+
+    A reply is only kept if it parses and has fewer findings than before.
+    """
+    findings = perf_lint.lint_source(code, dirname)
+    for _ in range(MAX_LINT_ROUNDS):
+        if not findings:
+            break
+        print(f"  {len(findings)} lint finding(s); requesting a fix")
+        listing = "\n".join(f"- line {f.line}: {f.rule} {f.message}" for f in findings)
+        reply = chat.chat(LINT_PROMPT.format(findings=listing), echo="none")
+        fixed = complete_and_repair(chat, strip_markdown_fences(str(reply)))
+        try:
+            ast.parse(fixed)
+        except SyntaxError:
+            break
+        remaining = perf_lint.lint_source(fixed, dirname)
+        if len(remaining) >= len(findings):
+            break
+        code, findings = fixed, remaining
+    return code
+
+
+def _token_totals(chat) -> tuple[int, int]:
+    """Input and output tokens over the whole chat."""
+    turns = chat.get_tokens()
+    input_tokens = sum(t.get("tokens", 0) for t in turns if t.get("role") == "user")
+    output_tokens = sum(t.get("tokens", 0) for t in turns if t.get("role") == "assistant")
+    return input_tokens, output_tokens
+
+
+def generate_app(framework: str, docs: DocsIndex | None = None,
+                 run_id: str | None = None,
+                 policy: HedgePolicy | None = None, lint: bool = False,
+                 variant: str = "baseline") -> str:
+    """Generate a tip calculator app for the given framework.
+
+    With ``docs`` the model searches the local documentation index;
+    without it, it falls back to web search. With ``run_id`` the generation
+    is recorded in the results database (see results_db.py). ``policy``
+    sets the deadline and hedging of the initial request (none by default).
+    With ``lint`` perf_lint.py findings are fed back for a fixed version.
+    ``variant`` selects the prompt (see PROMPT_VARIANTS).
+    """
+    policy = policy or HedgePolicy(enabled=False, deadline_s=None)
+    prompt = build_prompt(framework, variant)
+
+    async def attempt():
+        # Every attempt needs its own chat: a hedged loser is cancelled midway.
+        chat = ChatAnthropic(
+            model=MODEL,
+            system_prompt=SYSTEM_PROMPT,
+            max_tokens=4096,
+        )
+        if docs is not None:
+            chat.register_tool(make_docs_tool(docs, FRAMEWORKS[framework]))
+        else:
+            chat.register_tool(tool_web_search())
+        response = await chat.chat_async(prompt, echo="none")
+        return chat, await response.get_content()
+
+    start = time.perf_counter()
+    chat, response = asyncio.run(hedged(attempt, policy))
+    request_latency_s = time.perf_counter() - start
+    code = complete_and_repair(chat, strip_markdown_fences(str(response)))
+    if lint:
+        code = fix_lint_findings(chat, code, FRAMEWORKS[framework])
+    latency_s = time.perf_counter() - start
 
     print(f"  Tokens used: {chat.get_tokens()}")
+    if run_id is not None:
+        input_tokens, output_tokens = _token_totals(chat)
+        results_db.record_generation(
+            run_id, FRAMEWORKS[framework], model=MODEL, prompt=prompt, code=code,
+            input_tokens=input_tokens, output_tokens=output_tokens,
+            latency_s=latency_s, request_latency_s=request_latency_s,
+            prompt_variant=variant,
+        )
     return code
 
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--web-search", action="store_true",
+                        help="use web search instead of the local docs index")
+    parser.add_argument("--deadline", type=float, default=600, metavar="SECONDS",
+                        help="give up on a framework's initial request after this long")
+    parser.add_argument("--no-hedge", action="store_true",
+                        help="never send a duplicate request for a slow call")
+    parser.add_argument("--variant", choices=[*PROMPT_VARIANTS, "all"], default="baseline",
+                        help="prompt variant to generate (\"all\" for an A/B pair)")
+    parser.add_argument("--lint", action="store_true",
+                        help="feed perf_lint.py findings back to the model for a fix")
+    args = parser.parse_args()
+
     output_root = Path(__file__).parent
+    docs = None if args.web_search else DocsIndex.open()
+    run_id = results_db.new_run_id("generation")
+    policy = HedgePolicy(
+        deadline_s=args.deadline,
+        enabled=not args.no_hedge,
+        tracker=LatencyTracker().seed_from_results_db(),
+    )
+    variants = list(PROMPT_VARIANTS) if args.variant == "all" else [args.variant]
+    failed = []
 
     for framework, dirname in FRAMEWORKS.items():
-        print(f"\n{'='*60}")
-        print(f"Generating app for: {framework}")
-        print(f"{'='*60}")
+        for variant in variants:
+            print(f"\n{'='*60}")
+            print(f"Generating app for: {framework} ({variant} prompt)")
+            print(f"{'='*60}")
 
-        code = generate_app(framework)
+            try:
+                code = generate_app(framework, docs, run_id, policy,
+                                    lint=args.lint, variant=variant)
+            except TimeoutError as err:
+                print(f"  Skipped: {err}")
+                failed.append(f"{framework} ({variant})")
+                continue
 
-        out_dir = output_root / dirname
-        out_dir.mkdir(parents=True, exist_ok=True)
-        out_file = out_dir / "app.py"
-        out_file.write_text(code, encoding="utf-8")
+            out_dir = output_root / dirname
+            out_dir.mkdir(parents=True, exist_ok=True)
+            out_file = out_dir / PROMPT_VARIANTS[variant]
+            out_file.write_text(code, encoding="utf-8")
 
-        print(f"  Saved to: {out_file}")
+            print(f"  Saved to: {out_file}")
 
     print(f"\n{'='*60}")
-    print("All apps generated successfully!")
+    if failed:
+        print(f"Missed the deadline: {', '.join(failed)}")
+    else:
+        print("All apps generated successfully!")
+    print(f"  Hedged requests: {policy.hedges} ({policy.hedge_wins} finished first)")
     print(f"{'='*60}")
 
 
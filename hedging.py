@@ -0,0 +1,209 @@
+"""
+Hedged LLM calls with per-call deadlines.
+
+A call that has not finished after a latency percentile learned from recent
+calls gets a duplicate ("hedge") request; whichever finishes first wins and
+the other is cancelled. A retry budget caps hedges at a fraction of primary
+calls, so a slow API cannot multiply cost, and a deadline bounds each call.
+
+Used by generate_apps.py (``--deadline``, ``--no-hedge``) and by
+eval_apps.py (``-T hedge=true``). The percentile is seeded from the
+initial-request latencies of recent generations in the results database
+(see results_db.py; continuation, repair and lint follow-ups are not part of
+the hedged call, so they are left out) and then follows the calls made in
+the current process.
+
+``python hedging.py`` runs the policy against a local stand-in with injected
+latency and reports tail latency and hedge counts with and without hedging.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import deque
+from contextlib import closing
+from dataclasses import dataclass, field
+
+
+class LatencyTracker:
+    """Rolling window of recent call latencies (seconds)."""
+
+    def __init__(self, window: int = 200, min_samples: int = 5,
+                 default_s: float = 60.0):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.default_s = default_s
+
+    def seed_from_results_db(self, limit: int = 200, path=None) -> "LatencyTracker":
+        """Start from the latest initial-request latencies, if any were recorded."""
+        import results_db
+
+        with closing(results_db.connect(path or results_db.DB_PATH)) as conn:
+            rows = conn.execute(
+                "SELECT request_latency_s FROM generations"
+                " WHERE request_latency_s IS NOT NULL"
+                " ORDER BY created_at DESC LIMIT ?", (limit,),
+            ).fetchall()
+        self.samples.extend(row["request_latency_s"] for row in reversed(rows))
+        return self
+
+    def observe(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> float:
+        """The ``pct``-th percentile, or ``default_s`` without enough data."""
+        if len(self.samples) < self.min_samples:
+            return self.default_s
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+@dataclass
+class RetryBudget:
+    """Token bucket: each primary call earns ``ratio`` hedges, up to ``cap``.
+
+    ``reserve`` hedges are available up front so short runs can hedge too.
+    """
+
+    ratio: float = 0.1
+    reserve: float = 2.0
+    cap: float = 10.0
+    tokens: float = field(init=False)
+
+    def __post_init__(self):
+        self.tokens = self.reserve
+
+    def deposit(self):
+        self.tokens = min(self.cap, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+@dataclass
+class HedgePolicy:
+    """When to hedge and when to give up on a call."""
+
+    percentile: float = 95.0
+    deadline_s: float | None = 600.0
+    enabled: bool = True
+    tracker: LatencyTracker = field(default_factory=LatencyTracker)
+    budget: RetryBudget = field(default_factory=RetryBudget)
+    hedges: int = 0
+    hedge_wins: int = 0
+
+    def hedge_after(self) -> float:
+        return self.tracker.percentile(self.percentile)
+
+
+async def hedged(attempt, policy: HedgePolicy):
+    """Run ``attempt()`` (a coroutine factory), hedging it once if slow.
+
+    Each attempt must be independent (e.g. build its own chat), since the
+    loser is cancelled midway. Raises ``TimeoutError`` at the deadline.
+    """
+    start = time.perf_counter()
+    policy.budget.deposit()
+    primary = asyncio.ensure_future(attempt())
+    tasks = [primary]
+
+    def remaining():
+        if policy.deadline_s is None:
+            return None
+        return max(0.0, policy.deadline_s - (time.perf_counter() - start))
+
+    try:
+        if policy.enabled:
+            wait_s = policy.hedge_after()
+            if remaining() is not None:
+                wait_s = min(wait_s, remaining())
+            done, _ = await asyncio.wait(tasks, timeout=wait_s)
+            if not done and (remaining() is None or remaining() > 0) \
+                    and policy.budget.withdraw():
+                policy.hedges += 1
+                tasks.append(asyncio.ensure_future(attempt()))
+
+        while True:
+            done, _ = await asyncio.wait(
+                tasks, timeout=remaining(), return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                raise TimeoutError(f"LLM call exceeded its {policy.deadline_s:g}s deadline")
+            winner = next(iter(done))
+            if winner.exception() is None or len(tasks) == 1:
+                break
+            # One attempt failed while the other may still succeed.
+            tasks.remove(winner)
+        result = winner.result()
+        if winner is not primary:
+            policy.hedge_wins += 1
+        policy.tracker.observe(time.perf_counter() - start)
+        return result
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+# ── Local stand-in with injected latency ──────────────────────────────────────
+def stand_in(median_s: float, stall_p: float, stall_s: float, rng: random.Random):
+    """A fake LLM call: log-normal latency, stalling with probability ``stall_p``."""
+
+    async def call():
+        latency = rng.lognormvariate(0, 0.3) * median_s
+        if rng.random() < stall_p:
+            latency += stall_s
+        await asyncio.sleep(latency)
+        return latency
+
+    return call
+
+
+async def _simulate(calls: int, policy: HedgePolicy, call) -> list[float]:
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        try:
+            await hedged(call, policy)
+        except TimeoutError:
+            pass
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--median-ms", type=float, default=20)
+    parser.add_argument("--stall-p", type=float, default=0.05,
+                        help="probability that a call stalls")
+    parser.add_argument("--stall-ms", type=float, default=500)
+    parser.add_argument("--percentile", type=float, default=95)
+    parser.add_argument("--deadline-ms", type=float, default=2000)
+    args = parser.parse_args()
+
+    for enabled in (False, True):
+        policy = HedgePolicy(
+            percentile=args.percentile,
+            deadline_s=args.deadline_ms / 1000,
+            enabled=enabled,
+            tracker=LatencyTracker(default_s=args.median_ms * 3 / 1000),
+        )
+        call = stand_in(args.median_ms / 1000, args.stall_p, args.stall_ms / 1000,
+                        random.Random(0))
+        latencies = sorted(asyncio.run(_simulate(args.calls, policy, call)))
+        p50 = statistics.median(latencies) * 1000
+        p99 = latencies[int(0.99 * (len(latencies) - 1))] * 1000
+        print(f"hedging {'on ' if enabled else 'off'}: p50 {p50:6.1f} ms  "
+              f"p99 {p99:6.1f} ms  max {latencies[-1] * 1000:6.1f} ms  "
+              f"hedges {policy.hedges} ({policy.hedge_wins} won)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+Serve all four apps from one process and one port.
+
+One ASGI host (FastAPI, run by uvicorn) mounts every app under its own
+prefix:
+
+    /shiny/      the Shiny ``App``, natively
+    /dash/       the Dash Flask ``server``, through a small WSGI adapter that
+                 runs requests on the event loop's shared thread pool
+    /panel       the Panel app, through Panel's FastAPI integration
+                 (``panel.io.fastapi``, needs ``bokeh-fastapi``)
+    /streamlit/  a Streamlit sidecar process, reverse-proxied (HTTP and
+                 websocket), since Streamlit has no embeddable server
+
+Everything shares one event loop, one thread pool and one static-asset
+cache (static_cache.py wraps the Shiny and Dash mounts and Panel's static
+file mounts, so the per-app layers are turned off; the Streamlit proxy is
+passed through untouched). Side-by-side comparisons and load tests then hit a
+single warm process, and the demo deployment needs one runtime instead of
+four (plus the Streamlit sidecar).
+
+Run:
+    python host.py --port 8000
+    python host.py --port 8000 --no-streamlit
+"""
+
+import argparse
+import asyncio
+import os
+import runpy
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+
+import httpx
+import uvicorn
+import websockets
+from fastapi import FastAPI
+from fastapi.responses import HTMLResponse
+from starlette.routing import Mount
+
+import static_cache
+
+BASE_DIR = Path(__file__).parent
+MOUNTS = {
+    "Streamlit": "/streamlit/",
+    "Plotly Dash": "/dash/",
+    "Panel": "/panel",
+    "Shiny for Python": "/shiny/",
+}
+
+
+@contextmanager
+def _environ(**values):
+    """Set environment variables for the duration of the block."""
+    previous = {name: os.environ.get(name) for name in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+# ── WSGI on the shared executor ───────────────────────────────────────────────
+def wsgi_to_asgi(wsgi_app):
+    """Minimal WSGI adapter: buffers each request and response (Dash sends
+    small JSON and static files) and runs the app on the loop's default
+    executor, i.e. the host's one thread pool."""
+    import io
+
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        body = bytearray()
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        server_name, server_port = scope.get("server") or ("127.0.0.1", 80)
+        client_addr, client_port = scope.get("client") or ("", 0)
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": scope.get("root_path", ""),
+            "PATH_INFO": scope["path"].removeprefix(scope.get("root_path", "")) or "/",
+            "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+            "SERVER_NAME": server_name,
+            "SERVER_PORT": str(server_port),
+            "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+            "REMOTE_ADDR": client_addr,
+            "REMOTE_PORT": str(client_port),
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": io.BytesIO(bytes(body)),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        for name, value in scope["headers"]:
+            key = name.decode("latin-1").upper().replace("-", "_")
+            if key not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                key = f"HTTP_{key}"
+            environ[key] = value.decode("latin-1")
+
+        def call():
+            captured = {}
+
+            def start_response(status, headers, exc_info=None):
+                captured["status"], captured["headers"] = status, headers
+                return chunks.append
+
+            chunks = []
+            result = wsgi_app(environ, start_response)
+            try:
+                chunks.extend(result)
+            finally:
+                if hasattr(result, "close"):
+                    result.close()
+            return captured, b"".join(chunks)
+
+        captured, payload = await asyncio.get_running_loop().run_in_executor(None, call)
+        await send({
+            "type": "http.response.start",
+            "status": int(captured["status"].split()[0]),
+            "headers": [(k.lower().encode("latin-1"), v.encode("latin-1"))
+                        for k, v in captured["headers"]],
+        })
+        await send({"type": "http.response.body", "body": payload})
+
+    return app
+
+
+# ── Streamlit sidecar ─────────────────────────────────────────────────────────
+_HANDSHAKE_HEADERS = {b"host", b"upgrade", b"connection", b"sec-websocket-key",
+                      b"sec-websocket-version", b"sec-websocket-extensions",
+                      b"sec-websocket-protocol"}
+
+
+class StreamlitSidecar:
+    """``streamlit run`` on a private port, proxied under ``/streamlit``."""
+
+    def __init__(self, port: int):
+        self.port = port
+        self.proc = None
+        self.client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=None)
+
+    def start(self):
+        self.proc = subprocess.Popen([
+            sys.executable, "-m", "streamlit", "run", str(BASE_DIR / "streamlit" / "app.py"),
+            "--server.port", str(self.port),
+            "--server.address", "127.0.0.1",
+            "--server.baseUrlPath", "streamlit",
+            "--server.headless", "true",
+            "--browser.gatherUsageStats", "false",
+        ], cwd=BASE_DIR)
+
+    async def stop(self):
+        await self.client.aclose()
+        if self.proc is not None:
+            self.proc.terminate()
+            await asyncio.to_thread(self.proc.wait, 10)
+
+    async def __call__(self, scope, receive, send):
+        # ``raw_path`` keeps the /streamlit prefix, which the sidecar expects.
+        path = scope.get("raw_path", b"").decode() or scope["path"]
+        query = scope.get("query_string", b"").decode()
+        target = path + (f"?{query}" if query else "")
+        if scope["type"] == "websocket":
+            return await self._websocket(scope, receive, send, target)
+
+        body = bytearray()
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        headers = [(k, v) for k, v in scope["headers"] if k.lower() != b"host"]
+        request = self.client.build_request(scope["method"], target, headers=headers,
+                                            content=bytes(body))
+        response = await self.client.send(request, stream=True)
+        try:
+            await send({
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": [(k, v) for k, v in response.headers.raw
+                            if k.lower() not in (b"transfer-encoding", b"connection")],
+            })
+            async for chunk in response.aiter_raw():
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            await response.aclose()
+
+    async def _websocket(self, scope, receive, send, target):
+        await receive()  # websocket.connect
+        subprotocols = scope.get("subprotocols") or None
+        # Client headers (cookies included) minus the handshake's own, which
+        # websockets sets for the upstream connection.
+        headers = [(k.decode("latin-1"), v.decode("latin-1")) for k, v in scope["headers"]
+                   if k.lower() not in _HANDSHAKE_HEADERS]
+        async with websockets.connect(f"ws://127.0.0.1:{self.port}{target}",
+                                      subprotocols=subprotocols, additional_headers=headers,
+                                      max_size=None) as upstream:
+            await send({"type": "websocket.accept", "subprotocol": upstream.subprotocol})
+
+            async def client_to_upstream():
+                while True:
+                    message = await receive()
+                    if message["type"] == "websocket.disconnect":
+                        await upstream.close()
+                        return
+                    if message.get("bytes") is not None:
+                        await upstream.send(message["bytes"])
+                    else:
+                        await upstream.send(message.get("text") or "")
+
+            async def upstream_to_client():
+                async for data in upstream:
+                    key = "bytes" if isinstance(data, bytes) else "text"
+                    await send({"type": "websocket.send", key: data})
+                await send({"type": "websocket.close"})
+
+            tasks = [asyncio.ensure_future(client_to_upstream()),
+                     asyncio.ensure_future(upstream_to_client())]
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in tasks:
+                task.cancel()
+
+
+# ── Host ──────────────────────────────────────────────────────────────────────
+def create_host(streamlit_port: int | None = None, workers: int = 16):
+    """The FastAPI host with every app mounted; static assets go through one
+    shared static_cache."""
+    from panel.io.fastapi import add_applications
+
+    # The apps' own compression layers are off: the host has one for all.
+    # Dash reads its URL prefix when the app is created, i.e. during the run.
+    with _environ(TIP_STATIC_CACHE="0", DASH_REQUESTS_PATHNAME_PREFIX=MOUNTS["Plotly Dash"]):
+        shiny_app = runpy.run_path(str(BASE_DIR / "shiny" / "app.py"))["app"]
+        dash_app = runpy.run_path(str(BASE_DIR / "dash" / "app.py"), run_name="dash_app")["app"]
+    assets = static_cache.AssetCache()
+
+    sidecar = StreamlitSidecar(streamlit_port) if streamlit_port else None
+
+    @asynccontextmanager
+    async def lifespan(_app):
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="host")
+        )
+        if sidecar:
+            sidecar.start()
+        yield
+        if sidecar:
+            await sidecar.stop()
+
+    host = FastAPI(lifespan=lifespan, docs_url=None, redoc_url=None, openapi_url=None)
+
+    @host.get("/", response_class=HTMLResponse)
+    def index():
+        links = "".join(
+            f'<li><a href="{path}">{name}</a></li>' for name, path in MOUNTS.items()
+            if sidecar or name != "Streamlit"
+        )
+        return f"<h1>Tip calculator showdown</h1><ul>{links}</ul>"
+
+    before = len(host.routes)
+    add_applications({MOUNTS["Panel"]: str(BASE_DIR / "panel" / "app.py")}, app=host)
+    for route in host.routes[before:]:
+        if isinstance(route, Mount):  # Bokeh's and Panel's static files
+            route.app = static_cache.asgi(route.app, cache=assets)
+    host.mount(MOUNTS["Shiny for Python"].rstrip("/"),
+               static_cache.asgi(shiny_app, cache_html=True, cache=assets))
+    host.mount(MOUNTS["Plotly Dash"].rstrip("/"),
+               static_cache.asgi(wsgi_to_asgi(dash_app.server), cache_html=True, cache=assets))
+    if sidecar:
+        host.mount(MOUNTS["Streamlit"].rstrip("/"), sidecar)
+    return host
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--streamlit-port", type=int, default=8501,
+                        help="private port of the Streamlit sidecar")
+    parser.add_argument("--no-streamlit", action="store_true")
+    parser.add_argument("--workers", type=int, default=16,
+                        help="size of the shared thread pool")
+    args = parser.parse_args()
+
+    app = create_host(None if args.no_streamlit else args.streamlit_port, args.workers)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
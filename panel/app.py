@@ -1,7 +1,21 @@
+import io
+import sys
+from pathlib import Path
+
+import pandas as pd
 import panel as pn
 import param
 
-pn.extension(sizing_mode="stretch_width")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import static_cache  # noqa: E402  (precompressed assets, see static_cache.py)
+import tipcore  # noqa: E402  (shared arithmetic, see tipcore.py)
+
+# throttled: sliders only send their value on release, not on every drag step
+# (numeric inputs already commit on Enter/blur), so a gesture is one update.
+pn.extension(sizing_mode="stretch_width", throttled=True)
+
+# Bokeh/Panel JS, CSS and template assets from memory, precompressed.
+static_cache.install_tornado()
 
 # ── Colour palette ──────────────────────────────────────────────────────────
 CLR_HEADER_BG  = "#2C3E50"
@@ -17,6 +31,29 @@ CLR_PRESET_OFF = "#ECF0F1"
 CLR_PRESET_TXT_ON  = "#FFFFFF"
 CLR_PRESET_TXT_OFF = "#2C3E50"
 
+# ── Session-invariant HTML ───────────────────────────────────────────────────
+STATIC_HTML = {
+    "header": f"""
+    <div style="background:{CLR_HEADER_BG};padding:22px 28px;
+                border-radius:12px;margin-bottom:8px;">
+      <h1 style="color:{CLR_HEADER_FG};margin:0 0 4px 0;font-size:28px;">
+        💰 Tip Calculator
+      </h1>
+      <p style="color:#B2BFCC;margin:0;font-size:14px;">
+        Instantly calculate tip, total, and per-person split.
+      </p>
+    </div>
+    """,
+    "section_divider": (
+        f"<hr style='border:none;border-top:1px solid {CLR_DIVIDER};"
+        "margin:10px 0;'>"
+    ),
+    "result_divider": (
+        f"<hr style='border:none;border-top:1px solid {CLR_DIVIDER};"
+        "margin:6px 0;'>"
+    ),
+}
+
 # ── Widgets ──────────────────────────────────────────────────────────────────
 bill_input = pn.widgets.FloatInput(
     name="Bill Amount ($)",
@@ -50,108 +87,136 @@ split_input = pn.widgets.IntInput(
 )
 
 # ── Preset-button callbacks ───────────────────────────────────────────────────
+# Handlers run under pn.io.hold(), so all the slider, button and result changes
+# caused by one user action reach the browser as a single document patch.
+PRESETS = [(preset_15, 15), (preset_18, 18), (preset_20, 20)]
+
 def _update_presets(active_pct):
     """Highlight the active preset button."""
-    for btn, pct in [(preset_15, 15), (preset_18, 18), (preset_20, 20)]:
+    for btn, pct in PRESETS:
         if abs(active_pct - pct) < 0.01:
             btn.button_type = "success"
         else:
             btn.button_type = "default"
 
-def on_preset_15(event):
-    tip_slider.value = 15.0
-    _update_presets(15)
+@pn.io.hold()
+def _apply_preset(pct):
+    """Move the slider; _refresh then highlights the button and the results."""
+    tip_slider.value = float(pct)
 
-def on_preset_18(event):
-    tip_slider.value = 18.0
-    _update_presets(18)
+for _btn, _pct in PRESETS:
+    _btn.on_click(lambda event, pct=_pct: _apply_preset(pct))
 
-def on_preset_20(event):
-    tip_slider.value = 20.0
-    _update_presets(20)
+# ── Result pane ───────────────────────────────────────────────────────────────
+# Built once; _update_results only swaps the `object` of the value panes and
+# toggles `visible` on the split row, so each change is a small property patch.
+def _value_html(value, big=False, color=CLR_ACCENT):
+    font_size   = "22px" if big else "16px"
+    font_weight = "700"  if big else "500"
+    return (f"<span style='color:{color};font-size:{font_size};"
+            f"font-weight:{font_weight};'>{value}</span>")
 
-preset_15.on_click(on_preset_15)
-preset_18.on_click(on_preset_18)
-preset_20.on_click(on_preset_20)
+def _label_html(label):
+    return f"<span style='color:{CLR_LABEL};font-size:14px;'>{label}</span>"
 
-def on_slider_change(event):
-    """Deactivate all presets if the slider is moved off a preset value."""
-    _update_presets(event.new)
+def _result_row(label, big=False, color=CLR_ACCENT):
+    """Return (row, label_pane, value_pane) for one result line."""
+    label_pane = pn.pane.Markdown(_label_html(label), sizing_mode="stretch_width")
+    value_pane = pn.pane.Markdown(_value_html("", big, color), align="end")
+    row = pn.Row(label_pane, value_pane, sizing_mode="stretch_width", margin=(2, 0))
+    return row, label_pane, value_pane
 
-tip_slider.param.watch(on_slider_change, "value")
+def _result_divider():
+    return pn.pane.HTML(
+        STATIC_HTML["result_divider"],
+        sizing_mode="stretch_width",
+        height=14,
+    )
 
-# ── Result pane ───────────────────────────────────────────────────────────────
-def _result_card(bill, tip_pct, people):
+tip_pct_row, _, tip_pct_value = _result_row("Tip Percentage")
+tip_amt_row, _, tip_amt_value = _result_row("Tip Amount")
+total_row,   _, total_value   = _result_row("Total Bill", big=True)
+split_row, split_label, split_value = _result_row(
+    "Each Person Pays", big=True, color=CLR_ACCENT2
+)
+split_divider = _result_divider()
+
+result_pane = pn.Column(
+    tip_pct_row,
+    tip_amt_row,
+    _result_divider(),
+    total_row,
+    split_divider,
+    split_row,
+    sizing_mode="stretch_width",
+    styles={"background": CLR_CARD_BG,
+            "border-radius": "10px",
+            "padding": "18px 22px",
+            "border": f"1px solid {CLR_DIVIDER}"},
+)
+
+def _update_results(bill, tip_pct, people):
     bill    = bill    if bill    is not None else 0.0
     people  = people  if people  is not None else 1
     people  = max(1, people)
 
-    tip_amt    = bill * tip_pct / 100.0
-    total      = bill + tip_amt
-    per_person = total / people
-
-    def row(label, value, big=False, color=CLR_ACCENT):
-        font_size  = "22px" if big else "16px"
-        font_weight = "700"  if big else "500"
-        return pn.Row(
-            pn.pane.Markdown(
-                f"<span style='color:{CLR_LABEL};font-size:14px;'>{label}</span>",
-                sizing_mode="stretch_width",
-            ),
-            pn.pane.Markdown(
-                f"<span style='color:{color};font-size:{font_size};"
-                f"font-weight:{font_weight};'>{value}</span>",
-                align="end",
-            ),
-            sizing_mode="stretch_width",
-            margin=(2, 0),
-        )
+    amounts = tipcore.split_bill(bill, tip_pct, people)
 
-    divider = pn.pane.HTML(
-        f"<hr style='border:none;border-top:1px solid {CLR_DIVIDER};"
-        "margin:6px 0;'>",
-        sizing_mode="stretch_width",
-        height=14,
-    )
+    tip_pct_value.object = _value_html(f"{tip_pct:.1f}%")
+    tip_amt_value.object = _value_html(f"${amounts.tip:,.2f}")
+    total_value.object   = _value_html(f"${amounts.total:,.2f}", big=True)
 
-    split_section = []
+    split_divider.visible = split_row.visible = people > 1
     if people > 1:
-        split_section = [
-            divider,
-            row(f"Each Person Pays  (÷{people})",
-                f"${per_person:,.2f}", big=True, color=CLR_ACCENT2),
-        ]
-
-    return pn.Column(
-        row("Tip Percentage",  f"{tip_pct:.1f}%"),
-        row("Tip Amount",      f"${tip_amt:,.2f}"),
-        divider,
-        row("Total Bill",      f"${total:,.2f}", big=True),
-        *split_section,
-        sizing_mode="stretch_width",
-        styles={"background": CLR_CARD_BG,
-                "border-radius": "10px",
-                "padding": "18px 22px",
-                "border": f"1px solid {CLR_DIVIDER}"},
+        split_label.object = _label_html(f"Each Person Pays  (÷{people})")
+        split_value.object = _value_html(
+            f"${amounts.per_person_total:,.2f}", big=True, color=CLR_ACCENT2
+        )
+
+@pn.io.hold()
+def _refresh(bill, tip_pct, people):
+    """Single watcher for all inputs, so one change is one held batch."""
+    _update_presets(tip_pct)
+    _update_results(bill, tip_pct, people)
+
+pn.bind(_refresh, bill_input, tip_slider, split_input, watch=True)
+_refresh(bill_input.value, tip_slider.value, split_input.value)
+
+# ── Bulk receipts ─────────────────────────────────────────────────────────────
+# The CSV is computed once per upload; Tabulator's remote pagination keeps the
+# DataFrame on the server and only sends the visible page to the browser.
+receipts_input = pn.widgets.FileInput(accept=".csv", multiple=False)
+receipts_summary = pn.pane.Markdown(
+    "Upload a CSV with bill amount, tip % and (optionally) party size.",
+    styles={"color": CLR_LABEL, "font-size": "13px"},
+)
+_money = {"type": "money", "symbol": "$"}
+receipts_table = pn.widgets.Tabulator(
+    pd.DataFrame(columns=list(tipcore.RECEIPT_COLUMNS)),
+    pagination="remote",
+    page_size=tipcore.DEFAULT_PAGE_SIZE,
+    show_index=False,
+    disabled=True,
+    formatters={col: _money for col in ("Bill", "Tip", "Total", "Per Person")},
+    visible=False,
+)
+
+@pn.io.hold()
+def _load_receipts(value):
+    if not value:
+        return
+    table = tipcore.read_receipts(io.BytesIO(value))
+    receipts_summary.object = "  ·  ".join(
+        f"**{k}:** {v}" for k, v in table.summary().items()
     )
+    receipts_table.value = pd.DataFrame(table.columns())
+    receipts_table.page = 1
+    receipts_table.visible = True
 
-result_pane = pn.bind(_result_card, bill_input, tip_slider, split_input)
+receipts_input.param.watch(lambda event: _load_receipts(event.new), "value")
 
 # ── Layout ────────────────────────────────────────────────────────────────────
-header = pn.pane.HTML(
-    f"""
-    <div style="background:{CLR_HEADER_BG};padding:22px 28px;
-                border-radius:12px;margin-bottom:8px;">
-      <h1 style="color:{CLR_HEADER_FG};margin:0 0 4px 0;font-size:28px;">
-        💰 Tip Calculator
-      </h1>
-      <p style="color:#B2BFCC;margin:0;font-size:14px;">
-        Instantly calculate tip, total, and per-person split.
-      </p>
-    </div>
-    """,
-    sizing_mode="stretch_width",
-)
+header = pn.pane.HTML(STATIC_HTML["header"], sizing_mode="stretch_width")
 
 section_label = lambda txt: pn.pane.Markdown(
     f"**{txt}**",
@@ -161,21 +226,13 @@ section_label = lambda txt: pn.pane.Markdown(
 input_card = pn.Column(
     section_label("Bill Details"),
     bill_input,
-    pn.pane.HTML(
-        f"<hr style='border:none;border-top:1px solid {CLR_DIVIDER};"
-        "margin:10px 0;'>",
-        sizing_mode="stretch_width",
-        height=14,
-    ),
+    pn.pane.HTML(STATIC_HTML["section_divider"],
+                 sizing_mode="stretch_width", height=14),
     section_label("Tip Percentage"),
     pn.Row(preset_15, preset_18, preset_20, margin=(0, 0, 6, 0)),
     tip_slider,
-    pn.pane.HTML(
-        f"<hr style='border:none;border-top:1px solid {CLR_DIVIDER};"
-        "margin:10px 0;'>",
-        sizing_mode="stretch_width",
-        height=14,
-    ),
+    pn.pane.HTML(STATIC_HTML["section_divider"],
+                 sizing_mode="stretch_width", height=14),
     section_label("Bill Split"),
     split_input,
     sizing_mode="stretch_width",
@@ -206,6 +263,17 @@ main_layout = pn.Column(
         ),
         sizing_mode="stretch_width",
     ),
+    pn.pane.Markdown("### 📂 Bulk Receipts", styles={"color": CLR_VALUE}),
+    pn.Column(
+        receipts_input,
+        receipts_summary,
+        receipts_table,
+        sizing_mode="stretch_width",
+        styles={"background": CLR_CARD_BG,
+                "border-radius": "10px",
+                "padding": "18px 22px",
+                "border": f"1px solid {CLR_DIVIDER}"},
+    ),
     sizing_mode="stretch_width",
     max_width=820,
     margin=(20, 0),
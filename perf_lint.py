@@ -0,0 +1,300 @@
+"""
+Performance lint for the generated apps.
+
+An AST pass with framework-specific rules for the anti-patterns that show up
+in generated apps and cost work on every interaction:
+
+    PERF001  (all)        import inside a callback, render or watcher body
+    DASH001  Dash         ``debug=True`` passed to ``app.run``/``run_server``
+    DASH002  Dash         ``debounce=False`` on a ``dcc.Input``
+    PNL001   Panel        a ``pn.bind``/``pn.depends`` function that builds
+                          new components instead of updating existing ones
+    ST001    Streamlit    ``st.session_state`` written in the script body
+                          (synced one rerun late) instead of in a callback
+    ST002    Streamlit    ``st.rerun()``, i.e. a second full script run
+    SHY001   Shiny        ``@render.ui`` that reads inputs, re-sending the
+                          whole UI subtree instead of ``ui.update_*``
+    PARSE    (all)        the file is not valid Python, so no rule could run
+
+ST001 leaves the ``if "key" not in st.session_state:`` initialisation guard
+alone: it runs once per session, not on every rerun.
+
+``generate_apps.py --lint`` sends the findings back to the model for a fixed
+version, and eval_apps.py records the finding count of each sample.
+
+Run:
+    python perf_lint.py                  # every */app.py and */app_performance.py
+    python perf_lint.py dash/app.py --json
+"""
+
+import argparse
+import ast
+import json
+import sys
+import warnings
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+APP_DIRS = ("streamlit", "dash", "panel", "shiny")
+
+# Names of Panel constructors: layouts at ``pn.X``, plus ``pn.pane.*``,
+# ``pn.widgets.*`` and ``pn.indicators.*``.
+_PANEL_LAYOUTS = {"Row", "Column", "Card", "Tabs", "Accordion", "GridBox",
+                  "GridSpec", "FlexBox", "WidgetBox", "Spacer", "panel"}
+_PANEL_NAMESPACES = {"pane", "widgets", "indicators", "layout"}
+
+
+@dataclass(frozen=True)
+class Finding:
+    path: str
+    line: int
+    rule: str
+    message: str
+
+    def __str__(self):
+        return f"{self.path}:{self.line}: {self.rule} {self.message}"
+
+
+def _dotted(node) -> str:
+    """``a.b.c`` for an attribute chain or name, else ''."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        parts.append(node.id)
+        return ".".join(reversed(parts))
+    return ""
+
+
+def _decorators(func) -> list[str]:
+    return [_dotted(d.func if isinstance(d, ast.Call) else d) for d in func.decorator_list]
+
+
+def _functions(tree) -> dict[str, ast.FunctionDef]:
+    return {n.name: n for n in ast.walk(tree)
+            if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))}
+
+
+def _keyword(call: ast.Call, name: str):
+    return next((k.value for k in call.keywords if k.arg == name), None)
+
+
+def _is_const(node, value) -> bool:
+    return isinstance(node, ast.Constant) and node.value is value
+
+
+def _hot_functions(tree, framework: str) -> list[ast.FunctionDef]:
+    """Functions that run on every interaction in this framework."""
+    functions = _functions(tree)
+    hot = []
+    for func in functions.values():
+        names = _decorators(func)
+        if framework == "dash" and any(n.endswith("callback") for n in names):
+            hot.append(func)
+        elif framework == "shiny" and any(
+            n.startswith(("render.", "reactive.")) or n in ("output", "calc", "effect")
+            for n in names
+        ):
+            hot.append(func)
+        elif framework == "panel" and any(n.endswith("depends") for n in names):
+            hot.append(func)
+    for call in ast.walk(tree):
+        if not isinstance(call, ast.Call):
+            continue
+        name = _dotted(call.func)
+        targets = []
+        if framework == "panel" and name.endswith("bind") and call.args:
+            targets.append(call.args[0])
+        if framework == "panel" and name.endswith(("param.watch", ".watch")) and call.args:
+            targets.append(call.args[0])
+        if framework == "streamlit":
+            targets += [_keyword(call, "on_click"), _keyword(call, "on_change")]
+        for target in targets:
+            if isinstance(target, ast.Name) and target.id in functions:
+                hot.append(functions[target.id])
+    return list({id(f): f for f in hot}.values())
+
+
+# ── Rules ─────────────────────────────────────────────────────────────────────
+def _imports_in_hot_paths(tree, framework):
+    for func in _hot_functions(tree, framework):
+        for node in ast.walk(func):
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                names = ", ".join(a.name for a in node.names)
+                yield node.lineno, "PERF001", (
+                    f"import of {names} inside {func.name}(), which runs on every "
+                    "interaction; import at module level"
+                )
+
+
+def _dash_rules(tree):
+    for call in ast.walk(tree):
+        if not isinstance(call, ast.Call):
+            continue
+        name = _dotted(call.func)
+        if name.endswith((".run", ".run_server")) and _is_const(_keyword(call, "debug"), True):
+            yield call.lineno, "DASH001", (
+                "debug=True serves unminified bundles, the dev tools and the "
+                "reloader; leave it off outside development"
+            )
+        if name.endswith("Input") and _is_const(_keyword(call, "debounce"), False):
+            yield call.lineno, "DASH002", (
+                "debounce=False fires the callback on every keystroke; use "
+                "debounce=True or a delay in seconds"
+            )
+
+
+def _builds_panel_component(func) -> int | None:
+    for node in ast.walk(func):
+        if not isinstance(node, ast.Call):
+            continue
+        parts = _dotted(node.func).split(".")
+        if parts[0] != "pn" or len(parts) < 2:
+            continue
+        if parts[1] in _PANEL_LAYOUTS or parts[1] in _PANEL_NAMESPACES:
+            return node.lineno
+    return None
+
+
+def _panel_rules(tree):
+    functions = _functions(tree)
+    bound = []
+    for call in ast.walk(tree):
+        if isinstance(call, ast.Call) and _dotted(call.func).endswith("bind") and call.args:
+            target = call.args[0]
+            if isinstance(target, ast.Name) and target.id in functions:
+                bound.append(functions[target.id])
+    bound += [f for f in functions.values() if any(n.endswith("depends") for n in _decorators(f))]
+    for func in {id(f): f for f in bound}.values():
+        line = _builds_panel_component(func)
+        if line is not None:
+            yield line, "PNL001", (
+                f"{func.name}() builds new components on every change; create "
+                "them once and update .object/.value (or use pn.rx) instead"
+            )
+
+
+def _session_state_target(node) -> bool:
+    """``st.session_state[...]`` or ``st.session_state.x`` as a store target."""
+    value = node.value if isinstance(node, (ast.Subscript, ast.Attribute)) else None
+    return value is not None and _dotted(value) in ("st.session_state", "session_state")
+
+
+def _init_guard(node) -> bool:
+    """``if <const> not in st.session_state:``, which runs once per session."""
+    test = node.test if isinstance(node, ast.If) else None
+    return (
+        isinstance(test, ast.Compare)
+        and isinstance(test.left, ast.Constant)
+        and len(test.ops) == 1 and isinstance(test.ops[0], ast.NotIn)
+        and _dotted(test.comparators[0]) in ("st.session_state", "session_state")
+    )
+
+
+def _streamlit_rules(tree):
+    callbacks = {id(f) for f in _hot_functions(tree, "streamlit")}
+    exempt = set()  # nodes inside callbacks or initialisation guards
+    for func in _functions(tree).values():
+        if id(func) in callbacks:
+            exempt.update(id(n) for n in ast.walk(func))
+    for guard in ast.walk(tree):
+        if _init_guard(guard):
+            exempt.update(id(n) for stmt in guard.body for n in ast.walk(stmt))
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Assign, ast.AugAssign)) and id(node) not in exempt:
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            if any(_session_state_target(t) for t in targets):
+                yield node.lineno, "ST001", (
+                    "session_state written in the script body takes effect one "
+                    "rerun late; set it from an on_click/on_change callback or "
+                    "bind the widget with key="
+                )
+        if isinstance(node, ast.Call) and _dotted(node.func) in (
+            "st.rerun", "st.experimental_rerun"
+        ):
+            yield node.lineno, "ST002", (
+                "st.rerun() runs the whole script again; use a callback or "
+                "st.fragment instead"
+            )
+
+
+def _shiny_rules(tree):
+    for func in _functions(tree).values():
+        if "render.ui" not in _decorators(func):
+            continue
+        reads_input = any(
+            isinstance(n, ast.Call) and _dotted(n.func).startswith("input.")
+            for n in ast.walk(func)
+        )
+        if reads_input:
+            yield func.lineno, "SHY001", (
+                f"@render.ui {func.name}() re-sends its whole UI subtree when an "
+                "input changes; render the static UI once and use ui.update_* "
+                "or render.text for the values"
+            )
+
+
+_FRAMEWORK_RULES = {
+    "dash": _dash_rules,
+    "panel": _panel_rules,
+    "streamlit": _streamlit_rules,
+    "shiny": _shiny_rules,
+}
+
+
+def lint_source(code: str, framework: str, path: str = "app.py") -> list[Finding]:
+    """Findings for one app's source; ``framework`` is its directory name.
+
+    Source that does not parse gets a single PARSE finding, never a clean
+    result.
+    """
+    try:
+        with warnings.catch_warnings():
+            # The app's own invalid escapes etc. are not lint findings.
+            warnings.simplefilter("ignore", (SyntaxWarning, DeprecationWarning))
+            tree = ast.parse(code)
+    except SyntaxError as err:
+        return [Finding(path, err.lineno or 1, "PARSE",
+                        f"does not parse: {err.msg}; no performance rule was checked")]
+    found = list(_imports_in_hot_paths(tree, framework))
+    found += _FRAMEWORK_RULES[framework](tree)
+    return sorted({Finding(path, line, rule, message) for line, rule, message in found},
+                  key=lambda f: (f.line, f.rule))
+
+
+def lint_file(path: Path) -> list[Finding]:
+    path = Path(path)
+    framework = path.resolve().parent.name
+    if framework not in _FRAMEWORK_RULES:
+        return []
+    try:
+        shown = str(path.resolve().relative_to(BASE_DIR.resolve()))
+    except ValueError:
+        shown = str(path)
+    return lint_source(path.read_text(encoding="utf-8"), framework, shown)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("paths", nargs="*", type=Path,
+                        help="app files (default: every */app.py)")
+    parser.add_argument("--json", action="store_true", help="print findings as JSON")
+    args = parser.parse_args()
+
+    paths = args.paths or [BASE_DIR / d / name for d in APP_DIRS
+                           for name in ("app.py", "app_performance.py")
+                           if (BASE_DIR / d / name).exists()]
+    findings = [f for path in paths for f in lint_file(path)]
+    if args.json:
+        print(json.dumps([asdict(f) for f in findings], indent=2))
+    else:
+        for finding in findings:
+            print(finding)
+        print(f"{len(findings)} finding(s) in {len(paths)} file(s)")
+    sys.exit(1 if findings else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+"""
+SQLite store for generation, evaluation and benchmark results.
+
+One row per generated app (prompt hash, model, tokens, latency of the whole
+generation and of its initial request), per eval
+criterion score and per benchmark metric, each tagged with its run and
+indexed on framework, model, prompt variant and run, so questions like
+"mean adherence per framework over the last 20 runs" are a single indexed
+query instead of re-parsing logs.
+
+Rows arrive incrementally:
+
+- ``generate_apps.py`` records every generation as it happens;
+- ``bench.common.save_metrics`` records every ``--save``d benchmark metric,
+  and each of its repetitions in the benchmark history, keyed on git
+  commit, app content hash and framework version (see bench/history.py);
+- ``ingest`` reads new or changed Inspect eval logs (and ``*/perf*.json``
+  files not yet seen), skipping sources whose mtime has not changed.
+
+Run:
+    python results_db.py ingest
+    python results_db.py scores --criterion adherence --last 20
+    python results_db.py report
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+DB_PATH = BASE_DIR / "results.sqlite"
+LOG_DIR = BASE_DIR / "logs"
+FRAMEWORKS = {
+    "Streamlit": "streamlit",
+    "Plotly Dash": "dash",
+    "Panel": "panel",
+    "Shiny for Python": "shiny",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id          TEXT PRIMARY KEY,
+    kind            TEXT NOT NULL,          -- generation | eval | bench
+    created_at      REAL NOT NULL,
+    model           TEXT,
+    prompt_variant  TEXT,
+    source          TEXT
+);
+CREATE TABLE IF NOT EXISTS generations (
+    id              INTEGER PRIMARY KEY,
+    run_id          TEXT NOT NULL REFERENCES runs(run_id),
+    framework       TEXT NOT NULL,
+    model           TEXT,
+    prompt_variant  TEXT,
+    prompt_hash     TEXT,
+    input_tokens    INTEGER,
+    output_tokens   INTEGER,
+    latency_s       REAL,                   -- whole generation, follow-ups included
+    request_latency_s REAL,                 -- the initial (hedged) request alone
+    code_sha        TEXT,
+    created_at      REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scores (
+    id              INTEGER PRIMARY KEY,
+    run_id          TEXT NOT NULL REFERENCES runs(run_id),
+    framework       TEXT NOT NULL,
+    model           TEXT,
+    prompt_variant  TEXT,
+    criterion       TEXT NOT NULL,
+    value           REAL,
+    created_at      REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    id              INTEGER PRIMARY KEY,
+    run_id          TEXT NOT NULL REFERENCES runs(run_id),
+    framework       TEXT NOT NULL,
+    metric          TEXT NOT NULL,
+    value           REAL,
+    created_at      REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bench_samples (
+    id                  INTEGER PRIMARY KEY,
+    run_id              TEXT NOT NULL REFERENCES runs(run_id),
+    framework           TEXT NOT NULL,
+    metric              TEXT NOT NULL,
+    value               REAL NOT NULL,      -- one repetition
+    git_commit          TEXT,
+    app_sha             TEXT,
+    framework_version   TEXT,
+    created_at          REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ingested (
+    source          TEXT PRIMARY KEY,
+    mtime           REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_kind_created ON runs(kind, created_at);
+CREATE INDEX IF NOT EXISTS generations_framework ON generations(framework, model, prompt_variant);
+CREATE INDEX IF NOT EXISTS generations_run ON generations(run_id);
+CREATE INDEX IF NOT EXISTS scores_framework ON scores(framework, criterion, model, prompt_variant);
+CREATE INDEX IF NOT EXISTS scores_run ON scores(run_id);
+CREATE INDEX IF NOT EXISTS metrics_framework ON metrics(framework, metric);
+CREATE INDEX IF NOT EXISTS metrics_run ON metrics(run_id);
+CREATE INDEX IF NOT EXISTS bench_samples_build
+    ON bench_samples(framework, metric, git_commit, app_sha, framework_version);
+"""
+
+
+# Columns added after a table was first created: (table, column, type).
+ADDED_COLUMNS = [
+    ("generations", "request_latency_s", "REAL"),
+]
+
+
+def connect(path: Path = DB_PATH) -> sqlite3.Connection:
+    """Open (and create or upgrade if needed) the results database."""
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    for table, column, kind in ADDED_COLUMNS:
+        existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+    return conn
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+def new_run_id(kind: str) -> str:
+    return f"{kind}-{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def ensure_run(conn, run_id: str, kind: str, model: str | None = None,
+               prompt_variant: str | None = None, source: str | None = None,
+               created_at: float | None = None):
+    conn.execute(
+        "INSERT OR IGNORE INTO runs VALUES (?, ?, ?, ?, ?, ?)",
+        (run_id, kind, created_at or time.time(), model, prompt_variant, source),
+    )
+
+
+# ── Recording ─────────────────────────────────────────────────────────────────
+def record_generation(run_id: str, framework: str, *, model: str, prompt: str,
+                      code: str, input_tokens: int | None = None,
+                      output_tokens: int | None = None,
+                      latency_s: float | None = None,
+                      request_latency_s: float | None = None,
+                      prompt_variant: str | None = None):
+    """One generated app (called by generate_apps.py). ``latency_s`` covers
+    the whole generation; ``request_latency_s`` only its initial request."""
+    with closing(connect()) as conn, conn:
+        ensure_run(conn, run_id, "generation", model, prompt_variant)
+        conn.execute(
+            "INSERT INTO generations (run_id, framework, model, prompt_variant,"
+            " prompt_hash, input_tokens, output_tokens, latency_s, request_latency_s,"
+            " code_sha, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (run_id, framework, model, prompt_variant, prompt_hash(prompt),
+             input_tokens, output_tokens, latency_s, request_latency_s,
+             hashlib.sha256(code.encode("utf-8")).hexdigest(), time.time()),
+        )
+
+
+def record_metrics(run_id: str, framework: str, metrics: dict,
+                   conn: sqlite3.Connection | None = None,
+                   prompt_variant: str | None = None):
+    """Benchmark metrics for one app (called by bench.common.save_metrics)."""
+    own = conn is None
+    conn = conn or connect()
+    try:
+        with conn:
+            ensure_run(conn, run_id, "bench", prompt_variant=prompt_variant)
+            now = time.time()
+            conn.executemany(
+                "INSERT INTO metrics (run_id, framework, metric, value, created_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [(run_id, framework, k, float(v), now) for k, v in metrics.items()],
+            )
+    finally:
+        if own:
+            conn.close()
+
+
+def record_bench_samples(run_id: str, framework: str, samples: dict, *,
+                         git_commit: str | None, app_sha: str | None,
+                         framework_version: str | None,
+                         conn: sqlite3.Connection):
+    """Every repetition of each metric (``samples``: metric -> values)."""
+    now = time.time()
+    with conn:
+        ensure_run(conn, run_id, "bench")
+        conn.executemany(
+            "INSERT INTO bench_samples (run_id, framework, metric, value, git_commit,"
+            " app_sha, framework_version, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(run_id, framework, metric, float(v), git_commit, app_sha,
+              framework_version, now)
+             for metric, values in samples.items() for v in values],
+        )
+
+
+# ── Incremental ingestion ─────────────────────────────────────────────────────
+def _is_new(conn, source: Path) -> bool:
+    row = conn.execute(
+        "SELECT mtime FROM ingested WHERE source = ?", (str(source),)
+    ).fetchone()
+    return row is None or row["mtime"] != source.stat().st_mtime
+
+
+def mark_ingested(conn, source: Path):
+    conn.execute(
+        "INSERT OR REPLACE INTO ingested VALUES (?, ?)",
+        (str(source), source.stat().st_mtime),
+    )
+
+
+def ingest_eval_logs(conn, log_dir: Path = LOG_DIR) -> int:
+    """Scores from Inspect eval logs not ingested yet; returns rows added."""
+    from inspect_ai.log import list_eval_logs, read_eval_log
+
+    added = 0
+    for info in list_eval_logs(str(log_dir)):
+        path = Path(info.name.removeprefix("file://"))
+        if not _is_new(conn, path):
+            continue
+        log = read_eval_log(info)
+        if log.status != "success" or not log.samples:
+            continue
+        run_id = log.eval.run_id
+        model = log.eval.model
+        # Logs from before prompt variants existed graded the baseline apps.
+        variant = (log.eval.task_args or {}).get("prompt_variant", "baseline")
+        with conn:
+            # A re-written log replaces the scores it produced before.
+            conn.execute("DELETE FROM scores WHERE run_id = ?", (run_id,))
+            ensure_run(conn, run_id, "eval", model, variant, str(path),
+                       created_at=path.stat().st_mtime)
+            for sample in log.samples:
+                for score in (sample.scores or {}).values():
+                    if not isinstance(score.value, dict):
+                        continue
+                    for criterion, value in score.value.items():
+                        conn.execute(
+                            "INSERT INTO scores (run_id, framework, model,"
+                            " prompt_variant, criterion, value, created_at)"
+                            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (run_id, str(sample.id), model, variant, criterion,
+                             value, path.stat().st_mtime),
+                        )
+                        added += 1
+            mark_ingested(conn, path)
+    return added
+
+
+def ingest_perf_files(conn) -> int:
+    """Benchmark metrics from ``*/perf.json`` and ``*/perf_<variant>.json``
+    files not ingested yet."""
+    added = 0
+    for dirname in FRAMEWORKS.values():
+        for path in sorted((BASE_DIR / dirname).glob("perf*.json")):
+            stem = path.stem
+            if stem != "perf" and not stem.startswith("perf_"):
+                continue
+            if not _is_new(conn, path):
+                continue
+            variant = stem.removeprefix("perf_") if stem != "perf" else "baseline"
+            metrics = json.loads(path.read_text(encoding="utf-8"))
+            record_metrics(f"{stem}-{dirname}-{int(path.stat().st_mtime)}", dirname,
+                           metrics, conn, prompt_variant=variant)
+            with conn:
+                mark_ingested(conn, path)
+            added += len(metrics)
+    return added
+
+
+# ── Queries ───────────────────────────────────────────────────────────────────
+def mean_scores(conn, criterion: str | None = None, last: int | None = None,
+                model: str | None = None, prompt_variant: str | None = None):
+    """Mean score per framework and criterion over the latest ``last`` eval runs
+    (of ``model`` and ``prompt_variant``, when given)."""
+    # The run filters go inside the CTE: "the last N runs of model X", not
+    # "whichever of the last N runs happen to be model X".
+    run_filters, params = "", []
+    for column, value in (("model", model), ("prompt_variant", prompt_variant)):
+        if value is not None:
+            run_filters += f" AND {column} = ?"
+            params.append(value)
+    params.append(last if last else -1)
+    sql = f"""
+        WITH recent AS (
+            SELECT run_id FROM runs WHERE kind = 'eval'{run_filters}
+            ORDER BY created_at DESC LIMIT ?
+        )
+        SELECT framework, criterion, AVG(value) AS mean, COUNT(*) AS n
+        FROM scores
+        WHERE run_id IN (SELECT run_id FROM recent)
+    """
+    if criterion is not None:
+        sql += " AND criterion = ?"
+        params.append(criterion)
+    sql += " GROUP BY framework, criterion ORDER BY framework, criterion"
+    return conn.execute(sql, params).fetchall()
+
+
+def bench_builds(conn, framework: str):
+    """Distinct (commit, app hash, framework version) builds, oldest first."""
+    return conn.execute(
+        "SELECT git_commit, app_sha, framework_version, MIN(created_at) AS first_at,"
+        " MAX(created_at) AS last_at FROM bench_samples WHERE framework = ?"
+        " GROUP BY git_commit, app_sha, framework_version ORDER BY last_at",
+        (framework,),
+    ).fetchall()
+
+
+def bench_values(conn, framework: str, build) -> dict:
+    """metric -> every recorded repetition for one build."""
+    values = {}
+    for row in conn.execute(
+        "SELECT metric, value FROM bench_samples WHERE framework = ?"
+        " AND git_commit IS ? AND app_sha IS ? AND framework_version IS ?",
+        (framework, build["git_commit"], build["app_sha"], build["framework_version"]),
+    ):
+        values.setdefault(row["metric"], []).append(row["value"])
+    return values
+
+
+def report_table(conn, last: int | None = None) -> str:
+    """Score summary in the shape of the table in index.qmd."""
+    criteria = ["maintainability", "readability", "adherence", "efficiency"]
+    cells = {(r["framework"], r["criterion"]): r["mean"] for r in mean_scores(conn, last=last)}
+    criteria = [c for c in criteria if any(k[1] == c for k in cells)]
+    lines = [
+        "| Framework | " + " | ".join(c.title() for c in criteria) + " |",
+        "| --- |" + " :---: |" * len(criteria),
+    ]
+    for name, dirname in FRAMEWORKS.items():
+        values = [cells.get((dirname, c)) for c in criteria]
+        lines.append(f"| {name} | " + " | ".join(
+            "" if v is None else f"{v:.2f}" for v in values) + " |")
+    means = []
+    for c in criteria:
+        values = [v for (_, crit), v in cells.items() if crit == c]
+        means.append(f"**{sum(values) / len(values):.2f}**")
+    lines.append("| **Mean** | " + " | ".join(means) + " |")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="load new eval logs and perf.json files")
+    ingest.add_argument("--log-dir", type=Path, default=LOG_DIR)
+    scores = commands.add_parser("scores", help="mean score per framework")
+    scores.add_argument("--criterion")
+    scores.add_argument("--last", type=int, help="only the latest N eval runs")
+    scores.add_argument("--model")
+    scores.add_argument("--prompt-variant")
+    report = commands.add_parser("report", help="score table for index.qmd")
+    report.add_argument("--last", type=int)
+    args = parser.parse_args()
+
+    with closing(connect()) as conn:
+        if args.command == "ingest":
+            scores_added = ingest_eval_logs(conn, args.log_dir) if args.log_dir.exists() else 0
+            metrics_added = ingest_perf_files(conn)
+            print(f"Ingested {scores_added} scores and {metrics_added} metrics into {DB_PATH}")
+        elif args.command == "scores":
+            start = time.perf_counter()
+            rows = mean_scores(conn, args.criterion, args.last, args.model,
+                               args.prompt_variant)
+            for row in rows:
+                print(f"{row['framework']:10s} {row['criterion']:16s} "
+                      f"{row['mean']:.2f}  (n={row['n']})")
+            print(f"\n{(time.perf_counter() - start) * 1000:.1f} ms")
+        else:
+            print(report_table(conn, args.last))
+
+
+if __name__ == "__main__":
+    main()
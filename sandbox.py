@@ -0,0 +1,588 @@
+"""
+Warm sandbox pool for validating untrusted generated apps.
+
+Importing streamlit, dash, panel/bokeh or shiny takes seconds, so validating
+hundreds of generated candidates in fresh processes is dominated by framework
+imports. The pool keeps one template process per framework with the
+framework already imported (a forkserver, in the ``multiprocessing`` sense)
+and forks a worker from it per candidate. Each worker:
+
+- gets CPU-time and address-space limits (``resource.setrlimit``) and is
+  killed by its template at the wall-clock limit;
+- runs in its own session, so the template kills it together with any
+  process the candidate started;
+- has no network: a new, empty network namespace (unprivileged user
+  namespaces), plus a socket guard refusing every non-Unix connect/bind/send.
+  Where the namespace cannot be created the candidate is refused, unless
+  ``allow_weak_isolation`` (``--allow-weak-isolation``) accepts the socket
+  guard alone, which code can get around;
+- runs the candidate and reports a structured result: whether the module
+  executed, whether the framework's app object was found, and the outputs
+  after the standard scenario (bill $85.50, 20% preset, split 3).
+
+The scenario runs in-process with each framework's own machinery: Streamlit's
+``AppTest``, Dash's Flask test client against ``/_dash-update-component``,
+and Panel widgets (whose watchers fire synchronously). Shiny's reactive graph
+needs a live session, so Shiny candidates report the input ids of their UI
+instead of scenario outputs.
+
+Run:
+    python sandbox.py                          # every */app.py and */app_performance.py
+    python sandbox.py candidates/dash/*.py --framework dash --workers 8
+    python sandbox.py --cold                   # one fresh interpreter per candidate
+"""
+
+import argparse
+import ctypes
+import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import re
+import resource
+import runpy
+import select
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+APP_DIRS = ("streamlit", "dash", "panel", "shiny")
+
+# Imported once per template; forked workers start with these in memory.
+PRELOAD = {
+    "streamlit": ["streamlit", "streamlit.testing.v1", "pandas", "numpy"],
+    "dash": ["dash", "flask", "plotly", "pandas", "numpy"],
+    "panel": ["panel", "bokeh", "pandas", "numpy"],
+    "shiny": ["shiny", "shiny.express", "pandas", "numpy"],
+}
+
+SCENARIO = {"bill": 85.50, "tip_pct": 20, "people": 3}
+_BILL = re.compile(r"bill|amount", re.I)
+_TIP = re.compile(r"tip.*(pct|percent|%)|percent|tip", re.I)
+_PEOPLE = re.compile(r"people|person|split|guests|diners", re.I)
+_SPLIT_TOGGLE = re.compile(r"split", re.I)
+
+
+@dataclass(frozen=True)
+class Limits:
+    cpu_s: int = 30
+    memory_mib: int = 1024  # on top of the template's own address space
+    wall_s: float = 60.0
+    # Run candidates with only the socket guard when no network namespace.
+    allow_weak_isolation: bool = False
+
+
+@dataclass
+class Result:
+    framework: str
+    path: str
+    status: str = "ok"  # ok | error | timeout | crashed | refused
+    import_ok: bool = False
+    app_found: bool = False
+    scenario: dict | None = None
+    error: str | None = None
+    duration_s: float = 0.0
+    network_isolated: bool = False
+    extra: dict = field(default_factory=dict)
+
+
+# ── Isolation (inside the forked worker) ──────────────────────────────────────
+def _limit_resources(limits: Limits):
+    resource.setrlimit(resource.RLIMIT_CPU, (limits.cpu_s, limits.cpu_s + 1))
+    with open("/proc/self/statm") as f:
+        current = int(f.read().split()[0]) * resource.getpagesize()
+    cap = current + limits.memory_mib * 2**20
+    resource.setrlimit(resource.RLIMIT_AS, (cap, cap))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+
+def _disable_network() -> bool:
+    """Cut the worker off the network; True if it is in an empty network
+    namespace, False if only the (Python-level) socket guard applies."""
+    _guard_sockets()
+    clone_newuser, clone_newnet = 0x10000000, 0x40000000
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        return libc.unshare(clone_newuser | clone_newnet) == 0
+    except (OSError, AttributeError):
+        return False
+
+
+def _guard_sockets():
+    def refuse(original):
+        def method(self, *args, **kwargs):
+            if self.family != socket.AF_UNIX:
+                raise PermissionError("network access is disabled in the sandbox")
+            return original(self, *args, **kwargs)
+        return method
+
+    for name in ("connect", "connect_ex", "bind", "sendto"):
+        setattr(socket.socket, name, refuse(getattr(socket.socket, name)))
+
+
+# ── Scenario per framework ────────────────────────────────────────────────────
+def _money(values) -> list[str]:
+    """Every string containing a dollar amount, in order, without repeats."""
+    found = []
+
+    def walk(value):
+        if isinstance(value, str):
+            if re.search(r"\$\s?\d", value) and value not in found:
+                found.append(value.strip())
+        elif isinstance(value, dict):
+            for v in value.values():
+                walk(v)
+        elif isinstance(value, (list, tuple)):
+            for v in value:
+                walk(v)
+
+    walk(list(values))
+    return found
+
+
+def _run_streamlit(path: str, result: Result, limits: Limits):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(path, default_timeout=limits.wall_s)
+    at.run()
+    result.import_ok = result.app_found = not at.exception
+    if at.exception:
+        result.error = str(at.exception[0].message)
+        return
+
+    def first(elements, pattern):
+        return next((e for e in elements if pattern.search(e.label or "")), None)
+
+    steps = []
+    if (bill := first(at.number_input, _BILL)) is not None:
+        bill.set_value(SCENARIO["bill"]).run()
+        steps.append("bill")
+    preset = next((b for b in at.button if str(SCENARIO["tip_pct"]) in b.label), None)
+    if preset is not None:
+        preset.click().run()
+        steps.append("preset")
+    if (toggle := first([*at.toggle, *at.checkbox], _SPLIT_TOGGLE)) is not None:
+        toggle.set_value(True).run()
+    if (people := first(at.number_input, _PEOPLE)) is not None:
+        people.set_value(SCENARIO["people"]).run()
+        steps.append("people")
+    texts = [e.value for kind in ("markdown", "metric", "text", "caption", "success", "info")
+             for e in getattr(at, kind, [])]
+    result.scenario = {"steps": steps, "outputs": _money(texts)}
+
+
+def _dash_components(node, props: dict):
+    """Collect ``id -> props`` from Dash's serialized layout."""
+    if isinstance(node, dict):
+        node_props = node.get("props")
+        if isinstance(node_props, dict):
+            if isinstance(node_props.get("id"), str):
+                props[node_props["id"]] = node_props
+            _dash_components(node_props.get("children"), props)
+        else:
+            for value in node.values():
+                _dash_components(value, props)
+    elif isinstance(node, list):
+        for child in node:
+            _dash_components(child, props)
+
+
+def _dash_outputs(output: str) -> list[dict]:
+    specs = output.strip(".").split("...")
+    return [dict(zip(("id", "property"), spec.rsplit(".", 1))) for spec in specs]
+
+
+def _fire_dash(client, deps: list, props: dict, changed: set[str]):
+    """Run every callback triggered by ``changed``, following chains."""
+    for _ in range(10):
+        if not changed:
+            return
+        next_changed = set()
+        for dep in deps:
+            inputs = [f"{i['id']}.{i['property']}" for i in dep["inputs"]]
+            if "{" in dep["output"] or not changed & set(inputs):
+                continue
+            multi = dep["output"].startswith("..")
+            outputs = _dash_outputs(dep["output"])
+            value = lambda spec: props.get(spec["id"], {}).get(spec["property"])  # noqa: E731
+            response = client.post("/_dash-update-component", json={
+                "output": dep["output"],
+                "outputs": outputs if multi else outputs[0],
+                "inputs": [{**i, "value": value(i)} for i in dep["inputs"]],
+                "state": [{**s, "value": value(s)} for s in dep.get("state", [])],
+                "changedPropIds": sorted(changed & set(inputs)),
+            })
+            if response.status_code != 200:
+                continue
+            for component_id, updates in response.get_json().get("response", {}).items():
+                props.setdefault(component_id, {}).update(updates)
+                next_changed |= {f"{component_id}.{p}" for p in updates}
+        changed = next_changed
+
+
+def _run_dash(path: str, result: Result):
+    from dash import Dash
+
+    namespace = runpy.run_path(path, run_name="sandbox_candidate")
+    result.import_ok = True
+    app = next((v for v in namespace.values() if isinstance(v, Dash)), None)
+    result.app_found = app is not None
+    if app is None:
+        return
+    client = app.server.test_client()
+    props = {}
+    _dash_components(client.get("/_dash-layout").get_json(), props)
+    deps = client.get("/_dash-dependencies").get_json()
+
+    steps = []
+    initial = {f"{i['id']}.{i['property']}" for d in deps for i in d["inputs"]}
+    _fire_dash(client, deps, props, initial)  # initial callbacks
+    for name, pattern, prop, value in (
+        ("bill", _BILL, "value", SCENARIO["bill"]),
+        ("preset", re.compile(str(SCENARIO["tip_pct"])), "n_clicks", 1),
+        ("people", _PEOPLE, "value", SCENARIO["people"]),
+    ):
+        component = next((c for c, p in props.items()
+                          if pattern.search(c) and (prop in p or prop == "n_clicks")), None)
+        if component is None:
+            continue
+        props[component][prop] = value
+        _fire_dash(client, deps, props, {f"{component}.{prop}"})
+        steps.append(name)
+    result.scenario = {"steps": steps, "callbacks": len(deps),
+                       "outputs": _money(p.get("children") for p in props.values())}
+
+
+def _run_panel(path: str, result: Result):
+    import panel as pn
+
+    namespace = runpy.run_path(path, run_name="sandbox_candidate")
+    result.import_ok = True
+    roots = [v for v in namespace.values() if isinstance(v, pn.viewable.Viewable)]
+    result.app_found = bool(roots)
+    if not roots:
+        return
+    objects = {}
+    for root in roots:
+        found = root.select() if hasattr(root, "select") else [root]
+        for obj in found:
+            objects[id(obj)] = obj
+    widgets = [o for o in objects.values() if isinstance(o, pn.widgets.Widget)]
+
+    def numeric(pattern):
+        return next((w for w in widgets if pattern.search(w.name or "")
+                     and isinstance(getattr(w, "value", None), (int, float))
+                     and not isinstance(w.value, bool)), None)
+
+    steps = []
+    if (bill := numeric(_BILL)) is not None:
+        bill.value = SCENARIO["bill"]
+        steps.append("bill")
+    preset = next((w for w in widgets if isinstance(w, pn.widgets.Button)
+                   and str(SCENARIO["tip_pct"]) in (w.name or "")), None)
+    if preset is not None:
+        preset.clicks += 1
+        steps.append("preset")
+    elif (tip := numeric(_TIP)) is not None:
+        tip.value = SCENARIO["tip_pct"]
+        steps.append("tip")
+    toggle = next((w for w in widgets if isinstance(getattr(w, "value", None), bool)
+                   and _SPLIT_TOGGLE.search(w.name or "")), None)
+    if toggle is not None:
+        toggle.value = True
+    if (people := numeric(_PEOPLE)) is not None:
+        people.value = SCENARIO["people"]
+        steps.append("people")
+    panes = [o for o in objects.values() if isinstance(o, pn.pane.PaneBase)]
+    result.scenario = {"steps": steps,
+                       "outputs": _money(str(p.object) for p in panes)}
+
+
+def _run_shiny(path: str, result: Result):
+    from shiny import App
+
+    namespace = runpy.run_path(path, run_name="sandbox_candidate")
+    result.import_ok = True
+    app = next((v for v in namespace.values() if isinstance(v, App)), None)
+    result.app_found = app is not None
+    if app is not None:
+        html = str(namespace.get("app_ui", ""))
+        result.extra["input_ids"] = sorted(set(re.findall(r'<input[^>]*\bid="([^"]+)"', html)))
+
+
+def run_candidate(framework: str, path: str, limits: Limits) -> Result:
+    """Execute one candidate in the current process (already isolated)."""
+    result = Result(framework, path)
+    start = time.perf_counter()
+    sys.path.insert(0, str(BASE_DIR))  # tipcore.py and friends
+    # Unwrapped app objects (static_cache.py), as host.py loads them.
+    os.environ["TIP_STATIC_CACHE"] = "0"
+    try:
+        if framework == "streamlit":
+            _run_streamlit(path, result, limits)
+        else:
+            {"dash": _run_dash, "panel": _run_panel, "shiny": _run_shiny}[framework](path, result)
+        if result.error:
+            result.status = "error"
+    except BaseException as err:  # noqa: BLE001 - anything the candidate raises
+        result.status = "error"
+        result.error = f"{type(err).__name__}: {err}"
+    result.duration_s = time.perf_counter() - start
+    return result
+
+
+def run_isolated(framework: str, path: str, limits: Limits) -> Result:
+    """Limit and cut off the current process, then run the candidate in it.
+
+    Fails closed: without a network namespace the candidate is not run
+    (status ``refused``) unless ``limits.allow_weak_isolation`` is set.
+    """
+    _limit_resources(limits)
+    isolated = _disable_network()
+    if isolated or limits.allow_weak_isolation:
+        result = run_candidate(framework, path, limits)
+    else:
+        result = Result(framework, path, "refused", error=(
+            "no network namespace (unprivileged user namespaces unavailable); "
+            "allow_weak_isolation runs it behind the socket guard only"))
+    result.network_isolated = isolated
+    return result
+
+
+# ── Template (forkserver) per framework ───────────────────────────────────────
+def _worker(framework: str, job: dict, limits: Limits, write_fd: int):
+    """Body of a forked worker; never returns."""
+    try:
+        os.setsid()  # its own process group, killed as a whole
+        result = run_isolated(framework, job["path"], limits)
+        payload = json.dumps(asdict(result), default=str).encode()
+    except BaseException as err:  # noqa: BLE001
+        payload = json.dumps(asdict(Result(framework, job["path"], "crashed",
+                                           error=repr(err)))).encode()
+    try:
+        while payload:
+            payload = payload[os.write(write_fd, payload):]
+    finally:
+        os._exit(0)
+
+
+def _template_main(framework: str, conn, limits: Limits, max_children: int):
+    """Import the framework once, then fork a limited worker per job."""
+    import importlib
+    import logging
+
+    logging.disable(logging.WARNING)  # frameworks warn loudly outside their runtime
+    for module in PRELOAD[framework]:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+    conn.send({"ready": framework})
+
+    queue, running = deque(), {}  # read fd -> [job, pid, deadline, chunks]
+    closed = False
+    while not (closed and not queue and not running):
+        while queue and len(running) < max_children:
+            job = queue.popleft()
+            read_fd, write_fd = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                os.close(read_fd)
+                _worker(framework, job, limits, write_fd)
+            os.close(write_fd)
+            running[read_fd] = [job, pid, time.monotonic() + limits.wall_s, []]
+
+        timeout = max(0.0, min((r[2] for r in running.values()), default=time.monotonic() + 1)
+                      - time.monotonic())
+        watched = list(running) + ([] if closed else [conn])
+        ready, _, _ = select.select(watched, [], [], timeout)
+        for source in ready:
+            if source is conn:
+                try:
+                    message = conn.recv()
+                except EOFError:
+                    message = None
+                if message is None:
+                    closed = True
+                else:
+                    queue.append(message)
+                continue
+            chunk = os.read(source, 65536)
+            if chunk:
+                running[source][3].append(chunk)
+            else:
+                _finish(conn, framework, running.pop(source), source)
+        now = time.monotonic()
+        for fd in [fd for fd, r in running.items() if r[2] <= now]:
+            entry = running.pop(fd)
+            _kill_group(entry[1])
+            _finish(conn, framework, entry, fd, timed_out=True)
+
+
+def _kill_group(pgid: int):
+    """SIGKILL a worker's process group: the worker and whatever it started."""
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def _finish(conn, framework: str, entry: list, fd: int, timed_out: bool = False):
+    job, pid, _, chunks = entry
+    os.close(fd)
+    # Servers or subprocesses the candidate left running. Before waitpid, so
+    # the group id cannot have been reused yet.
+    _kill_group(pid)
+    _, status = os.waitpid(pid, 0)
+    if timed_out:
+        result = asdict(Result(framework, job["path"], "timeout", error="wall-clock limit"))
+    else:
+        try:
+            result = json.loads(b"".join(chunks))
+        except ValueError:
+            reason = (f"killed by signal {os.WTERMSIG(status)}" if os.WIFSIGNALED(status)
+                      else f"exit status {os.waitstatus_to_exitcode(status)}")
+            result = asdict(Result(framework, job["path"], "crashed", error=reason))
+    conn.send({"id": job["id"], "result": result})
+
+
+class SandboxPool:
+    """One warm template per framework; ``run`` validates many candidates."""
+
+    def __init__(self, frameworks=APP_DIRS, limits: Limits = Limits(),
+                 workers: int = os.cpu_count() or 2):
+        ctx = multiprocessing.get_context("spawn")
+        self.templates = {}
+        for framework in frameworks:
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_template_main, daemon=True,
+                               args=(framework, child, limits, workers))
+            proc.start()
+            self.templates[framework] = (proc, parent)
+        for framework, (_, conn) in self.templates.items():
+            conn.recv()  # framework imported
+
+    def run(self, candidates: list[tuple[str, str]]) -> list[Result]:
+        """Validate ``(framework, path)`` pairs; results in input order."""
+        def feed():
+            for i, (framework, path) in enumerate(candidates):
+                self.templates[framework][1].send({"id": i, "path": str(path)})
+
+        # Sent from a thread so neither side blocks on a full pipe.
+        threading.Thread(target=feed, daemon=True).start()
+        pending = set(range(len(candidates)))
+        results = [None] * len(candidates)
+        conns = [conn for _, conn in self.templates.values()]
+        while pending:
+            for conn in multiprocessing.connection.wait(conns):
+                message = conn.recv()
+                results[message["id"]] = Result(**message["result"])
+                pending.discard(message["id"])
+        return results
+
+    def close(self):
+        for proc, conn in self.templates.values():
+            conn.send(None)
+            proc.join(timeout=10)
+            if proc.is_alive():
+                proc.kill()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_cold(candidates: list[tuple[str, str]], limits: Limits) -> list[Result]:
+    """The baseline: one fresh interpreter (and framework import) per candidate."""
+    results = []
+    weak = ["--allow-weak-isolation"] if limits.allow_weak_isolation else []
+    for framework, path in candidates:
+        proc = subprocess.Popen(
+            [sys.executable, __file__, "--_one", framework, str(path), *weak,
+             "--cpu", str(limits.cpu_s), "--memory", str(limits.memory_mib)],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+            start_new_session=True,
+        )
+        try:
+            stdout, _ = proc.communicate(timeout=limits.wall_s + 30)  # + import
+            results.append(Result(**json.loads(stdout.strip().splitlines()[-1])))
+        except subprocess.TimeoutExpired:
+            results.append(Result(framework, str(path), "timeout", error="wall-clock limit"))
+        except (ValueError, IndexError) as err:
+            results.append(Result(framework, str(path), "crashed", error=repr(err)))
+        finally:
+            _kill_group(proc.pid)
+            proc.communicate()
+    return results
+
+
+def _default_candidates() -> list[tuple[str, str]]:
+    return [(d, str(BASE_DIR / d / name)) for d in APP_DIRS
+            for name in ("app.py", "app_performance.py") if (BASE_DIR / d / name).exists()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("paths", nargs="*", type=Path,
+                        help="candidate files (default: the checked-in apps)")
+    parser.add_argument("--framework", choices=APP_DIRS,
+                        help="framework of every path (default: its directory name)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2,
+                        help="concurrent workers per framework")
+    parser.add_argument("--cpu", type=int, default=Limits.cpu_s, help="CPU seconds per candidate")
+    parser.add_argument("--memory", type=int, default=Limits.memory_mib,
+                        help="MiB of extra address space per candidate")
+    parser.add_argument("--timeout", type=float, default=Limits.wall_s,
+                        help="wall-clock seconds per candidate")
+    parser.add_argument("--allow-weak-isolation", action="store_true",
+                        help="run candidates behind the socket guard alone where "
+                             "no network namespace can be created")
+    parser.add_argument("--cold", action="store_true",
+                        help="one fresh interpreter per candidate, for comparison")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--_one", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    limits = Limits(args.cpu, args.memory, args.timeout, args.allow_weak_isolation)
+
+    if args._one:  # a --cold worker: same isolation, no template
+        framework, path = args._one
+        print(json.dumps(asdict(run_isolated(framework, path, limits)), default=str))
+        return
+
+    candidates = ([(args.framework or p.resolve().parent.name, str(p)) for p in args.paths]
+                  or _default_candidates())
+    start = time.perf_counter()
+    if args.cold:
+        results = run_cold(candidates, limits)
+    else:
+        with SandboxPool(sorted({f for f, _ in candidates}), limits, args.workers) as pool:
+            warm_s = time.perf_counter() - start
+            results = pool.run(candidates)
+        print(f"Templates warm in {warm_s:.1f} s", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps([asdict(r) for r in results], indent=2, default=str))
+    else:
+        for r in results:
+            outputs = (r.scenario or {}).get("outputs", r.extra.get("input_ids", []))
+            print(f"{r.status:8s} import={'ok' if r.import_ok else 'FAIL'} "
+                  f"app={'yes' if r.app_found else 'no'} {r.duration_s:5.2f}s  {r.path}"
+                  + (f"\n         {r.error}" if r.error else "")
+                  + (f"\n         outputs: {outputs[:4]}" if outputs else ""))
+    print(f"{len(results)} candidate(s) in {elapsed:.1f} s "
+          f"({len(results) / elapsed:.1f}/s)", file=sys.stderr)
+    sys.exit(0 if all(r.status == "ok" and r.app_found for r in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""
+Perceptual-hash index of every captured app screenshot.
+
+Each screenshot is recorded under its framework, sweep cell (``default`` for
+the checked-in apps) and name (``before``/``after``) with two fingerprints:
+
+- a 64-bit difference hash (dHash), compared by Hamming distance, and
+- a 32x32 grayscale thumbnail, compared by mean absolute pixel difference.
+
+A new capture is "identical" when both are within tolerance of the previous
+capture for the same key, so rebuilt screenshots that look the same can be
+reported as such and need not be graded again (see ``eval_apps.py -T
+skip_unchanged=true``). ``clusters`` groups near-identical UIs across
+candidates.
+
+Storage under ``.screenshot_index/`` is append-only: one fixed-width binary
+record (hash and thumbnail) per image, memory-mapped for lookups, plus one
+JSON line of metadata that names its record by position. Both are appended
+under a file lock and the id is the record's position on disk, so several
+processes can record at once and a crash mid-append leaves at most an
+unreferenced record. Recording stays O(1) and a distance scan over tens of
+thousands of images is a single vectorized pass. ``clusters`` uses
+multi-index hashing, so it compares only hashes that share a band of bits
+rather than every pair.
+
+Run:
+    python screenshot_index.py scan
+    python screenshot_index.py add dash sweep-07 before.png after.png
+    python screenshot_index.py clusters --max-distance 4
+"""
+
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+BASE_DIR = Path(__file__).parent
+INDEX_DIR = BASE_DIR / ".screenshot_index"
+
+APP_DIRS = ("streamlit", "dash", "panel", "shiny")
+
+THUMB_SIDE = 32
+# Visually identical: at most this many differing hash bits and this mean
+# absolute difference (0-1) between thumbnails.
+MAX_HASH_DISTANCE = 2
+MAX_PIXEL_DIFF = 0.01
+
+RECORD = np.dtype([("hash", "<u8"), ("thumb", "u1", THUMB_SIDE * THUMB_SIDE)])
+
+
+def dhash(image: Image.Image) -> int:
+    """64-bit difference hash: sign of horizontal gradients on a 9x8 image."""
+    small = np.asarray(
+        image.convert("L").resize((9, 8), Image.Resampling.BOX), dtype=np.int16
+    )
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def thumbnail(image: Image.Image) -> np.ndarray:
+    """Downsampled grayscale pixels for a quick pixel diff."""
+    small = image.convert("L").resize((THUMB_SIDE, THUMB_SIDE), Image.Resampling.BOX)
+    return np.asarray(small, dtype=np.uint8).flatten()
+
+
+def hamming(a, b) -> np.ndarray:
+    """Differing bits between uint64 hashes (broadcasts)."""
+    return np.bitwise_count(np.bitwise_xor(a, b))
+
+
+def pixel_diff(a: np.ndarray, b: np.ndarray) -> float:
+    """Mean absolute difference of two thumbnails, 0 (same) to 1."""
+    return float(np.abs(a.astype(np.int16) - b.astype(np.int16)).mean() / 255)
+
+
+@dataclass
+class Comparison:
+    """How a capture relates to the previous one for the same key."""
+
+    status: str  # "new", "identical" or "changed"
+    distance: int | None = None
+    pixel_diff: float | None = None
+    previous: dict | None = None
+
+
+class ScreenshotIndex:
+    """Append-only perceptual index of screenshots."""
+
+    def __init__(self, root: Path = INDEX_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._entries_path = self.root / "entries.jsonl"
+        self._records_path = self.root / "records.bin"
+        self._lock_path = self.root / "lock"
+        self.entries = []  # in record order; ids may skip orphaned records
+        self._by_id = {}
+        self._latest = {}
+        self._read_offset = 0
+        self._refresh()
+
+    @staticmethod
+    def _key(entry) -> tuple:
+        return entry["framework"], entry["cell"], entry["name"]
+
+    def _refresh(self):
+        """Load entry lines appended (by any process) since the last read."""
+        if not self._entries_path.exists():
+            return
+        with self._entries_path.open("rb") as f:
+            f.seek(self._read_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # a writer is mid-line; read it next time
+                self._read_offset += len(line)
+                entry = json.loads(line)
+                self.entries.append(entry)
+                self._by_id[entry["id"]] = entry
+                self._latest[self._key(entry)] = entry["id"]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _records(self) -> np.ndarray:
+        count = (self._records_path.stat().st_size // RECORD.itemsize
+                 if self._records_path.exists() else 0)
+        if not count:
+            return np.zeros(0, dtype=RECORD)
+        return np.memmap(self._records_path, dtype=RECORD, mode="r", shape=(count,))
+
+    def hashes(self) -> np.ndarray:
+        """Hash of every record, indexed by entry id."""
+        return self._records()["hash"]
+
+    def thumbs(self) -> np.ndarray:
+        """Thumbnail of every record, indexed by entry id."""
+        return self._records()["thumb"]
+
+    def latest(self, framework: str, cell: str, name: str) -> dict | None:
+        entry_id = self._latest.get((framework, cell, name))
+        return None if entry_id is None else self._by_id[entry_id]
+
+    def compare(self, path, framework: str, cell: str, name: str) -> Comparison:
+        """Compare an image with the latest capture for its key."""
+        self._refresh()
+        with Image.open(path) as image:
+            return self._compare(image, dhash(image), thumbnail(image),
+                                 self.latest(framework, cell, name))
+
+    def _compare(self, image, hash_, thumb, previous) -> Comparison:
+        if previous is None:
+            return Comparison("new")
+        distance = int(hamming(np.uint64(hash_), self.hashes()[previous["id"]]))
+        diff = pixel_diff(thumb, self.thumbs()[previous["id"]])
+        same = (
+            list(image.size) == previous["size"]
+            and distance <= MAX_HASH_DISTANCE
+            and diff <= MAX_PIXEL_DIFF
+        )
+        return Comparison("identical" if same else "changed", distance, diff, previous)
+
+    def record(self, path, framework: str, cell: str = "default",
+               name: str | None = None, **extra) -> Comparison:
+        """Add a capture and report how it differs from the previous one."""
+        path = Path(path)
+        name = name or path.stem
+        self._refresh()
+        with Image.open(path) as image:
+            hash_, thumb = dhash(image), thumbnail(image)
+            comparison = self._compare(image, hash_, thumb,
+                                       self.latest(framework, cell, name))
+            size = list(image.size)
+
+        entry = {
+            "framework": framework,
+            "cell": cell,
+            "name": name,
+            "path": str(path),
+            "sha256": hashlib.sha256(path.read_bytes()).hexdigest(),
+            "size": size,
+            "captured_at": time.time(),
+            "status": comparison.status,
+            **extra,
+        }
+        record = np.zeros(1, dtype=RECORD)
+        record["hash"], record["thumb"] = hash_, thumb
+        with self._lock_path.open("a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            # A torn record from a crashed writer is cut off, so every record
+            # starts at a multiple of the record size.
+            with self._records_path.open("ab") as f:
+                size = f.seek(0, os.SEEK_END)
+                if size % RECORD.itemsize:
+                    f.truncate(size - size % RECORD.itemsize)
+                entry["id"] = size // RECORD.itemsize
+                f.write(record.tobytes())
+            with self._entries_path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._refresh()
+        return comparison
+
+    def near(self, path, max_distance: int = 6) -> list[tuple[int, dict]]:
+        """All indexed captures within ``max_distance`` bits of an image."""
+        with Image.open(path) as image:
+            hash_ = np.uint64(dhash(image))
+        distances = hamming(self.hashes(), hash_)
+        hits = np.flatnonzero(distances <= max_distance)
+        hits = hits[np.argsort(distances[hits], kind="stable")]
+        return [(int(distances[i]), self._by_id[int(i)]) for i in hits
+                if int(i) in self._by_id]
+
+    def clusters(self, max_distance: int = 4,
+                 name: str | None = None) -> list[list[dict]]:
+        """Groups of near-identical latest captures (single linkage)."""
+        if not 0 <= max_distance < 64:
+            raise ValueError(f"max_distance must be 0-63, got {max_distance}")
+        ids = np.array(sorted(
+            entry_id for key, entry_id in self._latest.items()
+            if name is None or key[2] == name
+        ), dtype=np.int64)
+        if not len(ids):
+            return []
+        # Captures with the same hash are one node; only distinct hashes are
+        # compared, and only those sharing a band (see close_pairs).
+        unique, inverse = np.unique(np.asarray(self.hashes()[ids]), return_inverse=True)
+        labels = components(len(unique), *close_pairs(unique, max_distance))[inverse]
+
+        groups = {}
+        for label, entry_id in zip(labels.tolist(), ids.tolist()):
+            groups.setdefault(label, []).append(self._by_id[entry_id])
+        return sorted((g for g in groups.values() if len(g) > 1), key=len, reverse=True)
+
+
+def close_pairs(hashes: np.ndarray, max_distance: int) -> tuple[np.ndarray, np.ndarray]:
+    """Index pairs of ``hashes`` at most ``max_distance`` bits apart.
+
+    Multi-index hashing: the 64 bits are split into ``max_distance + 1``
+    bands, and two hashes that close agree exactly on at least one band. Per
+    band the hashes are sorted by band value, and only neighbours within a
+    run of equal values are compared, one vectorized pass per offset.
+    """
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    edges = np.linspace(0, 64, max_distance + 2).astype(int)
+    found_a, found_b = [], []
+    for low, high in zip(edges[:-1], edges[1:]):
+        band = (hashes >> np.uint64(low)) & np.uint64((1 << int(high - low)) - 1)
+        order = np.argsort(band, kind="stable")
+        keys = band[order]
+        for offset in range(1, len(order)):
+            same = keys[offset:] == keys[:-offset]
+            if not same.any():  # no run of equal keys is this long
+                break
+            a, b = order[:-offset][same], order[offset:][same]
+            close = hamming(hashes[a], hashes[b]) <= max_distance
+            found_a.append(a[close])
+            found_b.append(b[close])
+    if not found_a:
+        return np.empty(0, np.int64), np.empty(0, np.int64)
+    return np.concatenate(found_a), np.concatenate(found_b)
+
+
+def components(n: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Connected-component label (smallest member) of each of ``n`` nodes
+    joined by the edges ``a[k]``-``b[k]``, by vectorized label propagation."""
+    labels = np.arange(n)
+    while True:
+        lowest = np.minimum(labels[a], labels[b])
+        merged = labels.copy()
+        np.minimum.at(merged, a, lowest)
+        np.minimum.at(merged, b, lowest)
+        merged = merged[merged]  # pointer jumping
+        if np.array_equal(merged, labels):
+            return labels
+        labels = merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("scan", help="record the checked-in apps' screenshots")
+    add = commands.add_parser("add", help="record screenshots for one sweep cell")
+    add.add_argument("framework")
+    add.add_argument("cell")
+    add.add_argument("images", nargs="+", type=Path)
+    clusters = commands.add_parser("clusters", help="group near-identical UIs")
+    clusters.add_argument("--max-distance", type=int, default=4)
+    clusters.add_argument("--name", help="only captures with this name, e.g. after")
+    args = parser.parse_args()
+
+    index = ScreenshotIndex()
+    if args.command == "clusters":
+        for i, group in enumerate(index.clusters(args.max_distance, args.name), 1):
+            members = ", ".join(f"{e['framework']}/{e['cell']}/{e['name']}" for e in group)
+            print(f"cluster {i} ({len(group)}): {members}")
+        return
+
+    if args.command == "scan":
+        jobs = [(dirname, "default", BASE_DIR / dirname / f"{name}.png")
+                for dirname in APP_DIRS for name in ("before", "after")]
+    else:
+        jobs = [(args.framework, args.cell, path) for path in args.images]
+
+    for framework, cell, path in jobs:
+        if not path.exists():
+            continue
+        result = index.record(path, framework, cell)
+        detail = ""
+        if result.distance is not None:
+            detail = f" (hash distance {result.distance}, pixel diff {result.pixel_diff:.3f})"
+        print(f"{framework}/{cell}/{path.stem}: {result.status}{detail}")
+
+
+if __name__ == "__main__":
+    main()
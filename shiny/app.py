@@ -1,5 +1,62 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
 from shiny import App, render, ui, reactive
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import static_cache  # noqa: E402  (precompressed assets, see static_cache.py)
+import tipcore  # noqa: E402  (shared arithmetic, see tipcore.py)
+
+# Seconds of typing inactivity before the numeric inputs are recalculated, so
+# typing "85.50" triggers one calculation instead of five (0 = every key).
+INPUT_DEBOUNCE_S = float(os.environ.get("TIP_INPUT_DEBOUNCE", "0.4"))
+
+
+def debounce(delay_secs):
+    """Decorator: a reactive.calc whose value only updates after `delay_secs`
+    without further invalidations (Shiny's debounce recipe)."""
+
+    def wrapper(fn):
+        if not delay_secs:
+            return reactive.calc(fn)
+
+        when = reactive.value(None)
+        trigger = reactive.value(0)
+
+        @reactive.calc
+        def original():
+            return fn()
+
+        @reactive.effect(priority=1)
+        def _schedule():
+            original()
+            with reactive.isolate():
+                when.set(time.monotonic() + delay_secs)
+
+        @reactive.effect(priority=1)
+        def _fire():
+            if when() is None:
+                return
+            remaining = when() - time.monotonic()
+            if remaining > 0:
+                reactive.invalidate_later(remaining)
+                return
+            with reactive.isolate():
+                trigger.set(trigger() + 1)
+                when.set(None)
+
+        @reactive.calc
+        @reactive.event(trigger)
+        def debounced():
+            return original()
+
+        return debounced
+
+    return wrapper
+
 # ── UI ────────────────────────────────────────────────────────────────────────
 app_ui = ui.page_fixed(
 
@@ -119,6 +176,24 @@ app_ui = ui.page_fixed(
 
     ui.br(),
 
+    # ── Bulk receipts card ────────────────────────────────────────────────────
+    ui.card(
+        ui.card_header(ui.h5("📂 Bulk Receipts", class_="mb-0")),
+        ui.layout_columns(
+            ui.input_file(
+                "receipts",
+                "Upload a CSV (bill, tip_pct, people)",
+                accept=[".csv"],
+            ),
+            ui.input_numeric("receipts_page", "Page", value=1, min=1, step=1),
+            col_widths=[8, 4],
+        ),
+        ui.output_text("receipts_summary"),
+        ui.output_data_frame("receipts_page_table"),
+    ),
+
+    ui.br(),
+
     # ── Footer ────────────────────────────────────────────────────────────────
     ui.div(
         ui.p("Tip amounts are rounded to the nearest cent.", class_="text-muted small"),
@@ -132,39 +207,56 @@ app_ui = ui.page_fixed(
 # ── Server ────────────────────────────────────────────────────────────────────
 def server(input, output, session):
 
-    # ── Preset button handlers: update tip_pct numeric input ──────────────────
+    # ── Debounced inputs ──────────────────────────────────────────────────────
+    # All three fields are typed, so each waits for a pause in typing. The tip
+    # has its own window: a preset's echo of tip_pct restarts only that one.
+    @debounce(INPUT_DEBOUNCE_S)
+    def typed_amounts():
+        return input.bill(), input.num_people()
+
+    @debounce(INPUT_DEBOUNCE_S)
+    def typed_tip():
+        return input.tip_pct()
+
+    # Effective tip %: the typed value once debounced, or a preset at once.
+    tip_pct = reactive.value(None)
+
+    @reactive.effect
+    def _use_typed_tip():
+        tip_pct.set(typed_tip())
+
+    # ── Preset button handlers: apply at once, then update the tip_pct field ──
+    def _apply_preset(pct):
+        tip_pct.set(pct)
+        ui.update_numeric("tip_pct", value=pct)
+
     @reactive.effect
     @reactive.event(input.preset_15)
     def _apply_15():
-        ui.update_numeric("tip_pct", value=15)
+        _apply_preset(15)
 
     @reactive.effect
     @reactive.event(input.preset_18)
     def _apply_18():
-        ui.update_numeric("tip_pct", value=18)
+        _apply_preset(18)
 
     @reactive.effect
     @reactive.event(input.preset_20)
     def _apply_20():
-        ui.update_numeric("tip_pct", value=20)
+        _apply_preset(20)
 
     # ── Reactive calculation ──────────────────────────────────────────────────
     @reactive.calc
     def calc():
-        bill = input.bill() or 0.0
-        pct  = input.tip_pct() or 0.0
-        people = max(int(input.num_people() or 1), 1)
-
-        tip   = round(bill * pct / 100, 2)
-        total = round(bill + tip, 2)
-        per_person_tip   = round(tip   / people, 2)
-        per_person_total = round(total / people, 2)
+        bill, people = typed_amounts()
+        pct = tip_pct()
+        amounts = tipcore.split_bill(bill, pct, max(int(people or 1), 1))
 
         return {
-            "tip":   tip,
-            "total": total,
-            "split_tip":   per_person_tip,
-            "split_total": per_person_total,
+            "tip":   amounts.tip,
+            "total": amounts.total,
+            "split_tip":   amounts.per_person_tip,
+            "split_total": amounts.per_person_total,
         }
 
     # ── Outputs ───────────────────────────────────────────────────────────────
@@ -184,6 +276,47 @@ def server(input, output, session):
     def split_total():
         return f"${calc()['split_total']:,.2f}"
 
+    # ── Bulk receipts: computed once per upload, rendered one page at a time ──
+    @reactive.calc
+    def receipts():
+        files = input.receipts()
+        if not files:
+            return None
+        with open(files[0]["datapath"], "rb") as f:
+            return tipcore.read_receipts(f)
+
+    @reactive.effect
+    def _reset_receipts_page():
+        table = receipts()
+        if table is not None:
+            ui.update_numeric(
+                "receipts_page",
+                value=1,
+                max=table.page_count(tipcore.DEFAULT_PAGE_SIZE),
+            )
+
+    @render.text
+    def receipts_summary():
+        table = receipts()
+        if table is None:
+            return "No receipts uploaded yet."
+        return "   |   ".join(f"{k}: {v}" for k, v in table.summary().items())
+
+    # Only the current page's rows are sent; the grid itself is not rebuilt.
+    @render.data_frame
+    def receipts_page_table():
+        table = receipts()
+        if table is None:
+            return None
+        rows = table.page((input.receipts_page() or 1) - 1,
+                          tipcore.DEFAULT_PAGE_SIZE)
+        return render.DataTable(
+            pd.DataFrame(rows, columns=list(tipcore.RECEIPT_COLUMNS)),
+            width="100%",
+        )
+
 
 # ── App ───────────────────────────────────────────────────────────────────────
-app = App(app_ui, server)
\ No newline at end of file
+# The UI is static, so the page and its Bootstrap/bslib dependencies can all be
+# served precompressed with content-hash ETags.
+app = static_cache.asgi(App(app_ui, server), cache_html=True)
\ No newline at end of file
@@ -0,0 +1,369 @@
+"""
+Precompressed, cache-friendly static assets for the Dash, Shiny and Panel apps.
+
+Every framework serves its own JS/CSS bundles and HTML shell with its own
+idea of compression and cache headers. This layer sits in front of each
+server and, the first time an asset is served, stores it once in memory
+precompressed as gzip and (when the optional ``brotli`` package is
+installed) Brotli. Only static assets are stored: URLs ending in a static
+file extension or carrying a version/content hash, plus the HTML shell (the
+app's root document, ``HTML_PATHS``) when ``cache_html`` is set. Only those
+requests are buffered; callbacks, layouts, streams and other dynamic
+responses pass straight through to the app. The cache is an LRU bounded by ``MAX_CACHE_BYTES``, and a HEAD
+request is answered from it but never fills it. Every later request is
+answered from memory, with:
+
+- ``Content-Encoding`` negotiated from ``Accept-Encoding``;
+- an ``ETag`` computed from the content hash, with 304s for revalidation;
+- ``Cache-Control: immutable`` for URLs that already carry a version or
+  content hash (``?v=``, Dash's ``.v1_2_3m456.js``, ``main.1a2b3c4d.js``);
+- ``no-cache`` (revalidate with the ETag) for everything else, including
+  the HTML shell.
+
+Hook it up with one line per app:
+
+    Dash   app.server.wsgi_app = static_cache.wsgi(app.server.wsgi_app, cache_html=True)
+    Shiny  app = static_cache.asgi(App(app_ui, server), cache_html=True)
+    Panel  static_cache.install_tornado()   # wraps Bokeh/Panel static handlers
+
+``TIP_STATIC_CACHE=0`` turns the layer off, so ``bench.cold_load`` can measure
+each app with and without it.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from http import HTTPStatus
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "application/xml",
+    "image/svg+xml",
+    "text/css",
+    "text/javascript",
+    "text/plain",
+}
+MIN_COMPRESS_BYTES = 512
+# Brotli's best quality is slow on multi-megabyte bundles (Plotly is ~3.5 MB);
+# use a cheaper level above this size so the first request stays fast.
+BROTLI_MAX_QUALITY_BYTES = 1_000_000
+# Upper bound on the bodies (all encodings) held by one AssetCache.
+MAX_CACHE_BYTES = 128 * 2**20
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+_VERSIONED_URL = re.compile(
+    r"[?&](v|m|_v|version)=|\.v[\w-]+m\d+\.|[.-][0-9a-f]{8,}\.[a-z0-9]+(\?|$)"
+)
+_STATIC_PATH = re.compile(r"\.(css|html?|js|json|map|mjs|svg|txt|webmanifest|xml)$", re.I)
+
+
+def enabled() -> bool:
+    return os.environ.get("TIP_STATIC_CACHE", "1") != "0"
+
+
+@dataclass(frozen=True)
+class Asset:
+    """One response body, precompressed in every supported encoding."""
+
+    content_type: str
+    etag: str
+    bodies: dict  # encoding ("identity", "gzip", "br") -> bytes
+
+    def choose(self, accept_encoding: str) -> tuple[str, bytes]:
+        accepted = {e.split(";")[0].strip() for e in accept_encoding.lower().split(",")}
+        for encoding in ("br", "gzip"):
+            if encoding in self.bodies and encoding in accepted:
+                return encoding, self.bodies[encoding]
+        return "identity", self.bodies["identity"]
+
+
+def make_asset(body: bytes, content_type: str) -> Asset:
+    """Hash and precompress one body."""
+    bodies = {"identity": body}
+    base_type = content_type.split(";")[0].strip().lower()
+    if len(body) >= MIN_COMPRESS_BYTES and (
+        base_type in COMPRESSIBLE_TYPES or base_type == "text/html"
+    ):
+        bodies["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+        if brotli is not None:
+            quality = 11 if len(body) <= BROTLI_MAX_QUALITY_BYTES else 6
+            bodies["br"] = brotli.compress(body, quality=quality)
+    etag = f'"{hashlib.sha256(body).hexdigest()[:20]}"'
+    return Asset(content_type, etag, bodies)
+
+
+# Routes of the HTML shell, relative to where the app is mounted.
+HTML_PATHS = ("", "/")
+
+
+def static_url(path: str, query: str = "") -> bool:
+    """Whether a request URL names a static asset (by extension or version)."""
+    url = path + (f"?{query}" if query else "")
+    return bool(_STATIC_PATH.search(path) or _VERSIONED_URL.search(url))
+
+
+class AssetCache:
+    """Thread-safe LRU map from request URL (or file) to precompressed asset,
+    bounded by the total size of the stored bodies."""
+
+    def __init__(self, max_bytes: int = MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._assets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._assets)
+
+    def get(self, key):
+        with self._lock:
+            asset = self._assets.get(key)
+            if asset is not None:
+                self._assets.move_to_end(key)
+            return asset
+
+    def put(self, key, asset: Asset) -> Asset:
+        size = sum(len(body) for body in asset.bodies.values())
+        with self._lock:
+            if key in self._assets:
+                self._assets.move_to_end(key)
+                return self._assets[key]
+            if size > self.max_bytes:
+                return asset  # served, but too large to keep
+            self._assets[key] = asset
+            self.size += size
+            while self.size > self.max_bytes:
+                _, evicted = self._assets.popitem(last=False)
+                self.size -= sum(len(body) for body in evicted.bodies.values())
+            return asset
+
+    def from_file(self, path: str) -> Asset | None:
+        """Precompressed asset for a static file (keyed by path and mtime)."""
+        try:
+            key = (path, os.stat(path).st_mtime_ns)
+        except OSError:
+            return None
+        asset = self.get(key)
+        if asset is None:
+            content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+            if content_type.split(";")[0] not in COMPRESSIBLE_TYPES:
+                return None
+            with open(path, "rb") as f:
+                asset = self.put(key, make_asset(f.read(), content_type))
+        return asset
+
+
+def cacheable(status: int, headers: dict, body: bytes, cache_html: bool,
+              static: bool = True) -> Asset | None:
+    """An asset for a response worth caching, else None (headers lower-cased).
+    Non-HTML responses are only cached for ``static`` URLs (see static_url)."""
+    if status != 200 or "set-cookie" in headers or headers.get("content-encoding"):
+        return None
+    cache_control = headers.get("cache-control", "")
+    if "no-store" in cache_control or "private" in cache_control:
+        return None
+    content_type = headers.get("content-type", "")
+    base_type = content_type.split(";")[0].strip().lower()
+    if (static and base_type in COMPRESSIBLE_TYPES) or (
+        cache_html and base_type == "text/html"
+    ):
+        return make_asset(body, content_type)
+    return None
+
+
+def respond(asset: Asset, url: str, accept_encoding: str,
+            if_none_match: str | None, head: bool = False):
+    """``(status, headers, body)`` for serving ``asset`` at ``url``."""
+    is_html = asset.content_type.startswith("text/html")
+    headers = [
+        ("ETag", asset.etag),
+        ("Cache-Control",
+         IMMUTABLE if not is_html and _VERSIONED_URL.search(url) else REVALIDATE),
+        ("Vary", "Accept-Encoding"),
+    ]
+    if if_none_match and asset.etag in if_none_match:
+        return 304, headers, b""
+    encoding, body = asset.choose(accept_encoding)
+    headers += [("Content-Type", asset.content_type), ("Content-Length", str(len(body)))]
+    if encoding != "identity":
+        headers.append(("Content-Encoding", encoding))
+    return 200, headers, b"" if head else body
+
+
+def _status_line(status: int) -> str:
+    return f"{status} {HTTPStatus(status).phrase}"
+
+
+# ── WSGI (Dash / Flask) ───────────────────────────────────────────────────────
+def wsgi(app, cache_html: bool = False, cache: AssetCache | None = None):
+    """Wrap a WSGI app; GET responses for static assets are cached."""
+    if not enabled():
+        return app
+    cache = cache or AssetCache()
+
+    def middleware(environ, start_response):
+        method = environ["REQUEST_METHOD"]
+        if method not in ("GET", "HEAD"):
+            return app(environ, start_response)
+        path, query = environ.get("PATH_INFO", ""), environ.get("QUERY_STRING", "")
+        url = path + (f"?{query}" if query else "")
+        static = static_url(path, query)
+        if not (static or (cache_html and path in HTML_PATHS)):
+            return app(environ, start_response)  # not cacheable: not buffered
+        asset = cache.get(url)
+        if asset is None and method == "HEAD":
+            return app(environ, start_response)  # no body to cache
+        if asset is None:
+            captured, chunks = {}, []
+
+            def capture(status, headers, exc_info=None):
+                captured["status"], captured["headers"] = status, headers
+                return chunks.append
+
+            result = app(environ, capture)
+            try:
+                chunks.extend(result)
+            finally:
+                if hasattr(result, "close"):
+                    result.close()
+            body = b"".join(chunks)
+            headers = {k.lower(): v for k, v in captured["headers"]}
+            asset = cacheable(int(captured["status"].split()[0]), headers, body,
+                              cache_html, static)
+            if asset is None:
+                start_response(captured["status"], captured["headers"])
+                return [body]
+            asset = cache.put(url, asset)
+
+        status, headers, body = respond(
+            asset, url, environ.get("HTTP_ACCEPT_ENCODING", ""),
+            environ.get("HTTP_IF_NONE_MATCH"), head=method == "HEAD",
+        )
+        start_response(_status_line(status), headers)
+        return [body]
+
+    return middleware
+
+
+# ── ASGI (Shiny / Starlette) ──────────────────────────────────────────────────
+def _route_path(scope) -> str:
+    """The request path below the mount point (Starlette mounts keep the full
+    path in ``path`` and the mount prefix in ``root_path``)."""
+    path, root = scope["path"], scope.get("root_path", "")
+    return path[len(root):] if root and path.startswith(root) else path
+
+
+def asgi(app, cache_html: bool = False, cache: AssetCache | None = None):
+    """Wrap an ASGI app; GET responses for static assets are cached."""
+    if not enabled():
+        return app
+    cache = cache or AssetCache()
+
+    async def middleware(scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            return await app(scope, receive, send)
+        query = scope.get("query_string", b"").decode()
+        url = scope["path"] + (f"?{query}" if query else "")
+        static = static_url(scope["path"], query)
+        if not (static or (cache_html and _route_path(scope) in HTML_PATHS)):
+            return await app(scope, receive, send)  # not cacheable: not buffered
+        asset = cache.get(url)
+        if asset is None and scope["method"] == "HEAD":
+            return await app(scope, receive, send)  # no body to cache
+        request_headers = {k.decode().lower(): v.decode() for k, v in scope["headers"]}
+        if asset is None:
+            start, chunks = {}, []
+
+            async def capture(message):
+                if message["type"] == "http.response.start":
+                    start.update(message)
+                elif message["type"] == "http.response.body":
+                    chunks.append(message.get("body", b""))
+
+            await app(scope, receive, capture)
+            body = b"".join(chunks)
+            headers = {k.decode().lower(): v.decode() for k, v in start.get("headers", [])}
+            asset = cacheable(start.get("status"), headers, body, cache_html, static)
+            if asset is None:
+                await send({**start, "type": "http.response.start"})
+                await send({"type": "http.response.body", "body": body})
+                return
+            asset = cache.put(url, asset)
+
+        status, headers, body = respond(
+            asset, url, request_headers.get("accept-encoding", ""),
+            request_headers.get("if-none-match"), head=scope["method"] == "HEAD",
+        )
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    return middleware
+
+
+# ── Tornado (Panel / Bokeh) ───────────────────────────────────────────────────
+_TORNADO_CACHE = AssetCache()
+
+
+def install_tornado():
+    """Serve Tornado ``StaticFileHandler`` files (Bokeh's and Panel's static
+    and component resources) from the precompressed cache. Idempotent.
+
+    Called from the Panel app, which runs when a session's HTML is requested,
+    i.e. before the browser asks for any of the page's assets.
+    """
+    if not enabled():
+        return
+    from tornado import web
+
+    if getattr(web.StaticFileHandler, "_precompressed", False):
+        return
+    original_get = web.StaticFileHandler.get
+
+    async def get(self, path, include_body=True):
+        # The same steps as StaticFileHandler.get, so subclasses (Bokeh's
+        # handlers) see path, absolute_path and modified set as usual.
+        self.path = self.parse_url_path(path)
+        absolute = self.get_absolute_path(self.root, self.path)
+        self.absolute_path = self.validate_absolute_path(self.root, absolute)
+        if self.absolute_path is None:
+            return
+        asset = _TORNADO_CACHE.from_file(self.absolute_path)
+        if asset is None:
+            return await original_get(self, path, include_body)
+        self.modified = self.get_modified_time()
+        self.set_headers()  # Last-Modified, Expires and set_extra_headers
+        self.clear_header("Accept-Ranges")  # the bodies are not ranged
+        status, headers, body = respond(
+            asset, self.request.uri,
+            self.request.headers.get("Accept-Encoding", ""),
+            None, head=not include_body,
+        )
+        for name, value in headers:
+            self.set_header(name, value)
+        # If-None-Match against the asset's ETag, else If-Modified-Since.
+        if self.should_return_304():
+            self.set_status(304)
+            return
+        self.set_status(status)
+        if body:
+            self.write(body)
+
+    web.StaticFileHandler.get = get
+    web.StaticFileHandler._precompressed = True
@@ -1,5 +1,11 @@
+import sys
+from pathlib import Path
+
 import streamlit as st
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import tipcore  # noqa: E402  (shared arithmetic, see tipcore.py)
+
 # ── Page config ───────────────────────────────────────────────────────────────
 st.set_page_config(
     page_title="Tip Calculator",
@@ -7,126 +13,190 @@ st.set_page_config(
     layout="centered",
 )
 
-# ── Title ─────────────────────────────────────────────────────────────────────
-st.title("💰 Tip Calculator")
-st.markdown("Calculate your tip and total bill instantly.")
-st.divider()
-
-# ── Bill Amount ───────────────────────────────────────────────────────────────
-st.subheader("🧾 Bill Details")
-
-bill_amount = st.number_input(
-    label="Bill Amount ($)",
-    min_value=0.0,
-    value=0.0,
-    step=0.01,
-    format="%.2f",
-    placeholder="Enter the total bill amount...",
-    help="Enter the pre-tip bill amount in dollars.",
-)
-
-st.markdown("**Select a Tip Percentage**")
-
-# ── Tip Preset Buttons ────────────────────────────────────────────────────────
-# Use session state to track selected preset vs custom slider value
-if "tip_pct" not in st.session_state:
-    st.session_state["tip_pct"] = 18
-
-col_p1, col_p2, col_p3 = st.columns(3)
-
-with col_p1:
-    if st.button("15%  —  Standard", use_container_width=True):
-        st.session_state["tip_pct"] = 15
-with col_p2:
-    if st.button("18%  —  Good", use_container_width=True):
-        st.session_state["tip_pct"] = 18
-with col_p3:
-    if st.button("20%  —  Great", use_container_width=True):
-        st.session_state["tip_pct"] = 20
-
-# ── Custom Tip Slider ─────────────────────────────────────────────────────────
-tip_pct = st.slider(
-    label="Or choose a custom tip percentage",
-    min_value=0,
-    max_value=50,
-    value=st.session_state["tip_pct"],
-    step=1,
-    format="%d%%",
-    help="Drag to set a custom tip percentage (0 – 50%).",
-)
-
-# Keep session state in sync with the slider when user drags it manually
-st.session_state["tip_pct"] = tip_pct
-
-st.divider()
+TIP_PRESETS = [(15, "Standard"), (18, "Good"), (20, "Great")]
 
-# ── Calculations ──────────────────────────────────────────────────────────────
-tip_amount  = bill_amount * tip_pct / 100
-total_bill  = bill_amount + tip_amount
+# ── Session state ─────────────────────────────────────────────────────────────
+# The slider is bound to the "tip_pct" key, so the preset callbacks only need
+# to write that key; the new value is picked up in the same (fragment) run.
+st.session_state.setdefault("tip_pct", 18)
 
-# ── Results ───────────────────────────────────────────────────────────────────
-st.subheader("📊 Results")
 
-res_col1, res_col2, res_col3 = st.columns(3)
+def apply_preset(pct):
+    """Button callback: runs before the fragment re-executes."""
+    st.session_state["tip_pct"] = pct
 
-res_col1.metric(
-    label="Tip Percentage",
-    value=f"{tip_pct}%",
-)
-res_col2.metric(
-    label="Tip Amount",
-    value=f"${tip_amount:,.2f}",
-)
-res_col3.metric(
-    label="Total Bill",
-    value=f"${total_bill:,.2f}",
-)
 
+# ── Title ─────────────────────────────────────────────────────────────────────
+st.title("💰 Tip Calculator")
+st.markdown("Calculate your tip and total bill instantly.")
 st.divider()
 
-# ── Bill Splitter (Optional Feature) ─────────────────────────────────────────
-st.subheader("🍽️ Split the Bill")
 
-split_on = st.toggle("Split the total among multiple people", value=False)
+# ── Bill Splitter (Optional Feature) ─────────────────────────────────────────
+@st.fragment
+def split_section(bill_amount, tip_pct):
+    """Split controls and summary; re-executes alone when they change."""
+    st.subheader("🍽️ Split the Bill")
 
-if split_on:
-    num_people = st.number_input(
-        label="Number of People",
-        min_value=2,
-        max_value=100,
-        value=2,
-        step=1,
-        help="How many people are sharing the bill?",
+    split_on = st.toggle(
+        "Split the total among multiple people", value=False, key="split_on"
     )
 
-    if num_people >= 2:
-        per_person_total = total_bill / num_people
-        per_person_tip   = tip_amount / num_people
+    num_people = 1
+    if split_on:
+        num_people = st.number_input(
+            label="Number of People",
+            min_value=2,
+            max_value=100,
+            value=2,
+            step=1,
+            key="num_people",
+            help="How many people are sharing the bill?",
+        )
+
+    amounts = tipcore.split_bill(bill_amount, tip_pct, num_people)
+    tip_amount, total_bill = amounts.tip, amounts.total
+    per_person_total = amounts.per_person_total
 
+    if split_on:
         st.markdown(f"Splitting **\${total_bill:,.2f}** among **{int(num_people)} people**:")
 
         sp_col1, sp_col2 = st.columns(2)
         sp_col1.metric(
             label="Each Person Pays (Tip)",
-            value=f"${per_person_tip:,.2f}",
+            value=f"${amounts.per_person_tip:,.2f}",
         )
         sp_col2.metric(
             label="Each Person Pays (Total)",
             value=f"${per_person_total:,.2f}",
         )
 
-st.divider()
+    st.divider()
+
+    # ── Summary caption ───────────────────────────────────────────────────────
+    if bill_amount > 0:
+        st.caption(
+            f"📌 A {tip_pct}% tip on a **\${bill_amount:,.2f}** bill "
+            f"is **\${tip_amount:,.2f}**, making your total **\${total_bill:,.2f}**."
+            + (
+                f" Split {int(num_people)} ways, each person owes **\${per_person_total:,.2f}**."
+                if split_on
+                else ""
+            )
+        )
+    else:
+        st.caption("👆 Enter a bill amount above to see your results instantly.")
+
+
+# ── Calculator (inputs + results) ─────────────────────────────────────────────
+@st.fragment
+def calculator():
+    """Inputs and results; re-executes alone (with the split section)."""
+    st.subheader("🧾 Bill Details")
+
+    bill_amount = st.number_input(
+        label="Bill Amount ($)",
+        min_value=0.0,
+        value=0.0,
+        step=0.01,
+        format="%.2f",
+        key="bill",
+        placeholder="Enter the total bill amount...",
+        help="Enter the pre-tip bill amount in dollars.",
+    )
+
+    st.markdown("**Select a Tip Percentage**")
 
-# ── Summary caption ───────────────────────────────────────────────────────────
-if bill_amount > 0:
-    st.caption(
-        f"📌 A {tip_pct}% tip on a **\${bill_amount:,.2f}** bill "
-        f"is **\${tip_amount:,.2f}**, making your total **\${total_bill:,.2f}**."
-        + (
-            f" Split {int(num_people)} ways, each person owes **\${per_person_total:,.2f}**."
-            if split_on and num_people >= 2
-            else ""
+    # ── Tip Preset Buttons ────────────────────────────────────────────────────
+    for col, (pct, label) in zip(st.columns(len(TIP_PRESETS)), TIP_PRESETS):
+        col.button(
+            f"{pct}%  —  {label}",
+            use_container_width=True,
+            on_click=apply_preset,
+            args=(pct,),
         )
+
+    # ── Custom Tip Slider ─────────────────────────────────────────────────────
+    tip_pct = st.slider(
+        label="Or choose a custom tip percentage",
+        min_value=0,
+        max_value=50,
+        step=1,
+        format="%d%%",
+        key="tip_pct",
+        help="Drag to set a custom tip percentage (0 – 50%).",
     )
-else:
-    st.caption("👆 Enter a bill amount above to see your results instantly.")
+
+    st.divider()
+
+    # ── Calculations ──────────────────────────────────────────────────────────
+    amounts     = tipcore.split_bill(bill_amount, tip_pct)
+    tip_amount  = amounts.tip
+    total_bill  = amounts.total
+
+    # ── Results ───────────────────────────────────────────────────────────────
+    st.subheader("📊 Results")
+
+    res_col1, res_col2, res_col3 = st.columns(3)
+
+    res_col1.metric(
+        label="Tip Percentage",
+        value=f"{tip_pct}%",
+    )
+    res_col2.metric(
+        label="Tip Amount",
+        value=f"${tip_amount:,.2f}",
+    )
+    res_col3.metric(
+        label="Total Bill",
+        value=f"${total_bill:,.2f}",
+    )
+
+    st.divider()
+
+    split_section(bill_amount, tip_pct)
+
+
+# ── Bulk Receipts ─────────────────────────────────────────────────────────────
+@st.cache_resource(max_entries=8, show_spinner="Computing receipts…")
+def load_receipts(file_id, _upload):
+    """Parse and compute an upload once; pages are sliced from the result."""
+    _upload.seek(0)
+    return tipcore.read_receipts(_upload)
+
+
+@st.fragment
+def bulk_receipts():
+    """CSV upload with server-side paging; only one page reaches the browser."""
+    st.subheader("📂 Bulk Receipts")
+
+    upload = st.file_uploader(
+        "Upload a CSV of receipts (bill, tip_pct, people)",
+        type="csv",
+        key="receipts_csv",
+    )
+    if upload is None:
+        st.caption("Columns: bill amount, tip percentage and (optionally) party size.")
+        return
+
+    table = load_receipts(upload.file_id, upload)
+    for col, (label, value) in zip(st.columns(5), table.summary().items()):
+        col.metric(label=label, value=value)
+
+    page = st.number_input(
+        "Page",
+        min_value=1,
+        max_value=table.page_count(tipcore.DEFAULT_PAGE_SIZE),
+        value=1,
+        step=1,
+        key="receipts_page",
+    )
+    st.dataframe(
+        table.page(page - 1, tipcore.DEFAULT_PAGE_SIZE),
+        hide_index=True,
+        use_container_width=True,
+    )
+
+
+calculator()
+bulk_receipts()
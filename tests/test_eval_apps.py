@@ -0,0 +1,43 @@
+import pytest
+
+pytest.importorskip("inspect_ai")
+
+import eval_apps  # noqa: E402
+
+
+def scores(value, **overrides):
+    graded = {c: value for c in eval_apps.SCORE_LABELS}
+    graded.update(overrides)
+    return graded
+
+
+@pytest.mark.parametrize("value, near", [
+    (1, False), (2, False), (3, False), (4, True), (5, True),
+    (6, False), (7, True), (8, True), (9, False), (10, False),
+])
+def test_near_threshold_integer_scores(value, near):
+    assert eval_apps._near_threshold(scores(value), margin=1.0) is near
+
+
+def test_near_threshold_any_judged_criterion():
+    assert eval_apps._near_threshold(scores(10, readability=5), margin=1.0)
+
+
+def test_efficiency_is_not_judged():
+    assert not eval_apps._near_threshold(scores(10, efficiency=5), margin=1.0)
+
+
+def test_missing_score_escalates():
+    assert eval_apps._near_threshold(scores(10, adherence=0.0), margin=0.0)
+    assert eval_apps._grading_failed(scores(10, adherence=0.0))
+    assert not eval_apps._grading_failed(scores(10, efficiency=0.0))
+
+
+def test_wider_margin():
+    assert eval_apps._near_threshold(scores(6), margin=1.5)
+    assert not eval_apps._near_threshold(scores(10), margin=1.5)
+
+
+def test_extract_score_is_clamped():
+    assert eval_apps._extract_score("ADHERENCE_SCORE: 12", "ADHERENCE_SCORE") == 10.0
+    assert eval_apps._extract_score("no score here", "ADHERENCE_SCORE") == 0.0
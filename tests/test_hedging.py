@@ -0,0 +1,120 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+import results_db
+from hedging import HedgePolicy, LatencyTracker, RetryBudget, hedged
+
+
+def sleeper(*delays):
+    """Attempts that take the given delays in turn and return their index."""
+    calls = []
+
+    async def attempt():
+        n = len(calls)
+        calls.append(n)
+        await asyncio.sleep(delays[n])
+        return n
+
+    return attempt, calls
+
+
+def policy(hedge_after: float, deadline: float | None = 5.0, **kwargs) -> HedgePolicy:
+    return HedgePolicy(deadline_s=deadline,
+                       tracker=LatencyTracker(default_s=hedge_after), **kwargs)
+
+
+def test_fast_call_is_not_hedged():
+    attempt, calls = sleeper(0.01, 0.01)
+    p = policy(hedge_after=0.5)
+    assert asyncio.run(hedged(attempt, p)) == 0
+    assert calls == [0] and p.hedges == 0
+
+
+def test_slow_call_is_hedged_and_hedge_wins():
+    attempt, calls = sleeper(1.0, 0.01)
+    p = policy(hedge_after=0.05)
+    assert asyncio.run(hedged(attempt, p)) == 1
+    assert p.hedges == 1 and p.hedge_wins == 1
+
+
+def test_disabled_policy_never_hedges():
+    attempt, calls = sleeper(0.1, 0.01)
+    p = policy(hedge_after=0.01, enabled=False)
+    assert asyncio.run(hedged(attempt, p)) == 0
+    assert calls == [0]
+
+
+def test_deadline():
+    attempt, _ = sleeper(1.0, 1.0)
+    with pytest.raises(TimeoutError):
+        asyncio.run(hedged(attempt, policy(hedge_after=0.01, deadline=0.1)))
+
+
+def test_failed_hedge_falls_back_to_primary():
+    calls = []
+
+    async def attempt():
+        calls.append(None)
+        if len(calls) == 2:
+            raise RuntimeError("hedge failed")
+        await asyncio.sleep(0.1)
+        return "primary"
+
+    p = policy(hedge_after=0.01)
+    assert asyncio.run(hedged(attempt, p)) == "primary"
+    assert p.hedges == 1 and p.hedge_wins == 0
+
+
+def test_retry_budget():
+    budget = RetryBudget(ratio=0.5, reserve=1, cap=2)
+    assert budget.withdraw() and not budget.withdraw()
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+    for _ in range(10):
+        budget.deposit()
+    assert budget.tokens == 2
+
+
+def test_percentile_needs_min_samples():
+    tracker = LatencyTracker(min_samples=3, default_s=9.0)
+    tracker.observe(1.0)
+    assert tracker.percentile(95) == 9.0
+    for s in (2.0, 3.0, 4.0, 5.0):
+        tracker.observe(s)
+    assert tracker.percentile(50) == 3.0
+    assert tracker.percentile(100) == 5.0
+
+
+def test_seeded_from_request_latency_not_whole_generation(tmp_path):
+    path = tmp_path / "results.sqlite"
+    conn = results_db.connect(path)
+    with conn:
+        results_db.ensure_run(conn, "gen", "generation")
+        conn.executemany(
+            "INSERT INTO generations (run_id, framework, latency_s, request_latency_s,"
+            " created_at) VALUES ('gen', 'dash', 300.0, ?, ?)",
+            [(10.0 + i, i) for i in range(6)],
+        )
+    conn.close()
+    tracker = LatencyTracker(min_samples=5).seed_from_results_db(path=path)
+    assert list(tracker.samples) == [10.0, 11.0, 12.0, 13.0, 14.0, 15.0]
+    assert tracker.percentile(100) == 15.0
+
+
+def test_old_database_gains_request_latency_column(tmp_path):
+    path = tmp_path / "old.sqlite"
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE generations (id INTEGER PRIMARY KEY, run_id TEXT NOT NULL,"
+            " framework TEXT NOT NULL, model TEXT, prompt_variant TEXT, prompt_hash TEXT,"
+            " input_tokens INTEGER, output_tokens INTEGER, latency_s REAL,"
+            " code_sha TEXT, created_at REAL NOT NULL)"
+        )
+    conn.close()
+    conn = results_db.connect(path)
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(generations)")}
+    conn.close()
+    assert "request_latency_s" in columns
@@ -0,0 +1,49 @@
+import pytest
+
+from bench.history import relative_change, verdict
+
+
+def test_point_estimate_is_change_of_the_mean():
+    point, low, high = relative_change([100, 100], [110, 110])
+    assert point == pytest.approx(0.10)
+    assert low == pytest.approx(0.10) and high == pytest.approx(0.10)
+
+
+def test_single_repetition_has_no_interval():
+    point, low, high = relative_change([100], [120, 121])
+    assert point == pytest.approx(0.205)
+    assert low is None and high is None
+    assert verdict(low, high, 0.05) == "too few runs"
+
+
+def test_interval_contains_the_point_and_is_reproducible():
+    base, head = [100, 104, 98, 101, 97], [108, 112, 105, 110, 109]
+    point, low, high = relative_change(base, head)
+    assert low < point < high
+    assert relative_change(base, head) == (point, low, high)
+
+
+def test_clear_regression_and_improvement():
+    base = [100, 101, 99, 100, 102, 98]
+    _, low, high = relative_change(base, [130, 131, 129, 130, 132, 128])
+    assert verdict(low, high, 0.05) == "REGRESSION"
+    _, low, high = relative_change(base, [70, 71, 69, 70, 72, 68])
+    assert verdict(low, high, 0.05) == "improvement"
+
+
+def test_noise_is_not_flagged():
+    base = [100, 140, 80, 120, 60]
+    head = [110, 150, 85, 125, 70]  # +8% mean, but the interval spans zero
+    _, low, high = relative_change(base, head)
+    assert low < 0 < high
+    assert verdict(low, high, 0.05) == "no significant change"
+
+
+@pytest.mark.parametrize("low, high, expected", [
+    (0.06, 0.20, "REGRESSION"),
+    (0.04, 0.20, "no significant change"),  # interval not wholly beyond 5%
+    (-0.20, -0.06, "improvement"),
+    (-0.20, -0.04, "no significant change"),
+])
+def test_verdict_needs_whole_interval_beyond_threshold(low, high, expected):
+    assert verdict(low, high, 0.05) == expected
@@ -0,0 +1,127 @@
+from textwrap import dedent
+
+import pytest
+
+import perf_lint
+
+
+def rules(code: str, framework: str) -> list[str]:
+    return [f.rule for f in perf_lint.lint_source(dedent(code), framework)]
+
+
+@pytest.mark.parametrize("framework, code", [
+    ("dash", """
+        @app.callback(Output("tip", "children"), Input("bill", "value"))
+        def update(bill):
+            import json
+            return json.dumps(bill)
+    """),
+    ("shiny", """
+        @render.text
+        def tip():
+            import math
+            return math.floor(input.bill())
+    """),
+    ("panel", """
+        def total(bill):
+            from decimal import Decimal
+            return Decimal(bill)
+        pn.bind(total, bill_input, watch=True)
+    """),
+    ("streamlit", """
+        def on_preset():
+            import time
+        st.button("15%", on_click=on_preset)
+    """),
+])
+def test_import_in_hot_path(framework, code):
+    assert rules(code, framework) == ["PERF001"]
+
+
+def test_module_level_import_is_fine():
+    code = """
+        import json
+
+        @app.callback(Output("tip", "children"), Input("bill", "value"))
+        def update(bill):
+            return json.dumps(bill)
+    """
+    assert rules(code, "dash") == []
+
+
+def test_dash_debug_and_debounce():
+    code = """
+        dcc.Input(id="bill", debounce=False)
+        dcc.Input(id="people", debounce=0.4)
+        app.run(debug=True)
+    """
+    assert rules(code, "dash") == ["DASH002", "DASH001"]
+    assert rules("app.run()\napp.run(debug=False)\n", "dash") == []
+
+
+def test_panel_bound_function_building_components():
+    code = """
+        def results(bill):
+            return pn.pane.Markdown(f"{bill}")
+        pn.bind(results, bill_input)
+
+        @pn.depends(bill_input)
+        def summary(bill):
+            return pn.Column(bill)
+
+        def update(bill):
+            total.object = f"{bill}"
+        pn.bind(update, bill_input, watch=True)
+    """
+    assert rules(code, "panel") == ["PNL001", "PNL001"]
+
+
+def test_streamlit_session_state_in_body_only():
+    code = """
+        st.session_state["tip"] = 15
+        st.session_state.people += 1
+
+        def on_preset():
+            st.session_state["tip"] = 18
+        st.button("18%", on_click=on_preset)
+    """
+    assert rules(code, "streamlit") == ["ST001", "ST001"]
+
+
+def test_streamlit_session_state_init_guard_is_fine():
+    code = """
+        if "tip" not in st.session_state:
+            st.session_state["tip"] = 18
+        if "people" not in st.session_state:
+            st.session_state.people = 1
+        else:
+            st.session_state.people += 1
+    """
+    assert rules(code, "streamlit") == ["ST001"]  # only the else branch
+
+
+def test_streamlit_rerun():
+    assert rules("st.rerun()\nst.experimental_rerun()\n", "streamlit") == ["ST002", "ST002"]
+
+
+def test_shiny_render_ui_reading_inputs():
+    code = """
+        @render.ui
+        def results():
+            return ui.p(input.bill())
+
+        @render.ui
+        def header():
+            return ui.h1("Tip Calculator")
+    """
+    assert rules(code, "shiny") == ["SHY001"]
+
+
+def test_syntax_error_is_a_finding():
+    [finding] = perf_lint.lint_source("x = 1\ndef broken(:\n", "dash")
+    assert finding.rule == "PARSE" and finding.line == 2
+
+
+@pytest.mark.parametrize("dirname", perf_lint.APP_DIRS)
+def test_repo_apps_are_clean(dirname):
+    assert perf_lint.lint_file(perf_lint.BASE_DIR / dirname / "app.py") == []
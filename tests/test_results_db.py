@@ -0,0 +1,70 @@
+import pytest
+
+import results_db
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = results_db.connect(tmp_path / "results.sqlite")
+    yield conn
+    conn.close()
+
+
+def add_eval(conn, run_id, created_at, model, variant, values):
+    with conn:
+        results_db.ensure_run(conn, run_id, "eval", model, variant, created_at=created_at)
+        for framework, value in values.items():
+            conn.execute(
+                "INSERT INTO scores (run_id, framework, model, prompt_variant,"
+                " criterion, value, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run_id, framework, model, variant, "adherence", value, created_at),
+            )
+
+
+def means(rows):
+    return {(r["framework"], r["criterion"]): (r["mean"], r["n"]) for r in rows}
+
+
+def test_last_runs_of_a_model(conn):
+    add_eval(conn, "a1", 1, "sonnet", "baseline", {"dash": 6})
+    add_eval(conn, "a2", 2, "sonnet", "baseline", {"dash": 8})
+    # Newer runs of another model must not crowd sonnet's runs out.
+    for i in range(5):
+        add_eval(conn, f"b{i}", 10 + i, "haiku", "baseline", {"dash": 2})
+
+    rows = results_db.mean_scores(conn, last=2, model="sonnet")
+    assert means(rows) == {("dash", "adherence"): (7, 2)}
+
+
+def test_last_runs_of_a_variant(conn):
+    add_eval(conn, "base", 1, "sonnet", "baseline", {"dash": 6})
+    add_eval(conn, "perf1", 2, "sonnet", "performance", {"dash": 9})
+    add_eval(conn, "perf2", 3, "sonnet", "performance", {"dash": 7})
+
+    assert means(results_db.mean_scores(conn, last=1, prompt_variant="baseline")) == {
+        ("dash", "adherence"): (6, 1)}
+    assert means(results_db.mean_scores(conn, last=1, prompt_variant="performance")) == {
+        ("dash", "adherence"): (7, 1)}
+
+
+def test_all_runs_and_criterion_filter(conn):
+    add_eval(conn, "r1", 1, "sonnet", "baseline", {"dash": 4, "shiny": 8})
+    add_eval(conn, "r2", 2, "haiku", "baseline", {"dash": 6})
+    rows = means(results_db.mean_scores(conn))
+    assert rows == {("dash", "adherence"): (5, 2), ("shiny", "adherence"): (8, 1)}
+    assert results_db.mean_scores(conn, criterion="readability") == []
+
+
+def test_ingest_variant_perf_files(conn, tmp_path, monkeypatch):
+    monkeypatch.setattr(results_db, "BASE_DIR", tmp_path)
+    (tmp_path / "dash").mkdir()
+    (tmp_path / "dash" / "perf.json").write_text('{"cold_start_s": 2.0}')
+    (tmp_path / "dash" / "perf_performance.json").write_text('{"cold_start_s": 1.5}')
+
+    assert results_db.ingest_perf_files(conn) == 2
+    assert results_db.ingest_perf_files(conn) == 0  # unchanged files are skipped
+    rows = conn.execute(
+        "SELECT r.prompt_variant, m.value FROM metrics m JOIN runs r USING (run_id)"
+        " ORDER BY r.prompt_variant"
+    ).fetchall()
+    assert [tuple(r) for r in rows] == [("baseline", 2.0), ("performance", 1.5)]
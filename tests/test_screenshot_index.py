@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+import screenshot_index
+from screenshot_index import RECORD, ScreenshotIndex
+
+
+@pytest.fixture
+def images(tmp_path):
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(3):
+        pixels = rng.integers(0, 256, (64, 96), dtype=np.uint8)
+        path = tmp_path / f"shot{i}.png"
+        Image.fromarray(pixels).save(path)
+        paths.append(path)
+    return paths
+
+
+def test_same_image_is_identical(tmp_path, images):
+    index = ScreenshotIndex(tmp_path / "index")
+    assert index.record(images[0], "dash", name="after").status == "new"
+    assert index.record(images[0], "dash", name="after").status == "identical"
+    assert index.record(images[1], "dash", name="after").status == "changed"
+
+
+def test_two_processes_stay_aligned(tmp_path, images):
+    first = ScreenshotIndex(tmp_path / "index")
+    second = ScreenshotIndex(tmp_path / "index")  # e.g. another eval run
+    first.record(images[0], "dash", name="after")
+    second.record(images[1], "panel", name="after")
+    first.record(images[2], "shiny", name="after")
+
+    reopened = ScreenshotIndex(tmp_path / "index")
+    assert [e["id"] for e in reopened.entries] == [0, 1, 2]
+    for entry, path in zip(reopened.entries, images):
+        with Image.open(path) as image:
+            assert reopened.hashes()[entry["id"]] == screenshot_index.dhash(image)
+    assert first.latest("panel", "default", "after")["id"] == 1
+
+
+def test_orphaned_and_torn_records_are_skipped(tmp_path, images):
+    root = tmp_path / "index"
+    index = ScreenshotIndex(root)
+    index.record(images[0], "dash", name="after")
+    # A crash after the record was written but before its entry line,
+    # then a torn half record from another crash.
+    with (root / "records.bin").open("ab") as f:
+        f.write(np.zeros(1, dtype=RECORD).tobytes())
+        f.write(b"\0" * 10)
+
+    index = ScreenshotIndex(root)
+    index.record(images[1], "dash", name="after")
+    entry = index.latest("dash", "default", "after")
+    assert entry["id"] == 2
+    with Image.open(images[1]) as image:
+        assert index.hashes()[2] == screenshot_index.dhash(image)
+    assert [e["id"] for _, e in index.near(images[1], max_distance=0)] == [2]
+
+
+@pytest.mark.parametrize("max_distance", [0, 2, 4, 7])
+def test_close_pairs_match_brute_force(max_distance):
+    rng = np.random.default_rng(1)
+    base = rng.integers(0, 2**63, 40, dtype=np.uint64)
+    # Near copies: flip up to 8 random bits of random base hashes.
+    flips = rng.integers(0, 64, (400, 8)).astype(np.uint64)
+    masks = np.bitwise_or.reduce(np.uint64(1) << flips[:, :rng.integers(0, 9)], axis=1)
+    hashes = np.unique(np.concatenate([base, base[rng.integers(0, 40, 400)] ^ masks]))
+
+    a, b = screenshot_index.close_pairs(hashes, max_distance)
+    found = {(min(i, j), max(i, j)) for i, j in zip(a.tolist(), b.tolist())}
+    distances = screenshot_index.hamming(hashes[:, None], hashes[None, :])
+    expected = {(i, j) for i, j in zip(*np.nonzero(distances <= max_distance)) if i < j}
+    assert found == expected
+
+
+def test_components():
+    labels = screenshot_index.components(6, np.array([4, 1, 3]), np.array([5, 2, 4]))
+    assert labels.tolist() == [0, 1, 1, 3, 3, 3]
+
+
+def test_clusters_group_near_identical_latest_captures(tmp_path, images):
+    index = ScreenshotIndex(tmp_path / "index")
+    for cell in ("a", "b", "c"):
+        index.record(images[0], "dash", cell, "after")
+    index.record(images[1], "dash", "d", "after")
+    [group] = index.clusters(max_distance=2)
+    assert sorted(e["cell"] for e in group) == ["a", "b", "c"]
+
@@ -0,0 +1,200 @@
+import asyncio
+import gzip
+
+import pytest
+
+import static_cache
+
+BUNDLE = b"console.log('tip');" * 100
+
+
+def wsgi_app(routes, calls):
+    def app(environ, start_response):
+        calls.append((environ["REQUEST_METHOD"], environ["PATH_INFO"]))
+        content_type, body = routes[environ["PATH_INFO"]]
+        if environ["REQUEST_METHOD"] == "HEAD":
+            body = b""
+        start_response("200 OK", [("Content-Type", content_type)])
+        return [body]
+
+    return app
+
+
+def get(app, path, method="GET", query="", **headers):
+    captured = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        captured["status"] = status
+        captured["headers"] = dict(response_headers)
+
+    environ = {"REQUEST_METHOD": method, "PATH_INFO": path, "QUERY_STRING": query}
+    environ.update({f"HTTP_{k.upper()}": v for k, v in headers.items()})
+    body = b"".join(app(environ, start_response))
+    return captured["status"], captured["headers"], body
+
+
+@pytest.fixture(autouse=True)
+def cache_on(monkeypatch):
+    monkeypatch.delenv("TIP_STATIC_CACHE", raising=False)
+
+
+def test_head_first_does_not_poison_get():
+    calls = []
+    app = static_cache.wsgi(wsgi_app({"/main.js": ("text/javascript", BUNDLE)}, calls))
+
+    status, headers, body = get(app, "/main.js", "HEAD")
+    assert status.startswith("200") and body == b""
+
+    status, headers, body = get(app, "/main.js")
+    assert body == BUNDLE
+    assert headers["Content-Length"] == str(len(BUNDLE))
+    assert calls == [("HEAD", "/main.js"), ("GET", "/main.js")]
+
+
+def test_head_after_get_is_served_from_cache_without_body():
+    calls = []
+    app = static_cache.wsgi(wsgi_app({"/main.js": ("text/javascript", BUNDLE)}, calls))
+    get(app, "/main.js")
+    status, headers, body = get(app, "/main.js", "HEAD")
+    assert body == b"" and headers["Content-Length"] == str(len(BUNDLE))
+    assert calls == [("GET", "/main.js")]
+
+
+def test_compressed_and_revalidated():
+    app = static_cache.wsgi(wsgi_app({"/main.js": ("text/javascript", BUNDLE)}, []))
+    _, headers, body = get(app, "/main.js", accept_encoding="gzip")
+    assert headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(body) == BUNDLE
+    status, _, body = get(app, "/main.js", if_none_match=headers["ETag"])
+    assert status.startswith("304") and body == b""
+
+
+def test_dynamic_json_is_not_cached():
+    calls = []
+    routes = {"/_dash-layout": ("application/json", b'{"props": {}}')}
+    app = static_cache.wsgi(wsgi_app(routes, calls), cache_html=True)
+    get(app, "/_dash-layout")
+    get(app, "/_dash-layout")
+    assert len(calls) == 2
+
+
+def test_html_shell_cached_only_with_cache_html():
+    routes = {"/": ("text/html", b"<html>" + b" " * 600 + b"</html>")}
+    calls = []
+    app = static_cache.wsgi(wsgi_app(routes, calls), cache_html=True)
+    get(app, "/")
+    get(app, "/")
+    assert len(calls) == 1
+
+    calls = []
+    app = static_cache.wsgi(wsgi_app(routes, calls))
+    get(app, "/")
+    get(app, "/")
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize("path, query, expected", [
+    ("/assets/style.css", "", True),
+    ("/_dash-component-suites/dash/deps/react.v2_0_0m1700000000.min.js", "", True),
+    ("/lib/shiny.js", "", True),
+    ("/bundle", "v=3", True),
+    ("/_dash-layout", "", False),
+    ("/streamlit/_stcore/host-config", "", False),
+    ("/streamlit/_stcore/health", "", False),
+])
+def test_static_url(path, query, expected):
+    assert static_cache.static_url(path, query) is expected
+
+
+def test_lru_is_bounded():
+    cache = static_cache.AssetCache(max_bytes=3000)
+    for i in range(5):
+        cache.put(i, static_cache.make_asset(bytes([i]) * 1000, "image/png"))
+    assert cache.size <= 3000
+    assert cache.get(0) is None and cache.get(4) is not None
+
+    cache.get(2)  # recently used survives the next eviction
+    cache.put(5, static_cache.make_asset(b"x" * 1000, "image/png"))
+    assert cache.get(2) is not None and cache.get(3) is None
+
+
+def test_oversized_asset_is_served_but_not_kept():
+    cache = static_cache.AssetCache(max_bytes=10)
+    asset = static_cache.make_asset(b"x" * 100, "image/png")
+    assert cache.put("big", asset) is asset
+    assert len(cache) == 0
+
+
+def test_asgi_head_does_not_poison_get():
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["method"])
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"text/css")]})
+        await send({"type": "http.response.body",
+                    "body": b"" if scope["method"] == "HEAD" else BUNDLE})
+
+    wrapped = static_cache.asgi(app)
+
+    async def request(method):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": method, "path": "/style.css",
+                 "query_string": b"", "headers": []}
+        await wrapped(scope, None, send)
+        return sent
+
+    asyncio.run(request("HEAD"))
+    sent = asyncio.run(request("GET"))
+    assert sent[-1]["body"] == BUNDLE
+    assert calls == ["HEAD", "GET"]
+
+
+def test_dynamic_routes_are_not_buffered_with_cache_html():
+    def stream(environ, start_response):
+        start_response("200 OK", [("Content-Type", "text/event-stream")])
+        yield b"data: 1\n\n"
+        yield b"data: 2\n\n"
+
+    app = static_cache.wsgi(stream, cache_html=True)
+    for path in ("/_dash-layout", "/_reload-hash", "/events"):
+        environ = {"REQUEST_METHOD": "GET", "PATH_INFO": path, "QUERY_STRING": ""}
+        result = app(environ, lambda status, headers, exc_info=None: None)
+        assert next(iter(result)) == b"data: 1\n\n"  # the app's own iterator
+
+
+def test_asgi_streams_dynamic_routes_and_caches_mounted_shell():
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["path"])
+        content_type = b"text/html" if scope["path"].endswith("/") else b"text/event-stream"
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", content_type)]})
+        await send({"type": "http.response.body", "body": b"<html>" + b" " * 600,
+                    "more_body": True})
+        await send({"type": "http.response.body", "body": b"</html>"})
+
+    wrapped = static_cache.asgi(app, cache_html=True)
+
+    async def request(path):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": path, "root_path": "/shiny",
+                 "query_string": b"", "headers": []}
+        await wrapped(scope, None, send)
+        return sent
+
+    streamed = asyncio.run(request("/shiny/events"))
+    assert [m.get("more_body", False) for m in streamed[1:]] == [True, False]
+
+    asyncio.run(request("/shiny/"))
+    asyncio.run(request("/shiny/"))
+    assert calls == ["/shiny/events", "/shiny/"]
@@ -0,0 +1,91 @@
+import io
+
+import numpy as np
+import pytest
+
+import tipcore
+
+
+def receipts(text: str) -> tipcore.ReceiptTable:
+    return tipcore.read_receipts(io.BytesIO(text.encode()))
+
+
+@pytest.mark.parametrize("bill, tip_pct, tip", [
+    (0.125, 100, 0.13),   # half a cent rounds up, not to even
+    (1.005, 100, 1.01),   # 1.005 * 100 is 100.4999... in binary
+    (85.50, 20, 17.10),
+    (10.00, 12.5, 1.25),
+    (0.05, 10, 0.01),     # 0.5 cent rounds up
+])
+def test_round_half_up(bill, tip_pct, tip):
+    assert tipcore.split_bill(bill, tip_pct).tip == tip
+
+
+def test_split_bill():
+    result = tipcore.split_bill(85.50, 20, 3)
+    assert result == tipcore.Bill(tip=17.10, total=102.60,
+                                  per_person_tip=5.70, per_person_total=34.20)
+
+
+def test_split_bill_empty_inputs():
+    assert tipcore.split_bill(None, None, None).total == 0
+
+
+def test_format_cents():
+    assert tipcore.format_cents(123456) == "$1,234.56"
+    assert tipcore.format_cents(-5) == "-$0.05"
+
+
+def test_header_aliases_and_order():
+    table = receipts("Party Size,Tip %,Amount\n3,20,85.50\n2,18,42.00\n")
+    assert table.bill.tolist() == [8550, 4200]
+    assert table.people.tolist() == [3, 2]
+    assert table.per_person_total.tolist() == [3420, 2478]
+
+
+def test_headerless_party_size_per_row():
+    table = receipts("100,18\n200,20,3\n")
+    assert table.people.tolist() == [1, 3]
+    assert table.per_person_total.tolist() == [11800, 8000]
+
+
+def test_short_row_is_skipped_not_defaulted():
+    table = receipts("bill,tip_pct,people\n12.5\n10,15,2\n")
+    assert len(table) == 1 and table.skipped == 1
+    assert table.tip_pct.tolist() == [15]
+
+
+def test_invalid_rows_are_skipped():
+    table = receipts(
+        "bill,tip_pct,people\n"
+        "10,15,2.7\n"   # fractional party size
+        "-1,15,1\n"     # negative bill
+        "10,150,1\n"    # tip above 100%
+        "10,15,0\n"     # nobody to split with
+        "abc,15,1\n"    # unparseable
+        "10,,1\n"       # missing tip
+        "10,15,\n"      # empty party size: one person
+    )
+    assert table.skipped == 6
+    assert table.people.tolist() == [1]
+
+
+def test_chunks_match_single_pass():
+    text = "bill,tip_pct,people\n" + "".join(
+        f"{i}.{i % 100:02d},{i % 30},{i % 4 + 1}\n" for i in range(1, 500)
+    )
+    whole = receipts(text)
+    chunked = tipcore.read_receipts(io.BytesIO(text.encode()), chunk_rows=7)
+    assert np.array_equal(whole.total, chunked.total)
+
+
+def test_paging():
+    table = receipts("bill,tip\n" + "10,10\n" * 30)
+    assert table.page_count(25) == 2
+    assert len(table.page(1, 25)) == 5
+    assert table.page(99, 25)[0]["Receipt"] == 26  # clamped to the last page
+
+
+def test_empty_file():
+    table = receipts("")
+    assert len(table) == 0 and table.summary()["Bills"] == "$0.00"
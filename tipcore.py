@@ -0,0 +1,283 @@
+"""
+Shared tip/total/split arithmetic for the four tip calculator apps.
+
+All amounts are computed in integer cents with round-half-up, so every app
+shows the same cent-exact numbers. ``split_bill`` covers the single bill of
+the interactive UI; ``read_receipts`` streams an uploaded CSV of receipts
+in chunks and computes whole NumPy arrays at once, returning a
+``ReceiptTable`` that the apps page through server-side.
+
+The apps import this module from the repository root:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+"""
+
+import csv
+import io
+from dataclasses import dataclass
+
+import numpy as np
+
+CSV_COLUMNS = ("bill", "tip_pct", "people")
+
+# Accepted header spellings for each column (compared lower-cased).
+COLUMN_ALIASES = {
+    "bill": {"bill", "amount", "bill_amount", "bill amount", "subtotal"},
+    "tip_pct": {"tip_pct", "tip", "tip %", "tip_percent", "tip percentage"},
+    "people": {"people", "party", "party_size", "party size", "split", "guests"},
+}
+
+# Column headings of the paged results table, in display order.
+RECEIPT_COLUMNS = ("Receipt", "Bill", "Tip %", "People", "Tip", "Total", "Per Person")
+
+DEFAULT_CHUNK_ROWS = 50_000
+DEFAULT_PAGE_SIZE = 25
+
+
+def _hundredths(value) -> np.ndarray:
+    """``value * 100`` rounded half up to an integer. The product is first
+    rounded to 6 places so binary representation error (1.005 * 100 ==
+    100.49999...) does not hide a decimal half."""
+    scaled = np.round(np.asarray(value, dtype=float) * 100, 6)
+    return np.floor(scaled + 0.5).astype(np.int64)
+
+
+def _cents(amount) -> np.ndarray:
+    return _hundredths(amount)
+
+
+def _basis_points(pct) -> np.ndarray:
+    return _hundredths(pct)
+
+
+def _div_half_up(num, den):
+    """Integer division rounding halves up (for non-negative operands)."""
+    return (2 * num + den) // (2 * den)
+
+
+def compute_cents(bill, tip_pct, people=1) -> dict:
+    """Vectorized tip, total and per-person amounts, in integer cents.
+
+    ``bill`` is in dollars, ``tip_pct`` in percent and ``people`` a head
+    count; each may be a scalar or an array (broadcast together).
+    """
+    bill_c = _cents(bill)
+    tip_c = _div_half_up(bill_c * _basis_points(tip_pct), 10_000)
+    total_c = bill_c + tip_c
+    people = np.maximum(np.asarray(people, dtype=np.int64), 1)
+    return {
+        "bill": bill_c,
+        "tip": tip_c,
+        "total": total_c,
+        "per_person_tip": _div_half_up(tip_c, people),
+        "per_person_total": _div_half_up(total_c, people),
+    }
+
+
+@dataclass(frozen=True)
+class Bill:
+    """Dollar amounts for one bill, already rounded to the cent."""
+
+    tip: float
+    total: float
+    per_person_tip: float
+    per_person_total: float
+
+
+def split_bill(bill, tip_pct, people=1) -> Bill:
+    """Tip, total and per-person amounts for a single (non-negative) bill."""
+    cents = compute_cents(bill or 0.0, tip_pct or 0.0, int(people or 1))
+    return Bill(
+        tip=int(cents["tip"]) / 100,
+        total=int(cents["total"]) / 100,
+        per_person_tip=int(cents["per_person_tip"]) / 100,
+        per_person_total=int(cents["per_person_total"]) / 100,
+    )
+
+
+def format_cents(cents) -> str:
+    """Render integer cents as ``$1,234.56``."""
+    cents = int(cents)
+    return f"-${-cents / 100:,.2f}" if cents < 0 else f"${cents / 100:,.2f}"
+
+
+# ── Bulk receipts ────────────────────────────────────────────────────────────
+
+@dataclass
+class ReceiptTable:
+    """Computed receipts, kept server-side and shipped one page at a time."""
+
+    bill: np.ndarray
+    tip_pct: np.ndarray
+    people: np.ndarray
+    tip: np.ndarray
+    total: np.ndarray
+    per_person_total: np.ndarray
+    skipped: int = 0
+
+    def __len__(self) -> int:
+        return len(self.bill)
+
+    def page_count(self, page_size: int = DEFAULT_PAGE_SIZE) -> int:
+        return max(1, -(-len(self) // page_size))
+
+    def page(self, index: int, page_size: int = DEFAULT_PAGE_SIZE) -> list[dict]:
+        """Formatted rows for 0-based page ``index`` (clamped to range)."""
+        index = min(max(index, 0), self.page_count(page_size) - 1)
+        start = index * page_size
+        rows = []
+        for i in range(start, min(start + page_size, len(self))):
+            rows.append({
+                "Receipt": i + 1,
+                "Bill": format_cents(self.bill[i]),
+                "Tip %": f"{self.tip_pct[i]:g}%",
+                "People": int(self.people[i]),
+                "Tip": format_cents(self.tip[i]),
+                "Total": format_cents(self.total[i]),
+                "Per Person": format_cents(self.per_person_total[i]),
+            })
+        return rows
+
+    def columns(self) -> dict:
+        """Numeric columns (dollars) for widgets that page data themselves."""
+        return {
+            "Receipt": np.arange(1, len(self) + 1),
+            "Bill": self.bill / 100,
+            "Tip %": self.tip_pct,
+            "People": self.people,
+            "Tip": self.tip / 100,
+            "Total": self.total / 100,
+            "Per Person": self.per_person_total / 100,
+        }
+
+    def summary(self) -> dict:
+        """Totals across all receipts, formatted for display."""
+        return {
+            "Receipts": f"{len(self):,}",
+            "Skipped rows": f"{self.skipped:,}",
+            "Bills": format_cents(self.bill.sum()),
+            "Tips": format_cents(self.tip.sum()),
+            "Totals": format_cents(self.total.sum()),
+        }
+
+
+def _column_order(header: list[str]) -> list[int] | None:
+    """Indices of bill/tip_pct/people in ``header``, or None if not a header."""
+    names = [h.strip().lower() for h in header]
+    order = []
+    for column in CSV_COLUMNS:
+        matches = [i for i, n in enumerate(names) if n in COLUMN_ALIASES[column]]
+        order.append(matches[0] if matches else None)
+    if order[0] is None or order[1] is None:
+        return None
+    return order
+
+
+def _parse_chunk(rows: list[list[str]], order: list[int]) -> np.ndarray:
+    """Parse rows into an (n, 3) float array; unparseable rows become NaN.
+
+    A missing or empty bill or tip cell is NaN (the row is skipped later);
+    only the optional party size defaults to 1.
+    """
+    def cell(row, i, default):
+        value = row[i].strip() if i is not None and i < len(row) else ""
+        return value or default
+
+    def pick(row):
+        return [cell(row, order[0], "nan"), cell(row, order[1], "nan"),
+                cell(row, order[2], "1")]
+
+    picked = [pick(row) for row in rows]
+    try:
+        return np.array(picked, dtype=float)
+    except ValueError:
+        # Slow path only for chunks that contain malformed values.
+        out = np.full((len(picked), 3), np.nan)
+        for n, values in enumerate(picked):
+            try:
+                out[n] = [float(v) for v in values]
+            except ValueError:
+                pass
+        return out
+
+
+def iter_receipt_chunks(fileobj, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    """Yield (n, 3) float arrays of bill/tip_pct/people from a CSV stream.
+
+    ``fileobj`` may be text or binary; it is read incrementally, so only
+    ``chunk_rows`` rows are held as Python objects at a time. Files without
+    a recognised header are read as bill, tip_pct[, people] columns, row by
+    row: a row without a third cell is one person.
+    """
+    wrapper = None
+    if not isinstance(fileobj, io.TextIOBase):
+        fileobj = wrapper = io.TextIOWrapper(
+            fileobj, encoding="utf-8-sig", newline=""
+        )
+    try:
+        reader = csv.reader(fileobj)
+        first = next(reader, None)
+        if first is None:
+            return
+        order = _column_order(first)
+        chunk = []
+        if order is None:
+            order = [0, 1, 2]
+            chunk.append(first)
+
+        for row in reader:
+            if not row:
+                continue
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                yield _parse_chunk(chunk, order)
+                chunk = []
+        if chunk:
+            yield _parse_chunk(chunk, order)
+    finally:
+        # Leave the caller's binary stream open (the wrapper would close it).
+        if wrapper is not None:
+            wrapper.detach()
+
+
+def read_receipts(fileobj, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> ReceiptTable:
+    """Stream a receipts CSV and compute every row with vectorized NumPy.
+
+    Rows with a missing or negative bill, a missing tip or one outside
+    0-100%, or a party size below one or not a whole number are skipped and
+    counted in ``ReceiptTable.skipped``.
+    """
+    parts = {name: [] for name in
+             ("bill", "tip_pct", "people", "tip", "total", "per_person_total")}
+    skipped = 0
+    for chunk in iter_receipt_chunks(fileobj, chunk_rows):
+        bill, tip_pct, people = chunk.T
+        valid = (
+            np.isfinite(chunk).all(axis=1)
+            & (bill >= 0)
+            & (tip_pct >= 0) & (tip_pct <= 100)
+            & (people >= 1) & (people == np.floor(people))
+        )
+        skipped += int((~valid).sum())
+        bill, tip_pct = bill[valid], tip_pct[valid]
+        people = people[valid].astype(np.int64)
+
+        cents = compute_cents(bill, tip_pct, people)
+        parts["bill"].append(cents["bill"])
+        parts["tip_pct"].append(tip_pct)
+        parts["people"].append(people)
+        parts["tip"].append(cents["tip"])
+        parts["total"].append(cents["total"])
+        parts["per_person_total"].append(cents["per_person_total"])
+
+    def concat(arrays, dtype):
+        return np.concatenate(arrays) if arrays else np.empty(0, dtype=dtype)
+
+    return ReceiptTable(
+        bill=concat(parts["bill"], np.int64),
+        tip_pct=concat(parts["tip_pct"], float),
+        people=concat(parts["people"], np.int64),
+        tip=concat(parts["tip"], np.int64),
+        total=concat(parts["total"], np.int64),
+        per_person_total=concat(parts["per_person_total"], np.int64),
+        skipped=skipped,
+    )